@@ -2,6 +2,6 @@
 from app.models import db
 from app.word_selector import select_word
 from app.image_generator import generate_image
-from app.guess_processor import process_guess
+from app.guess_processor import process_guess, process_guesses
 
-__all__ = ['db', 'select_word', 'generate_image', 'process_guess']
+__all__ = ['db', 'select_word', 'generate_image', 'process_guess', 'process_guesses']
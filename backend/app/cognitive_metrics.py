@@ -0,0 +1,158 @@
+from sqlalchemy import Integer, case, cast, func
+from app.models import db, GameSession, Round, Word, Guess
+
+# Cognitive metrics for /api/psychology/cognitive-metrics/<user_id>.
+# Each metric is one aggregate query over rounds -> sessions (-> words), so
+# the endpoint runs a fixed number of statements however long the history is.
+
+
+def _guessed():
+    """Round.is_guessed as 0/1"""
+    return func.coalesce(cast(Round.is_guessed, Integer), 0)
+
+
+def _seconds_between(start, end):
+    """Dialect-specific elapsed seconds between two DateTime expressions"""
+    if db.engine.dialect.name == 'postgresql':
+        return func.extract('epoch', end - start)
+    return (func.julianday(end) - func.julianday(start)) * 86400.0
+
+
+def _percentage(part, whole):
+    return round(part / whole * 100, 2) if whole else 0.0
+
+
+def _user_rounds(*columns):
+    """Query over the user's rounds joined to their sessions"""
+    return db.session.query(*columns).join(GameSession, Round.session_id == GameSession.id)
+
+
+def calculate_avg_reaction_time(user_id):
+    """Calculate average reaction time for guesses"""
+    # Precise per-guess timing: seconds until each correct guess
+    avg_time, guess_count = db.session.query(
+        func.avg(Guess.time_taken),
+        func.count(Guess.id)
+    ).join(Round, Guess.round_id == Round.id).join(
+        GameSession, Round.session_id == GameSession.id
+    ).filter(
+        GameSession.user_id == user_id,
+        Guess.is_correct.is_(True)
+    ).one()
+
+    if guess_count:
+        return avg_time or 0
+
+    # Rounds played before guesses were recorded: approximate from Round times
+    avg_time = _user_rounds(
+        func.avg(_seconds_between(Round.started_at, Round.guessed_at))
+    ).filter(
+        GameSession.user_id == user_id,
+        Round.guessed_at.isnot(None)
+    ).scalar()
+
+    return avg_time or 0
+
+
+def calculate_retention_rate(user_id):
+    """
+    Calculate how well user retains learned words
+
+    Looks at every repeat appearance of a word the user had already guessed
+    correctly and returns the percentage guessed correctly again.
+    """
+    previously_correct = func.max(_guessed()).over(
+        partition_by=Round.word_id,
+        order_by=(Round.started_at, Round.id),
+        rows=(None, -1)
+    )
+    appearances = _user_rounds(
+        _guessed().label('guessed'),
+        previously_correct.label('previously_correct')
+    ).filter(GameSession.user_id == user_id).subquery()
+
+    retained, repeats = db.session.query(
+        func.sum(appearances.c.guessed),
+        func.count()
+    ).filter(appearances.c.previously_correct == 1).one()
+
+    return _percentage(retained or 0, repeats)
+
+
+def calculate_difficulty_progression(user_id):
+    """Track if user is progressing through difficulty levels"""
+    rows = _user_rounds(
+        GameSession.difficulty,
+        func.count(func.distinct(GameSession.id)),
+        func.count(Round.id),
+        func.sum(_guessed()),
+        func.min(GameSession.started_at),
+        func.max(GameSession.started_at)
+    ).filter(
+        GameSession.user_id == user_id
+    ).group_by(GameSession.difficulty).all()
+
+    return {
+        difficulty or 'unknown': {
+            'sessions': sessions,
+            'rounds': rounds,
+            'correct': correct or 0,
+            'accuracy': _percentage(correct or 0, rounds),
+            'first_played': first.isoformat() if first else None,
+            'last_played': last.isoformat() if last else None
+        }
+        for difficulty, sessions, rounds, correct, first, last in rows
+    }
+
+
+def calculate_category_performance(user_id):
+    """Performance breakdown by category"""
+    category = func.coalesce(Word.category, 'Unknown')
+    rows = _user_rounds(
+        category,
+        func.count(Round.id),
+        func.sum(_guessed())
+    ).join(Word, Round.word_id == Word.id).filter(
+        GameSession.user_id == user_id
+    ).group_by(category).all()
+
+    return {
+        cat: {
+            'rounds': rounds,
+            'correct': correct or 0,
+            'accuracy': _percentage(correct or 0, rounds)
+        }
+        for cat, rounds, correct in rows
+    }
+
+
+def calculate_visual_recognition_score(user_id):
+    """
+    Score based on visual recognition performance
+
+    Percentage of rounds recognized from the picture on the first guess.
+    """
+    first_try = case((Round.is_guessed.is_(True) & (Round.guesses_count <= 1), 1), else_=0)
+    recognized, rounds = _user_rounds(
+        func.sum(first_try),
+        func.count(Round.id)
+    ).filter(GameSession.user_id == user_id).one()
+
+    return _percentage(recognized or 0, rounds)
+
+
+def get_cognitive_metrics(user_id):
+    """
+    Compute every cognitive metric for a user
+
+    Returns:
+        dict: reaction_time, memory_retention, difficulty_progression,
+        category_performance, visual_recognition
+    """
+    return {
+        'reaction_time': calculate_avg_reaction_time(user_id),
+        'memory_retention': calculate_retention_rate(user_id),
+        'difficulty_progression': calculate_difficulty_progression(user_id),
+        'category_performance': calculate_category_performance(user_id),
+        'visual_recognition': calculate_visual_recognition_score(user_id)
+    }
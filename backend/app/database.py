@@ -1,14 +1,21 @@
 from app.models import db, User, GameSession, Round, Word, UserStats
 from app.word_selector import WORD_DATABASE
+from app.migrations import run_migrations
 from datetime import datetime, timedelta
 import random
 
 def init_db():
     """Initialize database with tables and seed data"""
-    db.create_all()
+    init_schema()
     seed_database()
 
 
+def init_schema():
+    """Create missing tables and apply pending migrations; returns applied versions"""
+    db.create_all()
+    return run_migrations()
+
+
 def seed_database():
     """Seed database with test data"""
     
@@ -41,26 +48,33 @@ def seed_database():
     
     db.session.commit()
     
-    # Create words in database
+    # Create words in database (one existence query, one bulk insert)
+    existing = {word for (word,) in db.session.query(Word.word)}
+    word_rows = []
     for age_group in WORD_DATABASE:
         for difficulty in WORD_DATABASE[age_group]:
             for word_data in WORD_DATABASE[age_group][difficulty]:
-                # Check if word already exists
-                if not Word.query.filter_by(word=word_data['word']).first():
-                    word = Word(
-                        word=word_data['word'],
-                        definition=word_data['definition'],
-                        translation=word_data['translation'],
-                        difficulty=difficulty,
-                        category=word_data['category'],
-                        age_group=age_group,
-                        is_appropriate=True,
-                        created_at=datetime.now()
-                    )
-                    db.session.add(word)
+                if word_data['word'] in existing:
+                    continue
+                existing.add(word_data['word'])
+                word_rows.append({
+                    'word': word_data['word'],
+                    'definition': word_data['definition'],
+                    'translation': word_data['translation'],
+                    'difficulty': difficulty,
+                    'category': word_data['category'],
+                    'age_group': age_group,
+                    'is_appropriate': True,
+                    'created_at': datetime.now()
+                })
+    if word_rows:
+        db.session.execute(Word.__table__.insert(), word_rows)
     
     db.session.commit()
     
+    words = Word.query.order_by(Word.id).limit(10).all()
+    stats_by_user = {}
+    
     # Create sample game sessions and rounds
     for user in users[:3]:  # Create sessions for first 3 users
         # Create 3 completed games for each user
@@ -78,7 +92,6 @@ def seed_database():
             db.session.flush()  # Get session ID
             
             # Create 10 rounds for each session
-            words = Word.query.limit(10).all()
             correct_count = 0
             total_points = 0
             
@@ -93,6 +106,7 @@ def seed_database():
                     image_url=f'https://via.placeholder.com/512?text={word.word}',
                     started_at=session.started_at + timedelta(minutes=i*1.5),
                     guessed_at=session.started_at + timedelta(minutes=i*1.5) + timedelta(seconds=time_taken) if is_guessed else None,
+                    ended_at=session.started_at + timedelta(minutes=i*1.5) + timedelta(seconds=60),
                     duration_seconds=60,
                     is_guessed=is_guessed,
                     guesses_count=random.randint(1, 3) if is_guessed else random.randint(1, 5),
@@ -104,10 +118,8 @@ def seed_database():
                     correct_count += 1
                     total_points += 100
             
-            db.session.commit()
-            
             # Update user stats
-            stats = UserStats.query.filter_by(user_id=user.id).first()
+            stats = stats_by_user.get(user.id)
             if not stats:
                 stats = UserStats(
                     user_id=user.id,
@@ -119,6 +131,7 @@ def seed_database():
                     accuracy_percentage=0.0
                 )
                 db.session.add(stats)
+                stats_by_user[user.id] = stats
             
             stats.total_games_played = (stats.total_games_played or 0) + 1
             stats.total_correct_guesses = (stats.total_correct_guesses or 0) + correct_count
@@ -126,8 +139,8 @@ def seed_database():
             stats.total_points = (stats.total_points or 0) + total_points
             stats.words_learned = (stats.words_learned or 0) + correct_count
             stats.accuracy_percentage = (stats.total_correct_guesses / stats.total_guesses * 100) if stats.total_guesses > 0 else 0
-            
-            db.session.commit()
+    
+    db.session.commit()
 
 
 def get_age_group(age):
@@ -1,4 +1,7 @@
 import os
+import threading
+from collections import OrderedDict
+from app.safety_filter import contains_blocked_term
 
 # Simple Levenshtein distance implementation (no external dependency)
 def levenshtein_distance(s1, s2):
@@ -22,6 +25,28 @@ def levenshtein_distance(s1, s2):
     
     return previous_row[-1]
 
+def max_edits_for_similarity(max_length, threshold):
+    """
+    Largest edit distance whose similarity still reaches threshold
+
+    Mirrors ``1 - distance / max_length >= threshold`` exactly, including
+    its floating point rounding.
+
+    Args:
+        max_length (int): Length of the longer string
+        threshold (float): Similarity threshold (0-1)
+
+    Returns:
+        int: Maximum allowed distance (-1 if even an exact match fails)
+    """
+    k = int((1 - threshold) * max_length)
+    while k < max_length and 1 - ((k + 1) / max_length) >= threshold:
+        k += 1
+    while k >= 0 and 1 - (k / max_length) < threshold:
+        k -= 1
+    return k
+
+
 # Synonym dictionary
 SYNONYMS = {
     'couch': ['sofa', 'divan', 'settee'],
@@ -37,7 +62,7 @@ SYNONYMS = {
     'slow': ['sluggish', 'leisurely', 'gradual'],
 }
 
-def process_guess(user_guess, correct_word, time_taken=0, max_time=60):
+def process_guess(user_guess, correct_word, time_taken=0, max_time=60, word_id=None):
     """
     Process a user's guess with sophisticated matching
     
@@ -55,6 +80,8 @@ def process_guess(user_guess, correct_word, time_taken=0, max_time=60):
         correct_word (str): The correct answer
         time_taken (float): Time taken to guess (seconds)
         max_time (int): Maximum time allowed
+        word_id (int): Word id; when given the compiled AnswerMatcher is
+            reused from ANSWER_MATCHERS
     
     Returns:
         dict: {
@@ -77,125 +104,372 @@ def process_guess(user_guess, correct_word, time_taken=0, max_time=60):
         }
     
     # Test Case 22: Strip leading/trailing spaces
-    user_guess = user_guess.strip()
-    
     # Test Case 21: Normalize case sensitivity
-    normalized_guess = user_guess.lower()
-    normalized_word = correct_word.lower()
+    normalized_guess = user_guess.strip().lower()
     
-    # Test Case 21: Exact match
-    if normalized_guess == normalized_word:
-        return {
-            'is_correct': True,
-            'match_type': 'exact',
-            'message': f'✓ Correct! The answer was "{correct_word}"',
-            'time_taken': time_taken,
-            'time_bonus': time_taken < (max_time * 0.3)  # 30% of time
-        }
+    if not is_appropriate_guess(normalized_guess):
+        return build_guess_result(INAPPROPRIATE_GUESS, correct_word, time_taken, max_time)
     
-    # Test Case 23: Handle plurals
-    singular_guess = remove_plural(normalized_guess)
-    singular_word = remove_plural(normalized_word)
+    matcher = get_answer_matcher(word_id, correct_word)
+    return build_guess_result(matcher.match(normalized_guess), correct_word, time_taken, max_time)
+
+
+# Guesses are only screened for NSFW terms; injection patterns matter for
+# image prompts, not for text compared against the answer. Terms must be
+# whole words, so near misses like "phatesythesis" still reach the matcher
+GUESS_BLOCKLIST_CATEGORIES = ('nsfw',)
+
+INAPPROPRIATE_GUESS = {
+    'match_type': 'none',
+    'message': 'Please keep your guesses appropriate!'
+}
+
+
+def is_appropriate_guess(normalized_guess):
+    """
+    Screen a guess with the shared safety filter
     
-    if singular_guess == singular_word and singular_guess != normalized_guess:
-        return {
-            'is_correct': True,
-            'match_type': 'fuzzy',
-            'message': f'✓ Correct! (Accepted: {normalized_guess} matches {correct_word})',
-            'time_taken': time_taken,
-            'time_bonus': False
-        }
+    Args:
+        normalized_guess (str): Stripped, lowercased guess
     
-    # Test Case 25: Synonym matching
-    synonym_match = check_synonym_match(normalized_guess, normalized_word)
-    if synonym_match:
+    Returns:
+        bool: True if the guess contains no blocked word
+    """
+    return not contains_blocked_term(normalized_guess, GUESS_BLOCKLIST_CATEGORIES, whole_words=True)
+
+
+class AnswerMatcher:
+    """
+    Precompiled matcher for one correct word
+    
+    Everything that only depends on the answer (normalized form, accepted
+    plural spellings, synonyms, Myers bit masks) is computed once, so exact,
+    plural and synonym matches are set lookups and only real misses reach
+    fuzzy matching.
+    """
+    
+    def __init__(self, correct_word, threshold=0.75):
+        self.correct_word = correct_word
+        self.threshold = threshold
+        self.normalized_word = correct_word.lower()
+        self.exact = frozenset([self.normalized_word])
+        
+        # Every guess g with remove_plural(g) == remove_plural(word), g != its
+        # singular form. Only words ending in s can have a different singular.
+        singular_word = remove_plural(self.normalized_word)
+        candidates = [singular_word + 'es', singular_word + 's']
+        if singular_word.endswith('y'):
+            candidates.append(singular_word[:-1] + 'ies')
+        self.plurals = frozenset(c for c in candidates if remove_plural(c) == singular_word)
+        
+        # Forward and reverse SYNONYMS entries
+        synonyms = set(SYNONYMS.get(self.normalized_word, []))
+        synonyms.update(w for w, words in SYNONYMS.items() if self.normalized_word in words)
+        self.synonyms = frozenset(synonyms)
+        
+        self.pattern = compile_myers_pattern(self.normalized_word)
+    
+    def match(self, normalized_guess):
+        """
+        Decide how a normalized (stripped, lowercased) guess matches
+        
+        Args:
+            normalized_guess (str): Stripped, lowercased guess
+        
+        Returns:
+            dict: {'match_type': str, 'message': str} plus 'similarity' for
+            fuzzy Levenshtein matches
+        """
+        
+        correct_word = self.correct_word
+        
+        # Test Case 21: Exact match
+        if normalized_guess in self.exact:
+            return {
+                'match_type': 'exact',
+                'message': f'✓ Correct! The answer was "{correct_word}"'
+            }
+        
+        # Test Case 23: Handle plurals
+        if normalized_guess in self.plurals:
+            return {
+                'match_type': 'fuzzy',
+                'message': f'✓ Correct! (Accepted: {normalized_guess} matches {correct_word})'
+            }
+        
+        # Test Case 25: Synonym matching
+        if normalized_guess in self.synonyms:
+            return {
+                'match_type': 'synonym',
+                'message': f'✓ Correct! "{normalized_guess}" is a synonym for "{correct_word}"'
+            }
+        
+        # Test Case 24: Fuzzy matching with Levenshtein distance
+        fuzzy = self.fuzzy_match(normalized_guess)
+        if fuzzy['is_match']:
+            return {
+                'match_type': 'fuzzy',
+                'message': f'✓ Close enough! The answer was "{correct_word}"',
+                'similarity': fuzzy['similarity']
+            }
+        
+        # Test Case: No match
         return {
-            'is_correct': True,
-            'match_type': 'synonym',
-            'message': f'✓ Correct! "{normalized_guess}" is a synonym for "{correct_word}"',
-            'time_taken': time_taken,
-            'time_bonus': False
+            'match_type': 'none',
+            'message': f'✗ Wrong! The answer was "{correct_word}". Try again!'
         }
     
-    # Test Case 24: Fuzzy matching with Levenshtein distance
-    fuzzy_match = fuzzy_match_word(normalized_guess, normalized_word)
-    if fuzzy_match['is_match']:
+    def fuzzy_match(self, guess):
+        """
+        Fuzzy match against the compiled pattern, stopping at the threshold
+        
+        Args:
+            guess (str): Normalized guess
+        
+        Returns:
+            dict: {'is_match': bool, 'similarity': float, 'distance': int}
+            When there is no match, distance is a lower bound and similarity
+            an upper bound, since the computation stops at the threshold.
+        """
+        max_length = max(len(guess), len(self.normalized_word))
+        if max_length == 0:
+            return {'is_match': True, 'similarity': 1.0}
+        
+        # Only distances up to max_edits can reach the threshold
+        max_edits = max_edits_for_similarity(max_length, self.threshold)
+        if abs(len(guess) - len(self.normalized_word)) > max_edits:
+            distance = max_edits + 1
+        else:
+            distance = myers_distance(self.pattern, guess, max_distance=max_edits)
+        
         return {
-            'is_correct': True,
-            'match_type': 'fuzzy',
-            'message': f'✓ Close enough! The answer was "{correct_word}"',
-            'time_taken': time_taken,
-            'time_bonus': False,
-            'similarity': fuzzy_match['similarity']
+            'is_match': distance <= max_edits,
+            'similarity': 1 - (distance / max_length),
+            'distance': distance
         }
+
+
+class AnswerMatcherCache:
+    """LRU cache of AnswerMatcher objects keyed by word id"""
+    
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._matchers = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, word_id, correct_word):
+        """Return the cached matcher for word_id, compiling it on a miss"""
+        with self._lock:
+            matcher = self._matchers.get(word_id)
+            # A renamed word invalidates its entry
+            if matcher is not None and matcher.correct_word == correct_word:
+                self._matchers.move_to_end(word_id)
+                self.hits += 1
+                return matcher
+            self.misses += 1
+        
+        matcher = AnswerMatcher(correct_word)
+        with self._lock:
+            self._matchers[word_id] = matcher
+            self._matchers.move_to_end(word_id)
+            while len(self._matchers) > self.maxsize:
+                self._matchers.popitem(last=False)
+        return matcher
+    
+    def clear(self):
+        with self._lock:
+            self._matchers.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def info(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._matchers),
+                'maxsize': self.maxsize
+            }
+
+
+ANSWER_MATCHERS = AnswerMatcherCache(maxsize=1024)
+
+
+def get_answer_matcher(word_id, correct_word):
+    """
+    Get the compiled matcher for a word
+    
+    Args:
+        word_id (int): Word id used as cache key, or None to skip the cache
+        correct_word (str): The correct answer
+    
+    Returns:
+        AnswerMatcher
+    """
+    if word_id is None:
+        return AnswerMatcher(correct_word)
+    return ANSWER_MATCHERS.get(word_id, correct_word)
+
+
+def build_guess_result(match, correct_word, time_taken=0, max_time=60):
+    """
+    Turn an AnswerMatcher match into the process_guess result dict
+    
+    Args:
+        match (dict): Result of AnswerMatcher.match
+        correct_word (str): The correct answer
+        time_taken (float): Time taken to guess (seconds)
+        max_time (int): Maximum time allowed
     
-    # Test Case: No match
-    return {
-        'is_correct': False,
-        'match_type': 'none',
-        'message': f'✗ Wrong! The answer was "{correct_word}". Try again!',
+    Returns:
+        dict: Same shape as process_guess
+    """
+    
+    result = {
+        'is_correct': match['match_type'] != 'none',
+        'match_type': match['match_type'],
+        'message': match['message'],
         'time_taken': time_taken,
-        'time_bonus': False
+        # Test Case 26: Only exact answers inside 30% of the time get a bonus
+        'time_bonus': match['match_type'] == 'exact' and time_taken < (max_time * 0.3)
     }
+    if 'similarity' in match:
+        result['similarity'] = match['similarity']
+    return result
 
 
-def fuzzy_match_word(guess, correct_word, threshold=0.75):
+def process_guesses(guesses, correct_word, times_taken=None, max_time=60, word_id=None):
     """
-    Fuzzy match using Levenshtein distance
+    Process a batch of guesses against one correct word
+    
+    Guesses are normalized once and deduplicated, so identical answers are
+    classified a single time. Fuzzy matching runs the bit-parallel Myers
+    distance against the answer's precompiled AnswerMatcher.
     
     Args:
-        guess (str): User's guess
-        correct_word (str): Correct word
-        threshold (float): Similarity threshold (0-1)
+        guesses (list): User guesses (str)
+        correct_word (str): The correct answer
+        times_taken (list): Optional time taken per guess (seconds)
+        max_time (int): Maximum time allowed
+        word_id (int): Optional word id for the AnswerMatcher cache
     
     Returns:
-        dict: {'is_match': bool, 'similarity': float}
+        list: One process_guess-shaped dict per guess, in input order
     """
     
-    max_length = max(len(guess), len(correct_word))
-    if max_length == 0:
-        return {'is_match': True, 'similarity': 1.0}
+    if times_taken is None:
+        times_taken = [0] * len(guesses)
     
-    # Calculate distance using our simple implementation
-    distance = levenshtein_distance(guess, correct_word)
+    matcher = get_answer_matcher(word_id, correct_word)
     
-    # Convert to similarity score (0-1)
-    similarity = 1 - (distance / max_length)
+    matches = {}
+    results = []
+    for user_guess, time_taken in zip(guesses, times_taken):
+        if not user_guess or user_guess.strip() == '':
+            results.append(process_guess(user_guess, correct_word, time_taken, max_time))
+            continue
+        
+        normalized_guess = user_guess.strip().lower()
+        match = matches.get(normalized_guess)
+        if match is None:
+            if is_appropriate_guess(normalized_guess):
+                match = matcher.match(normalized_guess)
+            else:
+                match = INAPPROPRIATE_GUESS
+            matches[normalized_guess] = match
+        results.append(build_guess_result(match, correct_word, time_taken, max_time))
+    
+    return results
+
+
+def compile_myers_pattern(pattern):
+    """
+    Precompute the per-character bit masks for myers_distance
     
-    # Allow fuzzy match if similarity is high enough
-    # For example: "Elefant" vs "Elephant" should match
-    is_match = similarity >= threshold
+    Args:
+        pattern (str): String every text will be compared against
     
-    return {
-        'is_match': is_match,
-        'similarity': similarity,
-        'distance': distance
-    }
+    Returns:
+        tuple: (length, {char: bitmask})
+    """
+    masks = {}
+    for i, c in enumerate(pattern):
+        masks[c] = masks.get(c, 0) | (1 << i)
+    return len(pattern), masks
 
 
-def check_synonym_match(guess, correct_word):
+def myers_distance(compiled_pattern, text, max_distance=None):
     """
-    Check if guess is a synonym of the correct word
+    Levenshtein distance using Myers' bit-parallel algorithm
+    
+    Each character of text costs a handful of integer operations regardless
+    of the pattern length (Python ints act as arbitrarily wide bit vectors).
+    With max_distance the scan stops once the distance can no longer come
+    back under the bound: each remaining text character lowers it by at most 1.
     
     Args:
-        guess (str): User's guess
-        correct_word (str): Correct word
+        compiled_pattern (tuple): Result of compile_myers_pattern
+        text (str): String to compare with the pattern
+        max_distance (int): Largest distance of interest (None for no bound)
     
     Returns:
-        bool: True if guess is a synonym
+        int: Edit distance between pattern and text, or max_distance + 1 if
+        it is larger than max_distance
     """
+    length, masks = compiled_pattern
+    if max_distance is None:
+        max_distance = max(length, len(text))
+    too_far = max_distance + 1
+    if length == 0:
+        return len(text) if len(text) <= max_distance else too_far
+    
+    all_ones = (1 << length) - 1
+    last_bit = 1 << (length - 1)
+    positive_v = all_ones
+    negative_v = 0
+    score = length
+    remaining = len(text)
+    
+    for c in text:
+        eq = masks.get(c, 0)
+        xv = eq | negative_v
+        xh = (((eq & positive_v) + positive_v) ^ positive_v) | eq
+        positive_h = negative_v | ~(xh | positive_v)
+        negative_h = positive_v & xh
+        
+        if positive_h & last_bit:
+            score += 1
+        elif negative_h & last_bit:
+            score -= 1
+        
+        remaining -= 1
+        if score - remaining > max_distance:
+            return too_far
+        
+        positive_h = (positive_h << 1) | 1
+        negative_h = negative_h << 1
+        positive_v = (negative_h | ~(xv | positive_h)) & all_ones
+        negative_v = positive_h & xv & all_ones
     
-    # Check if correct_word has synonyms and if guess matches any
-    if correct_word in SYNONYMS:
-        if guess in SYNONYMS[correct_word]:
-            return True
+    return score if score <= max_distance else too_far
+
+
+def fuzzy_match_word(guess, correct_word, threshold=0.75):
+    """
+    Fuzzy match using bounded Levenshtein distance
     
-    # Check reverse (if guess has synonyms that include correct_word)
-    if guess in SYNONYMS:
-        if correct_word in SYNONYMS[guess]:
-            return True
+    Args:
+        guess (str): User's guess
+        correct_word (str): Correct word
+        threshold (float): Similarity threshold (0-1)
     
-    return False
+    Returns:
+        dict: See AnswerMatcher.fuzzy_match
+    """
+    return AnswerMatcher(correct_word, threshold).fuzzy_match(guess)
 
 
 def remove_plural(word):
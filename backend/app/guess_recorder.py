@@ -0,0 +1,145 @@
+import atexit
+import threading
+from datetime import datetime
+from app.models import db, Guess
+
+# Buffered Guess persistence.
+# Every guess is queued in memory and written with one executemany INSERT
+# per batch (a single transaction), either on a timer or once the buffer
+# reaches max_pending rows.
+
+
+class GuessRecorder:
+    """Buffers Guess rows and bulk-inserts them"""
+
+    def __init__(self, app, interval=1.0, max_pending=200):
+        self.app = app
+        self.interval = interval
+        self.max_pending = max_pending
+
+        self._rows = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name='guess-recorder', daemon=True)
+        self._thread.start()
+
+    def record(self, round_id, user_guess, is_correct, match_type, time_taken, created_at=None):
+        """
+        Queue one guess
+
+        Args:
+            round_id (int): Round the guess belongs to
+            user_guess (str): Guess as typed (truncated to the column size)
+            is_correct (bool): Whether it matched
+            match_type (str): 'exact', 'fuzzy', 'synonym' or 'none'
+            time_taken (float): Seconds since the round started
+            created_at (datetime): When the guess was made (now by default)
+        """
+        row = {
+            'round_id': round_id,
+            'user_guess': (user_guess or '')[:100],
+            'is_correct': bool(is_correct),
+            'match_type': match_type,
+            'time_taken': time_taken,
+            'created_at': created_at or datetime.now()
+        }
+        with self._lock:
+            self._rows.append(row)
+            full = len(self._rows) >= self.max_pending
+
+        if full:
+            self._wake.set()
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._rows)
+
+    def flush(self):
+        """Insert every queued guess; returns the number of rows written"""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+            if not rows:
+                return 0
+
+            with self.app.app_context():
+                try:
+                    db.session.execute(Guess.__table__.insert(), rows)
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    # Put the batch back in front of newer guesses for the next try
+                    with self._lock:
+                        self._rows[:0] = rows
+                    raise
+                finally:
+                    db.session.remove()
+            return len(rows)
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Guess flush error: {e}", flush=True)
+
+    def close(self):
+        """Stop the background thread and write what is left"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+
+
+_recorder = None
+
+
+def configure_guess_recorder(app, interval=1.0, max_pending=200):
+    """Start the shared recorder (called once at app start-up)"""
+    global _recorder
+    if _recorder is not None:
+        _recorder.close()
+    _recorder = GuessRecorder(app, interval=interval, max_pending=max_pending)
+    atexit.register(_recorder.close)
+    return _recorder
+
+
+def disable_guess_recorder():
+    """Flush and stop the shared recorder; guesses are then inserted synchronously"""
+    global _recorder
+    if _recorder is not None:
+        _recorder.close()
+    _recorder = None
+
+
+def get_guess_recorder():
+    """Get the shared recorder, or None when buffering is disabled"""
+    return _recorder
+
+
+def record_guess(round_id, user_guess, is_correct, match_type, time_taken):
+    """
+    Persist a guess, through the buffer when it is enabled
+
+    Without a buffer the row is added to the current session and committed
+    with the caller's transaction.
+    """
+    recorder = get_guess_recorder()
+    if recorder is not None:
+        recorder.record(round_id, user_guess, is_correct, match_type, time_taken)
+    else:
+        db.session.add(Guess(
+            round_id=round_id,
+            user_guess=(user_guess or '')[:100],
+            is_correct=bool(is_correct),
+            match_type=match_type,
+            time_taken=time_taken,
+            created_at=datetime.now()
+        ))
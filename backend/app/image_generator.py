@@ -1,6 +1,11 @@
 import os
 import random
 import base64
+import zlib
+from functools import lru_cache
+from app.image_store import get_image_store
+from app.safety_filter import contains_blocked_term
+from app.svg_renderer import GRADIENT_COLORS, get_renderer
 
 # Dummy image data for different words (predefined placeholders)
 DUMMY_IMAGES = {
@@ -38,22 +43,72 @@ def generate_image(word, style='sketch', size=512):
         str: Data URL to generated SVG image
     """
     
+    return svg_to_data_url(render_image(word, style, size))
+
+
+def render_image(word, style='sketch', size=512):
+    """
+    Render the SVG document generate_image would return, as raw bytes
+    
+    Args:
+        word (str): Word to generate image for
+        style (str): 'sketch', 'realistic', 'cartoon', 'painting'
+        size (int): Image size (512x512 default)
+    
+    Returns:
+        bytes: SVG document
+    """
+    
     # Test Case 18: Validate word for prompt injection
     if not is_safe_word(word):
-        return get_placeholder_image(word, error=True)
+        return get_renderer().placeholder(word, error=True)
     
     try:
         # Check if we have a predefined image for this word
         word_lower = word.lower()
         if word_lower in DUMMY_IMAGES:
-            return DUMMY_IMAGES[word_lower]
+            return dummy_image(word_lower)
         
-        # Otherwise generate a random colorful placeholder
-        return generate_svg_image(word, style, size)
+        # Otherwise a colorful placeholder; the word picks the colors, so the
+        # same word always renders the same bytes (and the same image key)
+        color1, color2 = pick_gradient_colors(word)
+        return get_renderer().gradient(size, color1, color2)
     
     except Exception as e:
         print(f"Image generation error: {e}")
-        return get_placeholder_image(word)
+        return get_renderer().placeholder(word)
+
+
+def generate_image_key(word, style='sketch', size=512):
+    """
+    Render an image for a word into the shared ImageStore
+    
+    Args:
+        word (str): Word to generate image for
+        style (str): Visual style
+        size (int): Image size
+    
+    Returns:
+        str: Content-hash key, served at /api/image/<key>
+    """
+    return get_image_store().put(render_image(word, style, size))
+
+
+def svg_to_data_url(svg_bytes):
+    """Encode SVG bytes as a base64 data URL"""
+    b64 = base64.b64encode(svg_bytes).decode('utf-8')
+    return f'data:image/svg+xml;base64,{b64}'
+
+
+def data_url_to_bytes(data_url):
+    """Decode a base64 data URL back to its bytes"""
+    return base64.b64decode(data_url.split(',', 1)[1])
+
+
+@lru_cache(maxsize=None)
+def dummy_image(word_lower):
+    """Predefined image bytes, decoded on first use"""
+    return data_url_to_bytes(DUMMY_IMAGES[word_lower])
 
 
 def create_prompt(word, style):
@@ -110,30 +165,16 @@ def generate_svg_image(word, style='sketch', size=512):
         str: Data URL of SVG image
     """
     
-    # Generate random colors
-    colors = ['#667eea', '#764ba2', '#f093fb', '#4facfe', '#00f2fe', '#43e97b', '#fa709a', '#fee140']
-    color1 = random.choice(colors)
-    color2 = random.choice([c for c in colors if c != color1])
-    
-    # Create SVG
-    svg = f'''<svg width="{size}" height="{size}" xmlns="http://www.w3.org/2000/svg">
-      <defs>
-        <linearGradient id="grad1" x1="0%" y1="0%" x2="100%" y2="100%">
-          <stop offset="0%" style="stop-color:{color1};stop-opacity:1" />
-          <stop offset="100%" style="stop-color:{color2};stop-opacity:1" />
-        </linearGradient>
-      </defs>
-      <rect width="{size}" height="{size}" fill="url(#grad1)"/>
-      <circle cx="{size//2}" cy="{size//2}" r="{size//3}" fill="white" opacity="0.3"/>
-      <circle cx="{size//4}" cy="{size//4}" r="{size//6}" fill="white" opacity="0.2"/>
-      <circle cx="{3*size//4}" cy="{3*size//4}" r="{size//5}" fill="white" opacity="0.15"/>
-    </svg>'''
-    
-    # Encode to base64
-    svg_bytes = svg.encode('utf-8')
-    b64 = base64.b64encode(svg_bytes).decode('utf-8')
-    
-    return f'data:image/svg+xml;base64,{b64}'
+    color1, color2 = pick_gradient_colors()
+    return get_renderer().gradient_data_url(size, color1, color2)
+
+
+def pick_gradient_colors(word=None):
+    """Pick two different gradient colors, seeded by word when given (random otherwise)"""
+    rng = random.Random(zlib.crc32(word.encode('utf-8'))) if word is not None else random
+    color1 = rng.choice(GRADIENT_COLORS)
+    color2 = rng.choice([c for c in GRADIENT_COLORS if c != color1])
+    return color1, color2
 
 
 def get_placeholder_image(word, error=False):
@@ -148,22 +189,7 @@ def get_placeholder_image(word, error=False):
         str: Data URL of SVG placeholder image
     """
     
-    bg_color = '#ffcccc' if error else '#e8f4ff'
-    text_color = '#990000' if error else '#0066cc'
-    
-    svg = f'''<svg width="512" height="512" xmlns="http://www.w3.org/2000/svg">
-      <rect width="512" height="512" fill="{bg_color}"/>
-      <circle cx="256" cy="150" r="80" fill="{text_color}" opacity="0.6"/>
-      <rect x="150" y="250" width="212" height="120" fill="{text_color}" opacity="0.6" rx="10"/>
-      <text x="256" y="320" font-size="32" text-anchor="middle" fill="white" font-weight="bold">
-        {word[:20]}
-      </text>
-    </svg>'''
-    
-    svg_bytes = svg.encode('utf-8')
-    b64 = base64.b64encode(svg_bytes).decode('utf-8')
-    
-    return f'data:image/svg+xml;base64,{b64}'
+    return get_renderer().placeholder_data_url(word, error)
 
 
 def is_safe_word(word):
@@ -181,34 +207,14 @@ def is_safe_word(word):
         bool: True if safe to use
     """
     
-    # NSFW word list (basic)
-    nsfw_words = [
-        'violence', 'gore', 'explicit', 'pornography',
-        'hate', 'slur', 'abuse', 'attack'
-    ]
-    
-    # Prompt injection patterns
-    injection_patterns = [
-        'ignore', 'prompt', 'jailbreak', 'bypass',
-        'system', 'admin', 'password', 'execute'
-    ]
-    
-    word_lower = word.lower()
-    
-    # Check NSFW
-    for nsfw in nsfw_words:
-        if nsfw in word_lower:
-            return False
-    
-    # Check injection patterns
-    for pattern in injection_patterns:
-        if pattern in word_lower:
-            return False
-    
     # Check length (max 100 chars)
     if len(word) > 100:
         return False
     
+    # NSFW terms and prompt injection patterns, one pass over the word
+    if contains_blocked_term(word):
+        return False
+    
     return True
 
 
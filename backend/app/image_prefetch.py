@@ -0,0 +1,89 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from app.image_generator import generate_image_key
+
+# Background image pre-generation.
+# When a session starts, images for its next few deck words are rendered in
+# a thread pool and parked here by (word, style), so starting a round only
+# has to read the finished key. Falls back to rendering inline when a word
+# was never queued.
+
+
+class ImagePrefetcher:
+    """Renders images ahead of time in a thread pool"""
+
+    def __init__(self, render=generate_image_key, max_workers=2, max_entries=1024, timeout=30):
+        self.render = render
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._futures = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='image-prefetch') \
+            if max_workers > 0 else None
+
+    def prefetch(self, words, style='sketch'):
+        """
+        Queue words for background rendering (already queued words are skipped)
+
+        Args:
+            words (list): Words to render
+            style (str): Visual style
+        """
+        if self._executor is None:
+            return
+
+        with self._lock:
+            for word in words:
+                key = (word, style)
+                if key in self._futures:
+                    self._futures.move_to_end(key)
+                    continue
+                self._futures[key] = self._executor.submit(self.render, word, style=style)
+                while len(self._futures) > self.max_entries:
+                    _, oldest = self._futures.popitem(last=False)
+                    oldest.cancel()
+
+    def get_image_key(self, word, style='sketch'):
+        """
+        Get the image key for a word, waiting for a queued render if needed
+
+        Args:
+            word (str): Word to render
+            style (str): Visual style
+
+        Returns:
+            str: Image key
+        """
+        with self._lock:
+            future = self._futures.get((word, style))
+
+        if future is not None and not future.cancelled():
+            try:
+                return future.result(timeout=self.timeout)
+            except Exception as e:
+                print(f"Image prefetch error: {e}")
+                with self._lock:
+                    self._futures.pop((word, style), None)
+
+        return self.render(word, style=style)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_prefetcher = ImagePrefetcher(max_workers=0)
+
+
+def configure_prefetcher(**kwargs):
+    """Replace the shared prefetcher (called once at app start-up)"""
+    global _prefetcher
+    _prefetcher.shutdown()
+    _prefetcher = ImagePrefetcher(**kwargs)
+    return _prefetcher
+
+
+def get_prefetcher():
+    """Get the shared ImagePrefetcher"""
+    return _prefetcher
@@ -0,0 +1,143 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from app.svg_renderer import svgz
+
+# Content-addressed image store.
+# Images are keyed by a hash of their bytes, kept in an in-memory LRU and
+# written once to disk, so a key always names the same image and can be
+# served with a long-lived ETag.
+
+KEY_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+def image_key(data):
+    """Content hash used as the image key"""
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+class ImageStore:
+    """LRU in memory, files on disk"""
+
+    def __init__(self, directory=None, max_items=512):
+        self.directory = directory
+        self.max_items = max_items
+        self._images = OrderedDict()
+        self._gzipped = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.svg')
+
+    def _remember(self, key, data):
+        with self._lock:
+            self._images[key] = data
+            self._images.move_to_end(key)
+            while len(self._images) > self.max_items:
+                self._images.popitem(last=False)
+
+    def put(self, data):
+        """
+        Store image bytes
+
+        Args:
+            data (bytes): SVG document
+
+        Returns:
+            str: Image key
+        """
+        key = image_key(data)
+        with self._lock:
+            if key in self._images:
+                self._images.move_to_end(key)
+                return key
+
+        if self.directory and not os.path.exists(self._path(key)):
+            # Write then rename so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+
+        self._remember(key, data)
+        return key
+
+    def get(self, key):
+        """
+        Load image bytes by key
+
+        Args:
+            key (str): Image key
+
+        Returns:
+            bytes: SVG document, or None if unknown
+        """
+        if not KEY_PATTERN.match(key or ''):
+            return None
+
+        with self._lock:
+            data = self._images.get(key)
+            if data is not None:
+                self._images.move_to_end(key)
+                return data
+
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+
+        self._remember(key, data)
+        return data
+
+    def get_gzip(self, key):
+        """
+        Load gzipped (svgz) image bytes by key, compressing once per key
+
+        Args:
+            key (str): Image key
+
+        Returns:
+            bytes: Gzipped SVG document, or None if unknown
+        """
+        with self._lock:
+            compressed = self._gzipped.get(key)
+            if compressed is not None:
+                self._gzipped.move_to_end(key)
+                return compressed
+
+        data = self.get(key)
+        if data is None:
+            return None
+
+        compressed = svgz(data)
+        with self._lock:
+            self._gzipped[key] = compressed
+            while len(self._gzipped) > self.max_items:
+                self._gzipped.popitem(last=False)
+        return compressed
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+
+_store = ImageStore()
+
+
+def configure_image_store(directory=None, max_items=512):
+    """Replace the shared store (called once at app start-up)"""
+    global _store
+    _store = ImageStore(directory=directory, max_items=max_items)
+    return _store
+
+
+def get_image_store():
+    """Get the shared ImageStore"""
+    return _store
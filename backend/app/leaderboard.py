@@ -0,0 +1,196 @@
+from sqlalchemy import func
+from app.models import db, User, GameSession, Round, Word, UserStats
+
+# Aggregations for the dashboard, user listing and comparative analysis.
+# Everything here is computed in SQL (joins, GROUP BY, ORDER BY ... LIMIT)
+# so the number of queries per request stays constant as the user base grows.
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def get_leaderboard(limit=10, offset=0):
+    """
+    Get the top players ranked by total points
+
+    Args:
+        limit (int): Number of entries to return
+        offset (int): Number of entries to skip
+
+    Returns:
+        list: Leaderboard entries, highest points first
+    """
+
+    rows = (
+        db.session.query(
+            User.id,
+            User.username,
+            UserStats.total_points,
+            UserStats.accuracy_percentage,
+            UserStats.total_games_played,
+            UserStats.words_learned
+        )
+        .join(UserStats, UserStats.user_id == User.id)
+        .order_by(UserStats.total_points.desc(), UserStats.user_id)
+        .limit(limit)
+        .offset(offset)
+        .all()
+    )
+
+    return [
+        {
+            'user_id': row.id,
+            'username': row.username,
+            'points': row.total_points,
+            'accuracy': round(row.accuracy_percentage or 0, 2),
+            'games_played': row.total_games_played,
+            'words_learned': row.words_learned
+        }
+        for row in rows
+    ]
+
+
+def get_category_distribution():
+    """
+    Count words per category
+
+    Returns:
+        dict: {category: word_count}
+    """
+
+    category = func.coalesce(Word.category, 'Unknown')
+    rows = (
+        db.session.query(category, func.count(Word.id))
+        .group_by(category)
+        .all()
+    )
+    return {cat: count for cat, count in rows}
+
+
+def get_dashboard_data(leaderboard_size=10):
+    """
+    Compute everything /api/dashboard needs
+
+    Args:
+        leaderboard_size (int): Number of leaderboard entries
+
+    Returns:
+        dict: Dashboard totals, leaderboard and category distribution
+    """
+
+    totals = db.session.query(
+        db.session.query(func.count(User.id)).scalar_subquery(),
+        db.session.query(func.count(GameSession.id)).scalar_subquery(),
+        db.session.query(func.count(Round.id)).scalar_subquery(),
+        # Accuracy is averaged over the rounded per-user values, as shown
+        # on the leaderboard
+        db.session.query(func.avg(func.round(UserStats.accuracy_percentage, 2))).scalar_subquery()
+    ).one()
+
+    total_users, total_games, total_guesses, avg_accuracy = totals
+
+    return {
+        'total_users': total_users,
+        'total_games': total_games,
+        'total_guesses': total_guesses,
+        'average_accuracy': round(avg_accuracy or 0, 2),
+        'leaderboard': get_leaderboard(limit=leaderboard_size),
+        'category_distribution': get_category_distribution()
+    }
+
+
+def get_users_page(page=1, per_page=DEFAULT_PAGE_SIZE):
+    """
+    Get one page of users with their stats
+
+    Args:
+        page (int): 1-based page number
+        per_page (int): Page size (capped at MAX_PAGE_SIZE)
+
+    Returns:
+        dict: {'users': list, 'page': int, 'per_page': int, 'total': int}
+    """
+
+    page = max(1, page)
+    per_page = max(1, min(per_page, MAX_PAGE_SIZE))
+
+    rows = (
+        db.session.query(User, UserStats)
+        .outerjoin(UserStats, UserStats.user_id == User.id)
+        .order_by(User.id)
+        .limit(per_page)
+        .offset((page - 1) * per_page)
+        .all()
+    )
+    total = db.session.query(func.count(User.id)).scalar()
+
+    users_data = []
+    for user, stats in rows:
+        users_data.append({
+            'user_id': user.id,
+            'username': user.username,
+            'age': user.age,
+            'language': user.preferred_language,
+            'stats': {
+                'total_games': stats.total_games_played if stats else 0,
+                'total_points': stats.total_points if stats else 0,
+                'accuracy': round(stats.accuracy_percentage, 2) if stats else 0,
+                'words_learned': stats.words_learned if stats else 0
+            }
+        })
+
+    return {
+        'users': users_data,
+        'page': page,
+        'per_page': per_page,
+        'total': total
+    }
+
+
+def get_comparative_analysis(top_n=10):
+    """
+    Compare performance across all users
+
+    Args:
+        top_n (int): Number of top performers to include
+
+    Returns:
+        dict: Averages across all users, most popular category, top performers
+    """
+
+    analysis = {
+        'average_accuracy': 0,
+        'average_points': 0,
+        'most_popular_category': None,
+        'top_performers': []
+    }
+
+    total_users, total_accuracy, total_points = db.session.query(
+        db.session.query(func.count(User.id)).scalar_subquery(),
+        db.session.query(func.sum(UserStats.accuracy_percentage)).scalar_subquery(),
+        db.session.query(func.sum(UserStats.total_points)).scalar_subquery()
+    ).one()
+
+    if not total_users:
+        return analysis
+
+    analysis['average_accuracy'] = (total_accuracy or 0) / total_users
+    analysis['average_points'] = (total_points or 0) / total_users
+
+    rows = (
+        db.session.query(User.username, UserStats.total_points, UserStats.accuracy_percentage)
+        .join(UserStats, UserStats.user_id == User.id)
+        .order_by(UserStats.total_points.desc(), UserStats.user_id)
+        .limit(top_n)
+        .all()
+    )
+    analysis['top_performers'] = [
+        {
+            'username': username,
+            'points': points,
+            'accuracy': accuracy
+        }
+        for username, points, accuracy in rows
+    ]
+
+    return analysis
@@ -0,0 +1,137 @@
+from sqlalchemy import Integer, cast, func
+from app.models import db, GameSession, Round, SessionSummary
+
+# Materialized learning curve.
+# One SessionSummary row (correct, total, accuracy) is written when a session
+# ends, so the learning-curve endpoint reads the user's summaries instead of
+# every round they ever played. Sessions are numbered and correct answers
+# accumulated at read time in started_at order, so sessions that end out of
+# order land in the right place; sessions without a summary yet (in progress
+# or abandoned) are counted from their rounds.
+
+MAX_LIMIT = 1000
+
+
+def _session_totals(session_ids):
+    """{session_id: (correct, total)} for the given sessions, one grouped query"""
+    rows = db.session.query(
+        Round.session_id,
+        func.sum(func.coalesce(cast(Round.is_guessed, Integer), 0)),
+        func.count(Round.id)
+    ).filter(Round.session_id.in_(session_ids)).group_by(Round.session_id).all()
+    return {session_id: (correct or 0, total) for session_id, correct, total in rows}
+
+
+def _summary(session, correct, total):
+    return SessionSummary(
+        session_id=session.id,
+        user_id=session.user_id,
+        correct=correct,
+        total=total,
+        accuracy=(correct / total * 100) if total else 0,
+        started_at=session.started_at
+    )
+
+
+def record_session_summary(session):
+    """
+    Write the learning curve point for a finished session (caller commits)
+
+    Args:
+        session (GameSession): The session that just ended
+
+    Returns:
+        SessionSummary: The new row, or the existing one if already recorded
+    """
+    existing = db.session.get(SessionSummary, session.id)
+    if existing is not None:
+        return existing
+
+    correct, total = _session_totals([session.id]).get(session.id, (0, 0))
+    summary = _summary(session, correct, total)
+    db.session.add(summary)
+    return summary
+
+
+def get_learning_curve(user_id, since=None, limit=None):
+    """
+    Read a user's learning curve
+
+    Args:
+        user_id (int): Player
+        since (datetime): Only sessions started at or after this time
+        limit (int): Maximum number of points (capped at MAX_LIMIT)
+
+    Returns:
+        list: Learning curve points, oldest first
+    """
+    points = db.session.query(
+        SessionSummary.started_at, SessionSummary.session_id, SessionSummary.correct,
+        SessionSummary.total, SessionSummary.accuracy
+    ).filter(SessionSummary.user_id == user_id).all()
+    unsummarized = db.session.query(GameSession.id, GameSession.started_at).filter(
+        GameSession.user_id == user_id,
+        ~db.session.query(SessionSummary.session_id).filter(
+            SessionSummary.session_id == GameSession.id
+        ).exists()
+    ).all()
+    if unsummarized:
+        totals = _session_totals([session_id for session_id, _ in unsummarized])
+        for session_id, started_at in unsummarized:
+            correct, total = totals.get(session_id, (0, 0))
+            points.append((started_at, session_id, correct, total, (correct / total * 100) if total else 0))
+    points.sort(key=lambda point: (point[0] is None, point[0], point[1]))
+
+    curve = []
+    cumulative_correct = 0
+    for number, (started_at, _, correct, total, accuracy) in enumerate(points, 1):
+        cumulative_correct += correct
+        if since is not None and (started_at is None or started_at < since):
+            continue
+        curve.append({
+            'session_number': number,
+            'correct_guesses': correct,
+            'cumulative_correct': cumulative_correct,
+            'total_in_session': total,
+            'accuracy': accuracy,
+            'date': started_at.isoformat() if started_at else None
+        })
+    if limit is not None:
+        curve = curve[:max(1, min(limit, MAX_LIMIT))]
+    return curve
+
+
+def backfill_session_summaries(batch_size=500):
+    """
+    Rebuild every summary from finished sessions
+
+    Returns:
+        int: Number of summaries written
+    """
+    SessionSummary.query.delete()
+
+    sessions = GameSession.query.filter(GameSession.ended_at.isnot(None)).order_by(
+        GameSession.id
+    ).yield_per(batch_size)
+
+    written = 0
+    batch = []
+
+    def write(batch):
+        nonlocal written
+        totals = _session_totals([s.id for s in batch])
+        for session in batch:
+            correct, total = totals.get(session.id, (0, 0))
+            db.session.add(_summary(session, correct, total))
+            written += 1
+
+    for session in sessions:
+        batch.append(session)
+        if len(batch) >= batch_size:
+            write(batch)
+            batch = []
+    if batch:
+        write(batch)
+
+    db.session.commit()
+    return written
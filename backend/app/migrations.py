@@ -0,0 +1,160 @@
+from datetime import datetime
+from sqlalchemy import inspect, select, text
+from sqlalchemy.exc import IntegrityError
+from app.state import rank_key, rank_nodes
+from app.models import (
+    db, LeaderboardCount, LeaderboardScore, RateCounter, Round, RoundDeadline, RoundScore, SchemaMigration, SessionDeck,
+    SessionSummary, StatsFlush
+)
+
+# Versioned schema migrations.
+# db.create_all() only creates missing tables, so changes to tables that
+# already exist (new indexes, columns) are written here as numbered steps.
+# Applied versions are recorded in schema_migrations; every step must be
+# idempotent because fresh databases already get the current schema from
+# create_all() and several worker processes may start at once. A step that
+# needs a table added after the baseline schema creates it first
+# (create_table), so `migrate` alone upgrades an existing database.
+
+MIGRATIONS = []
+
+
+def migration(version, description):
+    """Register a migration step: fn(connection) runs inside one transaction"""
+    def register(fn):
+        MIGRATIONS.append((version, description, fn))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return register
+
+
+def create_index(conn, name, table, columns):
+    """CREATE INDEX IF NOT EXISTS (SQLite and PostgreSQL)"""
+    conn.execute(text(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})'))
+
+
+def create_table(conn, *models):
+    """CREATE TABLE (with its indexes) for each model whose table is missing"""
+    for model in models:
+        model.__table__.create(bind=conn, checkfirst=True)
+
+
+def add_column(conn, table, column):
+    """ALTER TABLE ... ADD COLUMN unless the column exists (create_all already made it)"""
+    existing = {c['name'] for c in inspect(conn).get_columns(table)}
+    if column.name not in existing:
+        column_type = column.type.compile(dialect=conn.dialect)
+        conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {column.name} {column_type}'))
+
+
+def drop_column(conn, table, name):
+    """ALTER TABLE ... DROP COLUMN if the column is still there"""
+    existing = {c['name'] for c in inspect(conn).get_columns(table)}
+    if name in existing:
+        conn.execute(text(f'ALTER TABLE {table} DROP COLUMN {name}'))
+
+
+@migration(1, 'Guess and session summary indexes')
+def add_guess_and_summary_indexes(conn):
+    create_table(conn, SessionSummary)
+    create_index(conn, 'ix_guesses_round_id', 'guesses', 'round_id')
+    create_index(conn, 'ix_guesses_created_at', 'guesses', 'created_at')
+    create_index(conn, 'ix_session_summaries_user_started', 'session_summaries', 'user_id, started_at')
+
+
+@migration(2, 'Indexes for sessions by user, rounds by session and the leaderboard')
+def add_hot_path_indexes(conn):
+    create_index(conn, 'ix_game_sessions_user_started', 'game_sessions', 'user_id, started_at')
+    create_index(conn, 'ix_rounds_session_number', 'rounds', 'session_id, round_number')
+    create_index(conn, 'ix_user_stats_points', 'user_stats', 'total_points DESC, user_id')
+
+
+@migration(3, 'Round end time for the server-side round timer')
+def add_round_ended_at(conn):
+    add_column(conn, 'rounds', Round.__table__.c.ended_at)
+    create_index(conn, 'ix_rounds_open', 'rounds', 'ended_at, id')
+
+
+@migration(4, 'Tables for the shared state backend')
+def add_state_tables(conn):
+    create_table(conn, RoundDeadline, LeaderboardScore, RateCounter)
+
+
+@migration(5, 'Tables for session word decks and write-behind stats batches')
+def add_deck_and_stats_flush_tables(conn):
+    create_table(conn, SessionDeck, StatsFlush)
+
+
+@migration(6, 'Per-player points of multiplayer rounds')
+def add_round_scores(conn):
+    create_table(conn, RoundScore)
+
+
+@migration(7, 'Rank tree counts for the shared leaderboards')
+def add_leaderboard_counts(conn):
+    create_table(conn, LeaderboardCount)
+    scores = LeaderboardScore.__table__
+    counts = LeaderboardCount.__table__
+    conn.execute(counts.delete())
+    tree = {}
+    for board, member, score in conn.execute(select(scores.c.board, scores.c.member, scores.c.score)):
+        for level, prefix in rank_nodes(rank_key(score, member)):
+            tree[(board, level, prefix)] = tree.get((board, level, prefix), 0) + 1
+    if tree:
+        conn.execute(counts.insert(), [
+            {'board': board, 'level': level, 'prefix': prefix, 'count': count}
+            for (board, level, prefix), count in tree.items()
+        ])
+
+
+@migration(8, 'Number learning curve sessions at read time')
+def drop_summary_running_totals(conn):
+    drop_column(conn, 'session_summaries', 'session_number')
+    drop_column(conn, 'session_summaries', 'cumulative_correct')
+
+
+@migration(9, 'Catalog version of session decks')
+def add_deck_catalog_version(conn):
+    add_column(conn, 'session_decks', SessionDeck.__table__.c.catalog_version)
+
+
+def applied_versions(engine=None):
+    """Versions already recorded in schema_migrations"""
+    engine = engine or db.engine
+    table = SchemaMigration.__table__
+    table.create(bind=engine, checkfirst=True)
+    with engine.connect() as conn:
+        return {row[0] for row in conn.execute(select(table.c.version))}
+
+
+def run_migrations(engine=None):
+    """
+    Apply every pending migration, each in its own transaction
+
+    Args:
+        engine: SQLAlchemy engine (defaults to the app's)
+
+    Returns:
+        list: Versions applied by this call
+    """
+    engine = engine or db.engine
+    table = SchemaMigration.__table__
+    done = applied_versions(engine)
+
+    applied = []
+    for version, description, fn in MIGRATIONS:
+        if version in done:
+            continue
+        try:
+            with engine.begin() as conn:
+                fn(conn)
+                conn.execute(table.insert().values(
+                    version=version,
+                    description=description,
+                    applied_at=datetime.now()
+                ))
+        except IntegrityError:
+            # Another process recorded this version first
+            continue
+        applied.append(version)
+    return applied
@@ -37,10 +37,27 @@ class GameSession(db.Model):
     # Relationships
     rounds = db.relationship('Round', backref='session', lazy=True)
     
+    __table_args__ = (
+        db.Index('ix_game_sessions_user_started', 'user_id', 'started_at'),
+    )
+    
     def __repr__(self):
         return f'<GameSession {self.id} - User {self.user_id}>'
 
 
+class SessionDeck(db.Model):
+    """Pre-shuffled word deck for a game session"""
+    __tablename__ = 'session_decks'
+    
+    session_id = db.Column(db.Integer, db.ForeignKey('game_sessions.id'), primary_key=True)
+    word_indices = db.Column(db.LargeBinary)  # packed uint32 WordCatalog indices
+    position = db.Column(db.Integer, default=0)
+    catalog_version = db.Column(db.String(32))  # WordCatalog.version the indices belong to
+    
+    def __repr__(self):
+        return f'<SessionDeck {self.session_id} - {self.position}>'
+
+
 class Round(db.Model):
     """Round model"""
     __tablename__ = 'rounds'
@@ -52,6 +69,7 @@ class Round(db.Model):
     image_url = db.Column(db.String(500))
     started_at = db.Column(db.DateTime, default=datetime.now)
     guessed_at = db.Column(db.DateTime)
+    ended_at = db.Column(db.DateTime)  # set by the round timer at the deadline
     duration_seconds = db.Column(db.Integer, default=60)
     is_guessed = db.Column(db.Boolean, default=False)
     guesses_count = db.Column(db.Integer, default=0)
@@ -61,10 +79,28 @@ class Round(db.Model):
     word = db.relationship('Word', backref='rounds')
     guesses = db.relationship('Guess', backref='round', lazy=True)
     
+    __table_args__ = (
+        db.Index('ix_rounds_session_number', 'session_id', 'round_number'),
+        db.Index('ix_rounds_open', 'ended_at', 'id'),
+    )
+    
     def __repr__(self):
         return f'<Round {self.id}>'
 
 
+class RoundScore(db.Model):
+    """Points one player scored in a multiplayer round (a room shares one session)"""
+    __tablename__ = 'round_scores'
+    
+    round_id = db.Column(db.Integer, db.ForeignKey('rounds.id'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    points = db.Column(db.Integer, default=0)
+    scored_at = db.Column(db.DateTime, index=True)
+    
+    def __repr__(self):
+        return f'<RoundScore {self.round_id} - User {self.user_id}={self.points}>'
+
+
 class Word(db.Model):
     """Word model"""
     __tablename__ = 'words'
@@ -88,12 +124,12 @@ class Guess(db.Model):
     __tablename__ = 'guesses'
     
     id = db.Column(db.Integer, primary_key=True)
-    round_id = db.Column(db.Integer, db.ForeignKey('rounds.id'), nullable=False)
+    round_id = db.Column(db.Integer, db.ForeignKey('rounds.id'), nullable=False, index=True)
     user_guess = db.Column(db.String(100))
     is_correct = db.Column(db.Boolean, default=False)
     match_type = db.Column(db.String(20))  # 'exact', 'fuzzy', 'synonym'
     time_taken = db.Column(db.Float)
-    created_at = db.Column(db.DateTime, default=datetime.now)
+    created_at = db.Column(db.DateTime, default=datetime.now, index=True)
     
     def __repr__(self):
         return f'<Guess {self.id}>'
@@ -116,5 +152,103 @@ class UserStats(db.Model):
     longest_streak = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.now)
     
+    # Leaderboard order (user_id is already indexed by its unique constraint)
+    __table_args__ = (
+        db.Index('ix_user_stats_points', total_points.desc(), user_id),
+    )
+    
     def __repr__(self):
         return f'<UserStats {self.user_id}>'
+
+
+class SessionSummary(db.Model):
+    """Per-session learning curve point, written when the session ends (numbered at read time)"""
+    __tablename__ = 'session_summaries'
+    __table_args__ = (
+        db.Index('ix_session_summaries_user_started', 'user_id', 'started_at'),
+    )
+    
+    session_id = db.Column(db.Integer, db.ForeignKey('game_sessions.id'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    correct = db.Column(db.Integer, default=0)
+    total = db.Column(db.Integer, default=0)
+    accuracy = db.Column(db.Float, default=0.0)
+    started_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f'<SessionSummary {self.session_id} - User {self.user_id}>'
+
+
+class StatsFlush(db.Model):
+    """Write-behind stats batch that has been applied to user_stats"""
+    __tablename__ = 'stats_flushes'
+    
+    batch_id = db.Column(db.String(32), primary_key=True)
+    record_count = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+    
+    def __repr__(self):
+        return f'<StatsFlush {self.batch_id}>'
+
+
+class RoundDeadline(db.Model):
+    """Open round waiting for the round timer (shared state backend)"""
+    __tablename__ = 'round_deadlines'
+    
+    round_id = db.Column(db.Integer, primary_key=True)
+    deadline = db.Column(db.Float, nullable=False, index=True)  # epoch seconds
+    
+    def __repr__(self):
+        return f'<RoundDeadline {self.round_id}>'
+
+
+class LeaderboardScore(db.Model):
+    """Member score on a named leaderboard (shared state backend)"""
+    __tablename__ = 'leaderboard_scores'
+    __table_args__ = (
+        db.Index('ix_leaderboard_scores_rank', 'board', 'score', 'member'),
+    )
+    
+    board = db.Column(db.String(64), primary_key=True)
+    member = db.Column(db.Integer, primary_key=True)
+    score = db.Column(db.Float, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<LeaderboardScore {self.board} {self.member}={self.score}>'
+
+
+class LeaderboardCount(db.Model):
+    """Entries of a board under one node of its rank tree (see app/state.py)"""
+    __tablename__ = 'leaderboard_counts'
+    
+    board = db.Column(db.String(64), primary_key=True)
+    level = db.Column(db.Integer, primary_key=True)
+    prefix = db.Column(db.BigInteger, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<LeaderboardCount {self.board} {self.level}:{self.prefix}={self.count}>'
+
+
+class RateCounter(db.Model):
+    """Fixed-window request counter (shared state backend)"""
+    __tablename__ = 'rate_counters'
+    
+    key = db.Column(db.String(200), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    expires_at = db.Column(db.Float, nullable=False, index=True)  # epoch seconds
+    
+    def __repr__(self):
+        return f'<RateCounter {self.key}={self.count}>'
+
+
+class SchemaMigration(db.Model):
+    """Applied schema migration (see app/migrations.py)"""
+    __tablename__ = 'schema_migrations'
+    
+    version = db.Column(db.Integer, primary_key=True)
+    description = db.Column(db.String(200))
+    applied_at = db.Column(db.DateTime, default=datetime.now)
+    
+    def __repr__(self):
+        return f'<SchemaMigration {self.version}>'
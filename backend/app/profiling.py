@@ -0,0 +1,266 @@
+import cProfile
+import itertools
+import os
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from flask import g, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+
+# Opt-in request profiling.
+# When enabled, every request is timed in total and per phase (database,
+# guess processing, image generation, word selection, JSON serialization)
+# into Prometheus-style counters and histograms served at /api/metrics, and
+# 1 in N requests can be run under cProfile with the stats written to disk.
+# When disabled nothing is hooked in and phase() returns a shared no-op
+# context manager, so instrumented code pays one global check.
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+METRIC_PREFIX = 'bictionary_'
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join('{}="{}"'.format(n, str(v).replace('\\', '\\\\').replace('"', '\\"'))
+                     for n, v in zip(names, values))
+    return '{' + pairs + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}')
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    def __init__(self, name, help, labels=(), buckets=DURATION_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        names = self.labels + ('le',)
+        with self._lock:
+            for label_values, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f'{self.name}_bucket{_format_labels(names, label_values + (bound,))} {count}')
+                lines.append(f'{self.name}_bucket{_format_labels(names, label_values + ("+Inf",))} {series[-1]}')
+                labels = _format_labels(self.labels, label_values)
+                lines.append(f'{self.name}_sum{labels} {series[-2]!r}')
+                lines.append(f'{self.name}_count{labels} {series[-1]}')
+        return lines
+
+
+class MetricsRegistry:
+    """Metrics of this process, rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, help, labels=()):
+        metric = Counter(METRIC_PREFIX + name, help, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help, labels=(), buckets=DURATION_BUCKETS):
+        metric = Histogram(METRIC_PREFIX + name, help, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, prefix, collect, help=''):
+        """
+        Report values computed at scrape time as gauges
+
+        Args:
+            prefix (str): Metric name prefix (e.g. 'answer_matcher_cache')
+            collect (callable): Returns {name: number}, e.g. a cache's info()
+            help (str): Description shown with every gauge
+        """
+        self._collectors = [c for c in self._collectors if c[0] != prefix]
+        self._collectors.append((prefix, collect, help))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for prefix, collect, help in self._collectors:
+            for key, value in sorted(collect().items()):
+                if not isinstance(value, (int, float)) or isinstance(value, bool):
+                    continue
+                name = f'{METRIC_PREFIX}{prefix}_{key}'
+                lines.append(f'# HELP {name} {help or prefix} ({key})')
+                lines.append(f'# TYPE {name} gauge')
+                lines.append(f'{name} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = MetricsRegistry()
+REQUESTS = METRICS.counter('http_requests_total', 'Requests handled', ('method', 'endpoint', 'status'))
+REQUEST_DURATION = METRICS.histogram('http_request_duration_seconds', 'Request latency', ('method', 'endpoint'))
+PHASE_DURATION = METRICS.histogram('request_phase_seconds', 'Time per request spent in each phase',
+                                   ('endpoint', 'phase'))
+DB_STATEMENTS = METRICS.counter('db_statements_total', 'SQL statements issued by requests', ('endpoint',))
+PROFILES = METRICS.counter('profiles_written_total', 'cProfile dumps written', ('endpoint',))
+
+_enabled = False
+_local = threading.local()
+_NULL_PHASE = nullcontext()
+
+
+class _Phase:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _add_phase_time(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def _add_phase_time(name, seconds):
+    phases = getattr(_local, 'phases', None)
+    if phases is not None:
+        phases[name] = phases.get(name, 0.0) + seconds
+
+
+def phase(name):
+    """
+    Time a block as one phase of the current request
+
+        with phase('process_guess'):
+            result = process_guess(...)
+
+    Phases may nest ('db' is measured inside the others). Outside a request,
+    or with profiling disabled, this is a no-op.
+    """
+    if not _enabled:
+        return _NULL_PHASE
+    return _Phase(name)
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that records serialization as a phase"""
+
+    def dumps(self, obj, **kwargs):
+        with phase('serialization'):
+            return super().dumps(obj, **kwargs)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('profiling_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['profiling_query_start'].pop()
+    phases = getattr(_local, 'phases', None)
+    if phases is not None:
+        phases['db'] = phases.get('db', 0.0) + time.perf_counter() - started
+        _local.statements += 1
+
+
+def configure_profiling(app, engine, sample_rate=0, profile_dir=None):
+    """
+    Turn on request metrics for an app (called once at app start-up)
+
+    Args:
+        app (Flask): Application to instrument
+        engine: SQLAlchemy engine whose statements count as the 'db' phase
+        sample_rate (int): Run 1 in sample_rate requests under cProfile (0 = never)
+        profile_dir (str): Where sampled .prof files are written
+    """
+    global _enabled
+    _enabled = True
+    app.json = TimedJSONProvider(app)
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    if sample_rate and profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+    request_numbers = itertools.count(1)
+
+    @app.before_request
+    def start_request_profile():
+        _local.phases = {}
+        _local.statements = 0
+        g.profiling_start = time.perf_counter()
+        g.profiler = None
+        if sample_rate and next(request_numbers) % sample_rate == 0:
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+
+    @app.after_request
+    def finish_request_profile(response):
+        started = g.pop('profiling_start', None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        endpoint = request.endpoint or 'unknown'
+
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            name = '{}-{}-{}.prof'.format(
+                datetime.now().strftime('%Y%m%dT%H%M%S%f'), endpoint.replace('.', '_'), os.getpid()
+            )
+            profiler.dump_stats(os.path.join(profile_dir, name))
+            PROFILES.inc(endpoint)
+
+        REQUESTS.inc(request.method, endpoint, response.status_code)
+        REQUEST_DURATION.observe(elapsed, request.method, endpoint)
+        for name, seconds in (_local.phases or {}).items():
+            PHASE_DURATION.observe(seconds, endpoint, name)
+        if _local.statements:
+            DB_STATEMENTS.inc(endpoint, amount=_local.statements)
+        _local.phases = None
+        return response
+
+
+def render_metrics():
+    """Prometheus text exposition of this process's metrics"""
+    return METRICS.render()
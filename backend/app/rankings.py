@@ -0,0 +1,298 @@
+from datetime import date, datetime, timedelta
+from itertools import chain
+from sqlalchemy import exists, func
+from app.database import get_age_group
+from app.models import db, GameSession, Round, RoundScore, User, UserStats
+from app.state import get_state
+
+# Incrementally maintained leaderboards.
+# Points are added to ranked boards in the state backend as stats are
+# written (update_user_stats and the write-behind stats writer), so reading
+# the top of a board, a player's rank or the players around them never
+# sorts the user base. Boards:
+#
+#   all              - all-time points
+#   daily:<date>     - points scored that day (kept DAILY_BOARDS_KEPT days)
+#   weekly:<week>    - points scored that ISO week (kept WEEKLY_BOARDS_KEPT weeks)
+#   age:<age group>  - all-time points among players of one age group
+#
+# With the SQL backend the boards are rows of leaderboard_scores and are
+# written in the caller's transaction (the caller commits). The memory
+# backend starts empty, so it is rebuilt from the database on first read.
+# Ranks, neighbours and pages are O(log n) on both backends (see
+# app/state.py); the `after` cursor reads the next page without a rank.
+
+BOARD_KINDS = ('all', 'daily', 'weekly', 'age')
+AGE_GROUPS = ('5-7', '8-12', 'adult')
+DAILY_BOARDS_KEPT = 7
+WEEKLY_BOARDS_KEPT = 8
+MAX_BOARD_PAGE = 100
+MAX_AROUND = 25
+
+# SQLite's default limit on bound parameters per statement
+MAX_IDS_PER_QUERY = 500
+
+_age_groups = {}  # user_id -> age group (ages are set when a user is created)
+_expired_through = None  # day old boards were last expired for, in this process
+_memory_loaded = False
+
+
+def _boards_ready():
+    """False while memory boards have not been loaded (their points are in the database)"""
+    return get_state().name != 'memory' or _memory_loaded
+
+
+def _load_memory_boards():
+    global _memory_loaded
+    if not _boards_ready():
+        rebuild_leaderboards()
+        _memory_loaded = True
+
+
+def _day(when):
+    return when.date() if isinstance(when, datetime) else when
+
+
+def board_name(kind, when=None, age_group=None):
+    """
+    Storage name of a board
+
+    Args:
+        kind (str): One of BOARD_KINDS
+        when (datetime): Day or week of a daily/weekly board (default now)
+        age_group (str): Age group of an 'age' board
+
+    Returns:
+        str: e.g. 'all', 'daily:2024-05-01', 'weekly:2024-W18', 'age:8-12'
+
+    Raises:
+        ValueError: Unknown kind or age group
+    """
+
+    day = _day(when or datetime.now())
+    if kind == 'all':
+        return 'all'
+    if kind == 'daily':
+        return f'daily:{day.isoformat()}'
+    if kind == 'weekly':
+        year, week, _ = day.isocalendar()
+        return f'weekly:{year}-W{week:02d}'
+    if kind == 'age':
+        if age_group not in AGE_GROUPS:
+            raise ValueError(f"Unknown age group '{age_group}' (expected one of {list(AGE_GROUPS)})")
+        return f'age:{age_group}'
+    raise ValueError(f"Unknown board '{kind}' (expected one of {list(BOARD_KINDS)})")
+
+
+def user_age_groups(user_ids):
+    """Age group of each user, loading the ones not seen yet in one query per chunk"""
+    missing = [user_id for user_id in set(user_ids) if user_id not in _age_groups]
+    if len(_age_groups) + len(missing) > 100000:
+        _age_groups.clear()
+    for i in range(0, len(missing), MAX_IDS_PER_QUERY):
+        chunk = missing[i:i + MAX_IDS_PER_QUERY]
+        for user_id, age in db.session.query(User.id, User.age).filter(User.id.in_(chunk)):
+            _age_groups[user_id] = get_age_group(age) if age is not None else None
+    for user_id in missing:
+        _age_groups.setdefault(user_id, None)
+    return {user_id: _age_groups.get(user_id) for user_id in user_ids}
+
+
+def expire_old_boards(today=None):
+    """Drop daily and weekly boards that fell out of their retention window"""
+    today = _day(today or datetime.now())
+    state = get_state()
+    state.boards_expire('daily:', (today - timedelta(days=DAILY_BOARDS_KEPT - 1)).isoformat())
+    oldest_week = board_name('weekly', today - timedelta(weeks=WEEKLY_BOARDS_KEPT - 1))
+    state.boards_expire('weekly:', oldest_week[len('weekly:'):])
+
+
+def record_scores(points_by_user, when=None):
+    """
+    Add points to every board of each player (without committing)
+
+    Args:
+        points_by_user (dict): {user_id: points}; users with no points are skipped
+        when (datetime): When the points were scored (default now)
+    """
+    global _expired_through
+
+    scored = {user_id: points for user_id, points in points_by_user.items() if user_id and points}
+    if not scored or not _boards_ready():
+        return
+
+    when = when or datetime.now()
+    shared = [board_name('all'), board_name('daily', when), board_name('weekly', when)]
+    age_groups = user_age_groups(scored)
+    increments = []
+    for user_id, points in scored.items():
+        increments.extend((board, user_id, points) for board in shared)
+        if age_groups.get(user_id):
+            increments.append((board_name('age', age_group=age_groups[user_id]), user_id, points))
+    get_state().score_incr_many(increments)
+
+    if _expired_through != _day(when):
+        expire_old_boards(when)
+        _expired_through = _day(when)
+
+
+def _points(score):
+    # Boards store float scores; points are whole numbers
+    return int(score) if score is not None and float(score).is_integer() else score
+
+
+def _entries(ranked, first_rank):
+    """Leaderboard entries for [(user_id, points)] starting at a 0-based rank"""
+    user_ids = [user_id for user_id, _ in ranked]
+    names = dict(db.session.query(User.id, User.username).filter(User.id.in_(user_ids))) if user_ids else {}
+    return [
+        {'rank': first_rank + i + 1, 'user_id': user_id, 'username': names.get(user_id), 'points': _points(points)}
+        for i, (user_id, points) in enumerate(ranked)
+    ]
+
+
+def get_board(kind='all', limit=10, offset=0, age_group=None, when=None, after=None):
+    """
+    Top of a board
+
+    Args:
+        kind (str): One of BOARD_KINDS
+        limit (int): Entries to return (capped at MAX_BOARD_PAGE)
+        offset (int): Entries to skip
+        age_group (str): Age group of an 'age' board
+        when (datetime): Day or week of a daily/weekly board (default now)
+        after (int): Start after this player (the previous page's 'next')
+            instead of at offset
+
+    Returns:
+        dict: {'board': str, 'entries': list, 'next': cursor of the following
+            page or None}, ranks are 1-based
+    """
+
+    name = board_name(kind, when, age_group)
+    _load_memory_boards()
+    limit = max(1, min(limit, MAX_BOARD_PAGE))
+    state = get_state()
+    if after is None:
+        offset = max(0, offset)
+        ranked = state.top(name, offset, limit)
+    else:
+        ranked = state.top_after(name, after, limit)
+        if ranked is None:
+            raise ValueError(f"Player {after} is not on board {name}")
+        offset = state.rank(name, after) + 1 if ranked else 0
+    return {
+        'board': name,
+        'entries': _entries(ranked, offset),
+        'next': ranked[-1][0] if len(ranked) == limit else None
+    }
+
+
+def get_user_rank(user_id, kind='all', around=5, when=None):
+    """
+    A player's rank on a board and the players ranked around them
+
+    'age' boards use the player's own age group.
+
+    Args:
+        user_id (int): Player
+        kind (str): One of BOARD_KINDS
+        around (int): Players to include on each side (capped at MAX_AROUND)
+        when (datetime): Day or week of a daily/weekly board (default now)
+
+    Returns:
+        dict: {'board', 'user_id', 'rank' (1-based, None if the player has
+            no points on the board), 'points', 'around': list}
+    """
+
+    age_group = user_age_groups([user_id]).get(user_id) if kind == 'age' else None
+    if kind == 'age' and age_group is None:
+        return {'board': None, 'user_id': user_id, 'rank': None, 'points': None, 'around': []}
+
+    name = board_name(kind, when, age_group)
+    _load_memory_boards()
+    around = max(0, min(around, MAX_AROUND))
+    rank, neighbours = get_state().around(name, user_id, around)
+    points = next((p for member, p in neighbours if member == user_id), None)
+    first_rank = rank - neighbours.index((user_id, points)) if rank is not None else 0
+    return {
+        'board': name,
+        'user_id': user_id,
+        'rank': rank + 1 if rank is not None else None,
+        'points': _points(points),
+        'around': _entries(neighbours, first_rank)
+    }
+
+
+def rebuild_leaderboards(today=None):
+    """
+    Recompute every board from stored stats and rounds (without committing)
+
+    All-time and age group boards come from UserStats; daily and weekly
+    boards from the points of rounds guessed within their retention window,
+    credited to the session's player, or for multiplayer rounds to each
+    player from their RoundScore rows.
+
+    Returns:
+        dict: Members written per board kind
+    """
+
+    today = _day(today or datetime.now())
+    state = get_state()
+    first_day = min(today - timedelta(days=DAILY_BOARDS_KEPT - 1),
+                    today - timedelta(weeks=WEEKLY_BOARDS_KEPT - 1) - timedelta(days=today.weekday()))
+
+    for board in ['all'] + [board_name('age', age_group=group) for group in AGE_GROUPS]:
+        state.board_clear(board)
+    state.boards_expire('daily:', '9999')
+    state.boards_expire('weekly:', '9999')
+    _age_groups.clear()
+
+    written = dict.fromkeys(BOARD_KINDS, 0)
+    increments = []
+    for user_id, age, points in (
+        db.session.query(UserStats.user_id, User.age, UserStats.total_points)
+        .join(User, User.id == UserStats.user_id)
+        .filter(UserStats.total_points > 0)
+    ):
+        increments.append(('all', user_id, points))
+        written['all'] += 1
+        if age is not None:
+            increments.append((board_name('age', age_group=get_age_group(age)), user_id, points))
+            written['age'] += 1
+        if len(increments) >= 10000:
+            state.score_incr_many(increments)
+            increments = []
+
+    since = datetime.combine(first_day, datetime.min.time())
+    day = func.date(Round.guessed_at)
+    solo_rounds = (
+        db.session.query(GameSession.user_id, day, func.sum(Round.points_earned))
+        .join(GameSession, GameSession.id == Round.session_id)
+        .filter(Round.guessed_at >= since, Round.points_earned > 0, GameSession.user_id.isnot(None),
+                ~exists().where(RoundScore.round_id == Round.id))
+        .group_by(GameSession.user_id, day)
+    )
+    scored_day = func.date(RoundScore.scored_at)
+    room_rounds = (
+        db.session.query(RoundScore.user_id, scored_day, func.sum(RoundScore.points))
+        .filter(RoundScore.scored_at >= since, RoundScore.points > 0)
+        .group_by(RoundScore.user_id, scored_day)
+    )
+
+    daily = {}
+    weekly = {}
+    for user_id, scored_on, points in chain(solo_rounds, room_rounds):
+        scored_on = date.fromisoformat(scored_on) if isinstance(scored_on, str) else scored_on
+        if scored_on > today - timedelta(days=DAILY_BOARDS_KEPT):
+            key = (board_name('daily', scored_on), user_id)
+            daily[key] = daily.get(key, 0) + points
+        key = (board_name('weekly', scored_on), user_id)
+        weekly[key] = weekly.get(key, 0) + points
+    for boards in (daily, weekly):
+        increments.extend((board, user_id, points) for (board, user_id), points in boards.items())
+    written['daily'] = len(daily)
+    written['weekly'] = len(weekly)
+
+    state.score_incr_many(increments)
+    return written
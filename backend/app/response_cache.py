@@ -0,0 +1,182 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, make_response, request
+
+# Response cache for read-heavy endpoints.
+# Serialized 200 responses are kept per endpoint and query arguments for a TTL.
+# Each cached view names the data it reads as tags ('users', 'stats',
+# 'games', 'words'); writes call invalidate() with the tags they change, so
+# the next request recomputes instead of serving stale data. Responses carry
+# a strong ETag, and If-None-Match is answered with 304 on hits and misses.
+#
+# The cache is per process: writes made by another worker become visible
+# here when the TTL runs out.
+
+TAGS = ('users', 'stats', 'games', 'words')
+
+
+class _Entry:
+    __slots__ = ('body', 'mimetype', 'etag', 'expires_at', 'generations')
+
+    def __init__(self, body, mimetype, etag, expires_at, generations):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = etag
+        self.expires_at = expires_at
+        self.generations = generations
+
+
+class ResponseCache:
+    """LRU of serialized responses with a TTL and tag invalidation"""
+
+    def __init__(self, ttl=10.0, maxsize=256):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._generations = dict.fromkeys(TAGS, 0)
+        self._stats = {}  # endpoint -> [hits, misses, not_modified]
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def _count(self, endpoint, index):
+        counts = self._stats.get(endpoint)
+        if counts is None:
+            counts = self._stats[endpoint] = [0, 0, 0]
+        counts[index] += 1
+
+    def get(self, key, endpoint, tags):
+        """Cached entry for key if it is fresh and none of its tags changed, else None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if (entry is not None and entry.expires_at > time.monotonic()
+                    and entry.generations == tuple(self._generations[tag] for tag in tags)):
+                self._entries.move_to_end(key)
+                self._count(endpoint, 0)
+                return entry
+            self._count(endpoint, 1)
+            return None
+
+    def generations(self, tags):
+        """Snapshot to store with a response computed from now on"""
+        with self._lock:
+            return tuple(self._generations[tag] for tag in tags)
+
+    def put(self, key, body, mimetype, generations):
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        entry = _Entry(body, mimetype, etag, time.monotonic() + self.ttl, generations)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def not_modified(self, endpoint):
+        with self._lock:
+            self._count(endpoint, 2)
+
+    def invalidate(self, *tags):
+        """Make every cached response that reads one of the tags stale"""
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] += 1
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+            self.invalidations = 0
+
+    def info(self):
+        """Hit/miss counters and hit ratios, overall and per endpoint"""
+        with self._lock:
+            info = {'size': len(self._entries), 'maxsize': self.maxsize, 'invalidations': self.invalidations}
+            totals = [0, 0, 0]
+            for endpoint, counts in self._stats.items():
+                name = endpoint.rsplit('.', 1)[-1]
+                info[f'{name}_hits'], info[f'{name}_misses'], info[f'{name}_not_modified'] = counts
+                info[f'{name}_hit_ratio'] = counts[0] / (counts[0] + counts[1])
+                totals = [t + c for t, c in zip(totals, counts)]
+            info['hits'], info['misses'], info['not_modified'] = totals
+            info['hit_ratio'] = totals[0] / (totals[0] + totals[1]) if totals[0] + totals[1] else 0.0
+            return info
+
+
+_cache = None
+
+
+def configure_response_cache(ttl=10.0, maxsize=256):
+    """Start caching the decorated endpoints (called once at app start-up)"""
+    global _cache
+    _cache = ResponseCache(ttl=ttl, maxsize=maxsize)
+    return _cache
+
+
+def disable_response_cache():
+    """Serve every request from the view again"""
+    global _cache
+    _cache = None
+
+
+def get_response_cache():
+    """Get the shared cache, or None when caching is disabled"""
+    return _cache
+
+
+def response_cache_info():
+    """The shared cache's counters for /api/metrics (empty when disabled)"""
+    return _cache.info() if _cache is not None else {}
+
+
+def invalidate(*tags):
+    """Called after writes: drop cached responses that read any of the tags"""
+    if _cache is not None:
+        _cache.invalidate(*tags)
+
+
+def cached_response(*tags):
+    """
+    Cache a GET view's 200 responses and answer conditional requests
+
+    Args:
+        tags: Data the view reads (see TAGS); invalidate() with any of them
+            makes its cached responses stale
+    """
+
+    unknown = set(tags) - set(TAGS)
+    if unknown:
+        raise ValueError(f"Unknown cache tags {sorted(unknown)} (expected some of {list(TAGS)})")
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = _cache
+            if cache is None:
+                return view(*args, **kwargs)
+
+            endpoint = request.endpoint
+            key = (endpoint, tuple(sorted(request.args.items(multi=True))))
+            entry = cache.get(key, endpoint, tags)
+            if entry is None:
+                # Snapshot before computing, so a write during the view leaves the entry stale
+                generations = cache.generations(tags)
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.direct_passthrough:
+                    return response
+                entry = cache.put(key, response.get_data(), response.mimetype, generations)
+
+            response = Response(entry.body, mimetype=entry.mimetype)
+            response.set_etag(entry.etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            response = response.make_conditional(request)
+            if response.status_code == 304:
+                cache.not_modified(endpoint)
+            return response
+
+        return wrapper
+
+    return decorator
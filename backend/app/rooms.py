@@ -0,0 +1,451 @@
+import asyncio
+import json
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from app.guess_processor import process_guess
+from app.websocket import encode_text
+
+logger = logging.getLogger(__name__)
+
+# Multiplayer rooms.
+# Every room lives in memory on one asyncio loop: players, the live round,
+# the word being guessed and per-player scores. Guesses are judged on the
+# loop and broadcast straight away. Database work goes through the store
+# on a single background thread, in order. Only creating a session and a
+# round is awaited (the round id and image are needed); guesses and round
+# results are fire-and-forget. A room's rounds belong to the host's session,
+# so each player's points are also stored per round (RoundScore) for the
+# daily and weekly leaderboards.
+#
+# Client -> server messages (JSON text frames):
+#   {"type": "join", "room": "abc", "user_id": 1, "name": "Ana"}
+#   {"type": "start", "rounds": 5, "age_group": "adult", "difficulty": "medium", "language": "en"}
+#   {"type": "guess", "guess": "cat"}
+#   {"type": "leave"}
+# Server -> client: joined, player_joined, player_left, game_started, round,
+# tick, guess_result (to the guesser), player_guessed (to everyone else),
+# round_end, game_over, error.
+
+LOBBY = 'lobby'
+STARTING = 'starting'
+PLAYING = 'playing'
+BREAK = 'break'
+
+MAX_ROUNDS = 50
+
+
+class Player:
+    __slots__ = ('user_id', 'name', 'socket', 'score', 'solved', 'guesses')
+
+    def __init__(self, user_id, name, socket):
+        self.user_id = user_id
+        self.name = name
+        self.socket = socket
+        self.score = 0
+        self.solved = False
+        self.guesses = 0
+
+
+class Room:
+    """One shared game: players guess the same round at the same time"""
+
+    def __init__(self, code, manager):
+        self.code = code
+        self.manager = manager
+        self.players = {}
+        self.host_id = None
+        self.state = LOBBY
+        self.session_id = None
+        self.total_rounds = 0
+        self.round_number = 0
+        self.round = None
+        self.round_started = 0.0
+        self.deadline = 0.0
+        self.break_until = 0.0
+        self.round_guesses = 0
+        self.round_points = 0
+        self.round_scores = {}  # user_id -> (points, scored_at) this round
+        self.guessed_at = None
+
+    # ---- messaging ----
+
+    def broadcast(self, message, exclude=None):
+        frame = encode_text(json.dumps(message))
+        for player in list(self.players.values()):
+            if player.user_id != exclude:
+                self.manager.send_frame(player.socket, frame)
+
+    def send(self, player, message):
+        self.manager.send_frame(player.socket, encode_text(json.dumps(message)))
+
+    def scores(self):
+        return sorted(
+            ({'user_id': p.user_id, 'name': p.name, 'score': p.score} for p in self.players.values()),
+            key=lambda s: -s['score']
+        )
+
+    def snapshot(self, now):
+        round_data = None
+        if self.round and self.state == PLAYING:
+            round_data = dict(self.public_round(), remaining=max(0, math.ceil(self.deadline - now)))
+        return {
+            'room': self.code,
+            'state': self.state,
+            'host_id': self.host_id,
+            'round_number': self.round_number,
+            'total_rounds': self.total_rounds,
+            'round': round_data,
+            'players': self.scores(),
+        }
+
+    def public_round(self):
+        return {
+            'round_id': self.round['round_id'],
+            'round_number': self.round_number,
+            'image_url': self.round['image_url'],
+            'hint': self.round['hint'],
+            'timer_seconds': self.round['timer_seconds'],
+        }
+
+    # ---- membership ----
+
+    def join(self, player, now):
+        previous = self.players.get(player.user_id)
+        if previous is not None and previous.socket is not player.socket:
+            # Reconnect: keep the score, drop the old socket
+            player.score, player.solved, player.guesses = previous.score, previous.solved, previous.guesses
+            self.manager.close_socket(previous.socket)
+        self.players[player.user_id] = player
+        if self.host_id is None:
+            self.host_id = player.user_id
+        self.send(player, dict(self.snapshot(now), type='joined'))
+        self.broadcast({'type': 'player_joined', 'user_id': player.user_id, 'name': player.name},
+                       exclude=player.user_id)
+
+    def leave(self, player):
+        if self.players.get(player.user_id) is not player:
+            return
+        del self.players[player.user_id]
+        if self.host_id == player.user_id:
+            self.host_id = next(iter(self.players), None)
+        self.broadcast({'type': 'player_left', 'user_id': player.user_id, 'host_id': self.host_id})
+        if not self.players:
+            self.close()
+        elif self.state == PLAYING and all(p.solved for p in self.players.values()):
+            self._end_round(self.manager.now())
+
+    def close(self):
+        if self.session_id is not None and self.state != LOBBY:
+            self.manager.persist(self.manager.store.finish_game, self.session_id)
+        self.state = LOBBY
+        self.session_id = None
+        self.manager.rooms.pop(self.code, None)
+
+    # ---- game flow ----
+
+    def start(self, player, options):
+        if player.user_id != self.host_id:
+            return self.send(player, {'type': 'error', 'error': 'Only the host can start the game'})
+        if self.state != LOBBY:
+            return self.send(player, {'type': 'error', 'error': 'Game already running'})
+        try:
+            rounds = int(options.get('rounds', 10))
+        except (TypeError, ValueError):
+            return self.send(player, {'type': 'error', 'error': 'rounds must be a whole number'})
+        for key in ('age_group', 'difficulty', 'language'):
+            if not isinstance(options.get(key, ''), str):
+                return self.send(player, {'type': 'error', 'error': f'{key} must be a string'})
+
+        self.state = STARTING
+        self.total_rounds = max(1, min(rounds, MAX_ROUNDS))
+        self.round_number = 0
+        for p in self.players.values():
+            p.score = 0
+        self.manager.spawn(self._start_game(options))
+
+    async def _start_game(self, options):
+        try:
+            self.session_id = await self.manager.call_store(
+                self.manager.store.create_session,
+                self.host_id,
+                options.get('age_group', 'adult'),
+                options.get('difficulty', 'medium'),
+                options.get('language', 'en'),
+                self.total_rounds
+            )
+        except Exception as e:
+            self.state = LOBBY
+            self.broadcast({'type': 'error', 'error': str(e)})
+            return
+        if self.manager.rooms.get(self.code) is not self:
+            # Everyone left while the session was being created
+            self.manager.persist(self.manager.store.finish_game, self.session_id)
+            return
+        self.broadcast({'type': 'game_started', 'session_id': self.session_id, 'total_rounds': self.total_rounds})
+        await self._next_round()
+
+    async def _next_round(self):
+        self.state = STARTING
+        try:
+            round_data = await self.manager.call_store(self.manager.store.start_round, self.session_id)
+        except Exception as e:
+            self.broadcast({'type': 'error', 'error': str(e)})
+            round_data = None
+        if self.manager.rooms.get(self.code) is not self:
+            return
+        if not round_data:
+            return self._finish_game()
+
+        now = self.manager.now()
+        self.round = round_data
+        self.round_number += 1
+        self.deadline = now + round_data['timer_seconds']
+        self.round_started = now
+        self.round_guesses = 0
+        self.round_points = 0
+        self.round_scores = {}
+        self.guessed_at = None
+        for p in self.players.values():
+            p.solved = False
+            p.guesses = 0
+        self.state = PLAYING
+        self.broadcast(dict(self.public_round(), type='round', total_rounds=self.total_rounds))
+
+    def guess(self, player, text, now):
+        if self.state != PLAYING:
+            return self.send(player, {'type': 'error', 'error': 'No round in progress'})
+        if player.solved:
+            return self.send(player, {'type': 'error', 'error': 'Already guessed this round'})
+
+        # Server clock, not the client's
+        time_taken = round(now - self.round_started, 2)
+        result = process_guess(
+            user_guess=(text or '').strip(),
+            correct_word=self.round['word'],
+            time_taken=time_taken,
+            max_time=self.round['timer_seconds'],
+            word_id=self.round['word_id']
+        )
+        points = self.manager.store.score(time_taken, result['match_type']) if result['is_correct'] else 0
+
+        player.guesses += 1
+        self.round_guesses += 1
+        if result['is_correct']:
+            player.solved = True
+            player.score += points
+            self.round_points += points
+            self.round_scores[player.user_id] = (points, datetime.now())
+            if self.guessed_at is None:
+                self.guessed_at = self.round_scores[player.user_id][1]
+
+        self.manager.persist(self.manager.store.record_guess, self.round['round_id'], player.user_id,
+                             text, result['is_correct'], result['match_type'], time_taken, points)
+
+        self.send(player, {
+            'type': 'guess_result',
+            'is_correct': result['is_correct'],
+            'match_type': result['match_type'],
+            'points': points,
+            'time_taken': time_taken,
+            'correct_answer': self.round['word'] if result['is_correct'] else None,
+            # The single-player message names the answer on a miss; others are still guessing
+            'message': result['message'] if result['is_correct'] else 'Not quite, try again!',
+        })
+        self.broadcast({
+            'type': 'player_guessed',
+            'user_id': player.user_id,
+            'is_correct': result['is_correct'],
+            'points': points,
+        }, exclude=player.user_id)
+
+        if all(p.solved for p in self.players.values()):
+            self._end_round(now)
+
+    def _end_round(self, now):
+        self.state = BREAK
+        self.break_until = now + self.manager.round_break
+        self.manager.persist(self.manager.store.finish_round, self.round['round_id'], self.round_number,
+                             self.round_guesses, self.guessed_at, self.round_points, dict(self.round_scores))
+        self.broadcast({
+            'type': 'round_end',
+            'round_number': self.round_number,
+            'correct_answer': self.round['word'],
+            'scores': self.scores(),
+        })
+
+    def _finish_game(self):
+        self.manager.persist(self.manager.store.finish_game, self.session_id)
+        self.broadcast({'type': 'game_over', 'session_id': self.session_id, 'scores': self.scores()})
+        self.state = LOBBY
+        self.session_id = None
+        self.round = None
+
+    def tick(self, now):
+        """Called by the game loop once per tick"""
+        if self.state == PLAYING:
+            remaining = self.deadline - now
+            if remaining <= 0:
+                self._end_round(now)
+            else:
+                self.broadcast({'type': 'tick', 'remaining': math.ceil(remaining), 'ts': self.manager.wall_time()})
+        elif self.state == BREAK and now >= self.break_until:
+            if self.round_number >= self.total_rounds:
+                self._finish_game()
+            else:
+                self.state = STARTING
+                self.manager.spawn(self._next_round())
+
+
+class RoomManager:
+    """
+    All rooms of one server process, plus the game loop that drives them
+
+    Args:
+        store: Persistence object (create_session, start_round, record_guess,
+            finish_round, finish_game, score); all but score are run on
+            a background thread. finish_round also gets each scoring
+            player's {user_id: (points, scored_at)}
+        tick_interval (float): Seconds between timer ticks
+        round_break (float): Pause between rounds
+        max_buffered_bytes (int): Sockets with more unsent data are dropped
+        max_players (int): Players per room
+    """
+
+    def __init__(self, store, tick_interval=1.0, round_break=3.0, max_buffered_bytes=256 * 1024, max_players=100):
+        self.store = store
+        self.tick_interval = tick_interval
+        self.round_break = round_break
+        self.max_buffered_bytes = max_buffered_bytes
+        self.max_players = max_players
+        self.rooms = {}
+        self.connections = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='room-store')
+        self._tasks = set()
+
+    def now(self):
+        return asyncio.get_running_loop().time()
+
+    @staticmethod
+    def wall_time():
+        return round(datetime.now().timestamp(), 3)
+
+    def spawn(self, coro):
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def call_store(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def persist(self, fn, *args):
+        """Queue a write on the store thread without waiting for it"""
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(_report_store_error)
+
+    def send_frame(self, socket, frame):
+        if socket.buffered_bytes > self.max_buffered_bytes:
+            # Slow reader: drop it rather than buffer without bound
+            self.close_socket(socket)
+            return
+        try:
+            socket.send_frame(frame)
+        except (ConnectionError, RuntimeError):
+            self.close_socket(socket)
+
+    def close_socket(self, socket):
+        if not socket.closed:
+            self.spawn(socket.close())
+
+    async def handle(self, socket):
+        """Serve one connection until it closes"""
+        self.connections += 1
+        player = None
+        room = None
+        try:
+            while True:
+                text = await socket.recv()
+                if text is None:
+                    break
+                try:
+                    message = json.loads(text)
+                    kind = message.get('type')
+                except (ValueError, AttributeError):
+                    socket.send_text(json.dumps({'type': 'error', 'error': 'Invalid message'}))
+                    continue
+
+                try:
+                    if kind == 'join':
+                        if room is not None:
+                            room.leave(player)
+                        player, room = self._join(socket, message)
+                    elif room is None:
+                        socket.send_text(json.dumps({'type': 'error', 'error': 'Join a room first'}))
+                    elif kind == 'guess':
+                        room.guess(player, str(message.get('guess', ''))[:100], self.now())
+                    elif kind == 'start':
+                        room.start(player, message)
+                    elif kind == 'leave':
+                        room.leave(player)
+                        player = room = None
+                    else:
+                        socket.send_text(json.dumps({'type': 'error', 'error': f'Unknown message type {kind!r}'}))
+                except Exception:
+                    # One bad message must not drop the connection
+                    logger.exception("Room message error (%r)", kind)
+                    socket.send_text(json.dumps({'type': 'error', 'error': 'Could not handle the message'}))
+        finally:
+            self.connections -= 1
+            if room is not None:
+                room.leave(player)
+            await socket.close()
+
+    def _join(self, socket, message):
+        code = str(message.get('room', ''))[:64]
+        user_id = message.get('user_id')
+        if not code or not isinstance(user_id, int):
+            socket.send_text(json.dumps({'type': 'error', 'error': 'room and user_id are required'}))
+            return None, None
+
+        room = self.rooms.get(code)
+        if room is None:
+            room = self.rooms[code] = Room(code, self)
+        if len(room.players) >= self.max_players and user_id not in room.players:
+            socket.send_text(json.dumps({'type': 'error', 'error': 'Room is full'}))
+            return None, None
+
+        player = Player(user_id, str(message.get('name') or f'player{user_id}')[:50], socket)
+        room.join(player, self.now())
+        return player, room
+
+    async def run(self):
+        """Game loop: timer ticks, round timeouts and the pause between rounds"""
+        while True:
+            await asyncio.sleep(self.tick_interval)
+            now = self.now()
+            for room in list(self.rooms.values()):
+                try:
+                    room.tick(now)
+                except Exception:
+                    logger.exception("Room %s tick error", room.code)
+
+    def stats(self):
+        return {
+            'connections': self.connections,
+            'rooms': len(self.rooms),
+            'playing': sum(1 for r in self.rooms.values() if r.state == PLAYING),
+        }
+
+    def close(self):
+        """Finish running games and wait for queued writes"""
+        for room in list(self.rooms.values()):
+            room.close()
+        self._executor.shutdown(wait=True)
+
+
+def _report_store_error(future):
+    error = future.exception()
+    if error is not None:
+        logger.error("Room store error: %s", error, exc_info=error)
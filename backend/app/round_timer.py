@@ -0,0 +1,241 @@
+import atexit
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import bindparam
+from app.models import db, Round
+from app.state import get_state
+
+# Server-side round timer.
+# Each new round's deadline (started_at + duration_seconds) goes into the
+# state backend (app/state.py): a heap in this process, or a shared table
+# that every worker sweeps. A background thread claims whatever has expired
+# and closes those rounds in one executemany UPDATE that sets ended_at, in
+# the same transaction as the claim. Requests never scan for open rounds: a
+# guess checks its own round's deadline, and the sweeper does the closing.
+# Between sweeps the thread sleeps until the next deadline, so an idle
+# worker does not poll the database.
+
+DEFAULT_DURATION = 60
+GRACE_SECONDS = 1.0  # accepted lateness for guesses in flight at the deadline
+MAX_SLEEP_SECONDS = 30.0  # longest sleep without a known deadline
+
+
+def round_deadline(round_obj):
+    """When a round's timer runs out"""
+    return round_obj.started_at + timedelta(seconds=round_obj.duration_seconds or DEFAULT_DURATION)
+
+
+def elapsed_seconds(round_obj, now=None):
+    """Seconds since the round started, capped at its duration"""
+    duration = round_obj.duration_seconds or DEFAULT_DURATION
+    elapsed = ((now or datetime.now()) - round_obj.started_at).total_seconds()
+    return round(min(max(elapsed, 0.0), duration), 2)
+
+
+def is_round_over(round_obj, now=None):
+    """True once the round was closed or its deadline (plus grace) has passed"""
+    if round_obj.ended_at is not None:
+        return True
+    now = now or datetime.now()
+    return now > round_deadline(round_obj) + timedelta(seconds=GRACE_SECONDS)
+
+
+class RoundTimer:
+    """Closes rounds when their deadline passes, in batches"""
+
+    def __init__(self, app, min_interval=0.5, max_batch=1000):
+        self.app = app
+        self.min_interval = min_interval
+        self.max_batch = max_batch
+        self.closed_count = 0
+
+        self._scheduled = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._soonest = float('inf')  # earliest deadline scheduled here since the last sweep began
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name='round-timer', daemon=True)
+        self._thread.start()
+
+    def schedule(self, round_id, deadline):
+        """
+        Close a round at its deadline (with the SQL backend the caller commits)
+
+        Args:
+            round_id (int): Round to close
+            deadline (datetime): When its timer runs out
+        """
+        get_state().deadline_add(round_id, deadline.timestamp())
+        with self._lock:
+            self._soonest = min(self._soonest, deadline.timestamp())
+        self._scheduled.set()
+        self._wake.set()
+
+    def pending_count(self):
+        with self.app.app_context():
+            try:
+                return get_state().deadline_count()
+            finally:
+                db.session.remove()
+
+    def recover(self, page_size=1000):
+        """
+        Pick up open rounds that have no deadline yet (from before the timer existed)
+
+        Walks rounds with no ended_at in id order, a page at a time: expired
+        ones are closed straight away, live ones are scheduled.
+
+        Returns:
+            int: Open rounds found
+        """
+        table = Round.__table__
+        found = 0
+        last_id = 0
+        while not self._closed:
+            page = table.select().with_only_columns(
+                table.c.id, table.c.started_at, table.c.duration_seconds
+            ).where(table.c.ended_at.is_(None), table.c.id > last_id).order_by(table.c.id).limit(page_size)
+
+            with self.app.app_context():
+                try:
+                    rows = db.session.execute(page).all()
+                    if not rows:
+                        break
+                    self._close_or_reschedule([round_id for round_id, _, _ in rows])
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    raise
+                finally:
+                    db.session.remove()
+            found += len(rows)
+            last_id = rows[-1][0]
+        return found
+
+    def _close_or_reschedule(self, round_ids):
+        """
+        Set ended_at to each expired round's deadline, in one UPDATE
+
+        Deadlines are re-read from the rounds, so a round whose duration was
+        extended after it was scheduled is rescheduled instead.
+        """
+        table = Round.__table__
+        current = table.select().with_only_columns(
+            table.c.id, table.c.started_at, table.c.duration_seconds
+        ).where(table.c.id.in_(round_ids), table.c.ended_at.is_(None))
+        statement = table.update().where(
+            table.c.id == bindparam('round_id'), table.c.ended_at.is_(None)
+        ).values(ended_at=bindparam('deadline'))
+
+        now = datetime.now()
+        expired = []
+        for round_id, started_at, duration in db.session.execute(current):
+            deadline = started_at + timedelta(seconds=duration or DEFAULT_DURATION)
+            if deadline <= now:
+                expired.append({'round_id': round_id, 'deadline': deadline})
+            else:
+                get_state().deadline_add(round_id, deadline.timestamp())
+        if expired:
+            db.session.execute(statement, expired)
+        return len(expired)
+
+    def sweep(self):
+        """Claim expired deadlines and close their rounds; returns the number claimed"""
+        with self.app.app_context():
+            try:
+                due = get_state().deadlines_pop_due(datetime.now().timestamp(), self.max_batch)
+                if due:
+                    self.closed_count += self._close_or_reschedule([round_id for _, round_id in due])
+                db.session.commit()
+            except Exception:
+                # The claim is rolled back too, so the rounds are retried (SQL backend)
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
+        return len(due)
+
+    def _run(self):
+        # Start once the app starts rounds, so start-up and CLI commands run no SQL
+        self._scheduled.wait()
+        if self._closed:
+            return
+        try:
+            self.recover()
+        except Exception as e:
+            print(f"Round timer recovery error: {e}", flush=True)
+
+        while not self._closed:
+            with self._lock:
+                self._soonest = float('inf')
+            next_deadline = None
+            try:
+                if self.sweep() >= self.max_batch:
+                    continue
+                next_deadline = self.next_deadline()
+            except Exception as e:
+                print(f"Round timer error: {e}", flush=True)
+            self._sleep_until(next_deadline)
+
+    def next_deadline(self):
+        """Earliest pending deadline (epoch seconds), or None"""
+        with self.app.app_context():
+            try:
+                return get_state().deadline_next()
+            finally:
+                db.session.remove()
+
+    def _sleep_until(self, next_deadline):
+        """
+        Sleep until next_deadline, or an earlier one scheduled meanwhile
+
+        Sleeps at least min_interval, so rounds expiring within min_interval
+        of each other share one UPDATE, and at most MAX_SLEEP_SECONDS, which
+        bounds how long rounds scheduled by a worker that died wait.
+        """
+        started = time.time()
+        while not self._closed:
+            with self._lock:
+                wake_at = min(next_deadline or float('inf'), self._soonest, started + MAX_SLEEP_SECONDS)
+                self._wake.clear()
+            delay = max(wake_at, started + self.min_interval) - time.time()
+            if delay <= 0 or not self._wake.wait(delay):
+                return
+
+    def close(self):
+        """Stop the background thread; open rounds are swept by the next process"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._scheduled.set()
+        self._thread.join(timeout=5)
+
+
+_timer = None
+
+
+def configure_round_timer(app, min_interval=0.5, max_batch=1000):
+    """Start the shared timer (called once at app start-up)"""
+    global _timer
+    if _timer is not None:
+        _timer.close()
+    _timer = RoundTimer(app, min_interval=min_interval, max_batch=max_batch)
+    atexit.register(_timer.close)
+    return _timer
+
+
+def disable_round_timer():
+    """Stop the shared timer"""
+    global _timer
+    if _timer is not None:
+        _timer.close()
+    _timer = None
+
+
+def schedule_round(round_obj):
+    """Register a newly started round's deadline with the timer, if it runs"""
+    if _timer is not None:
+        _timer.schedule(round_obj.id, round_deadline(round_obj))
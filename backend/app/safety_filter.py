@@ -0,0 +1,169 @@
+import glob
+import os
+import threading
+from collections import deque
+
+# Multi-pattern safety filter.
+# Blocklist terms are compiled once into an Aho-Corasick automaton, so
+# checking a word is a single pass over its characters no matter how many
+# terms are loaded. Terms come from *.txt files in BLOCKLIST_DIR; the file
+# name prefix before the first '_' is the category ('nsfw_en.txt' -> 'nsfw').
+# Terms match as substrings, or with whole_words only where they are not
+# part of a longer word ('hate' is in "hate it" but not in "whatever").
+
+DEFAULT_BLOCKLIST_DIR = os.path.join(os.path.dirname(__file__), 'blocklists')
+
+
+class PatternAutomaton:
+    """Aho-Corasick automaton over case-folded patterns"""
+
+    def __init__(self, patterns):
+        """
+        Args:
+            patterns (iterable): (pattern, category) pairs
+        """
+        self._goto = [{}]
+        self._fail = [0]
+        # (length, category) of every pattern ending at a state (including via fail links)
+        self._output = [frozenset()]
+        self.pattern_count = 0
+
+        outputs = [set()]
+        for pattern, category in patterns:
+            pattern = pattern.casefold()
+            if not pattern:
+                continue
+            state = 0
+            for c in pattern:
+                next_state = self._goto[state].get(c)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][c] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append(set())
+                state = next_state
+            outputs[state].add((len(pattern), category))
+            self.pattern_count += 1
+
+        # Breadth-first so fail targets are finished before they are used
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for c, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and c not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(c, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                outputs[next_state] |= outputs[self._fail[next_state]]
+
+        self._output = [frozenset(o) for o in outputs]
+
+    def find_categories(self, text, categories=None, whole_words=False):
+        """
+        Categories of every pattern occurring in text
+
+        Args:
+            text (str): Text to scan
+            categories (iterable): Stop as soon as one of these is found
+            whole_words (bool): Skip occurrences inside a longer word
+
+        Returns:
+            set: Matched categories
+        """
+        wanted = set(categories) if categories is not None else None
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        found = set()
+
+        text = text.casefold()
+        state = 0
+        for end, c in enumerate(text, 1):
+            while state and c not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(c, 0)
+            if output[state]:
+                if whole_words and end < len(text) and text[end].isalnum():
+                    continue
+                for length, category in output[state]:
+                    if not whole_words or end == length or not text[end - length - 1].isalnum():
+                        found.add(category)
+                if wanted is not None and found & wanted:
+                    return found
+        return found
+
+    def matches(self, text, categories=None, whole_words=False):
+        """True if text contains any pattern (optionally only of given categories)"""
+        found = self.find_categories(text, categories, whole_words)
+        if categories is None:
+            return bool(found)
+        return bool(found & set(categories))
+
+
+def load_blocklists(directory=DEFAULT_BLOCKLIST_DIR):
+    """
+    Read (term, category) pairs from blocklist files
+
+    Args:
+        directory (str): Folder of *.txt files, one term per line, '#' comments
+
+    Returns:
+        list: (term, category) pairs
+    """
+    patterns = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.txt'))):
+        category = os.path.basename(path).split('_', 1)[0].rsplit('.', 1)[0]
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                term = line.strip()
+                if term and not term.startswith('#'):
+                    patterns.append((term, category))
+    return patterns
+
+
+_automaton = None
+_lock = threading.RLock()
+
+
+def configure_safety_filter(directory=None, patterns=None):
+    """
+    Rebuild the shared automaton from a blocklist folder or explicit patterns
+
+    Args:
+        directory (str): Blocklist folder (defaults to BLOCKLIST_DIR env or the bundled lists)
+        patterns (list): (term, category) pairs, used instead of directory
+    """
+    global _automaton
+    if patterns is None:
+        patterns = load_blocklists(directory or os.getenv('BLOCKLIST_DIR', DEFAULT_BLOCKLIST_DIR))
+    automaton = PatternAutomaton(patterns)
+    with _lock:
+        _automaton = automaton
+    return automaton
+
+
+def get_safety_filter():
+    """Get the shared automaton, building it from the blocklists on first use"""
+    if _automaton is None:
+        with _lock:
+            if _automaton is None:
+                configure_safety_filter()
+    return _automaton
+
+
+def contains_blocked_term(text, categories=None, whole_words=False):
+    """
+    Check text against the loaded blocklists
+
+    Args:
+        text (str): Text to check
+        categories (iterable): Only these categories (e.g. ['nsfw']); all if None
+        whole_words (bool): Only count terms that are not part of a longer word
+
+    Returns:
+        bool: True if a blocked term occurs in text
+    """
+    return get_safety_filter().matches(text, categories, whole_words)
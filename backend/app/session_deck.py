@@ -0,0 +1,63 @@
+import random
+from app.state import get_state
+from app.word_selector import get_catalog, resolve_pool
+
+# Per-session no-repeat word decks.
+# A deck is a random sample (without replacement) of the session's word pool,
+# kept in the state backend (app/state.py) so every worker draws from the
+# same deck. Each round pops the next index in one atomic step, so no Round
+# history has to be read to avoid repeats. Decks hold catalog indices, so
+# each is stored with the WordCatalog.version it was dealt from; a deck from
+# another version of WORD_DATABASE is never drawn from, it is dealt again.
+
+
+def deal_deck(session, rng=random, position=0):
+    """
+    Shuffle a new deck for a session
+
+    Args:
+        session (GameSession): Session to deal for
+        rng: Random source
+        position (int): Cards already drawn (1 deals and draws the first)
+
+    Returns:
+        list: Word catalog indices of the deck
+    """
+
+    catalog = get_catalog()
+    age_group, difficulty = resolve_pool(session.age_group, session.difficulty)
+    indices = catalog.sample(age_group, difficulty, session.total_rounds or 10, rng=rng)
+    get_state().deck_deal(session.id, indices, position=position, version=catalog.version)
+    return indices
+
+
+def draw_deck_word(session, peek=0, rng=random):
+    """
+    Pop the next word from a session's deck and look at the ones after it
+
+    Deals a new deck the first time, whenever the deck runs out (sessions
+    with more rounds than the pool has words) and when the deck was dealt
+    from another catalog version. With the SQL backend the caller commits.
+
+    Args:
+        session (GameSession): Session to draw for
+        peek (int): Upcoming words to return as well (for image prefetching)
+        rng: Random source
+
+    Returns:
+        tuple: (word data as returned by select_word or None if the pool is
+            empty, list of up to peek upcoming word names)
+    """
+
+    catalog = get_catalog()
+    index, upcoming = get_state().deck_pop(session.id, peek=peek, version=catalog.version)
+    if index is None:
+        indices = deal_deck(session, rng=rng, position=1)
+        if not indices:
+            return None, []
+        index, upcoming = indices[0], list(indices[1:1 + peek])
+
+    age_group, difficulty = resolve_pool(session.age_group, session.difficulty)
+    words = [catalog.words[i]['word'] for i in upcoming]
+    return catalog.word_details(index, age_group, difficulty), words
+
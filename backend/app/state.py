@@ -0,0 +1,687 @@
+import functools
+import heapq
+import random
+import threading
+import time
+from array import array
+from sqlalchemy import and_, bindparam, case, delete, func, select, union_all, update
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models import db, LeaderboardCount, LeaderboardScore, RateCounter, RoundDeadline, SessionDeck
+
+# Pluggable game state.
+# Session decks, round deadlines, leaderboards and rate counters go through
+# one small interface, so the app behaves the same whether it runs as one
+# process or as several workers behind a load balancer:
+#
+#   'memory' - MemoryState, dicts, heaps and skip lists in this process
+#              (one worker only)
+#   'sql'    - SQLState, tables in the app database shared by every worker;
+#              every operation is a single atomic statement, except score
+#              increments, which lock the rows they change
+#
+# SQLState works on db.session, so its writes commit with the caller's
+# transaction like any other model change (the caller commits).
+#
+# Leaderboards rank in O(log n) on both: MemoryState with a skip list,
+# SQLState with a rank tree of per-prefix counts in leaderboard_counts (see
+# rank_key), so rank, around and a page at any offset read a bounded number
+# of index rows. SQLState ranks whole-point scores only.
+
+BACKENDS = ('memory', 'sql')
+DEFAULT_BACKEND = 'sql'
+# SQLState's upserts (ON CONFLICT) and RETURNING
+UPSERT_DIALECTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+
+def pack_indices(indices):
+    """Pack word indices into bytes (uint32)"""
+    return array('I', indices).tobytes()
+
+
+def unpack_indices(data):
+    """Unpack bytes from pack_indices"""
+    indices = array('I')
+    indices.frombytes(data or b'')
+    return indices
+
+
+# SQLState's rank tree. An entry's rank key packs its score above its
+# member (inverted, so ties rank by lower member) into 63 bits; a higher key
+# ranks first. leaderboard_counts keeps, for each level, how many entries
+# share each RANK_RADIX_BITS-wide key prefix, so a rank is a sum over
+# RANK_LEVELS short ranges and a score change updates 2 * RANK_LEVELS counts.
+MEMBER_BITS = 31
+MAX_RANKED_SCORE = (1 << 32) - 1
+RANK_RADIX_BITS = 8
+RANK_RADIX = 1 << RANK_RADIX_BITS
+RANK_LEVELS = 8  # 8 * 8 bits cover the whole key
+MAX_KEYS_PER_QUERY = 300  # (board, member) pairs per statement, under SQLite's parameter limit
+
+
+def rank_key(score, member):
+    """Rank key of an entry with a whole score in 0..MAX_RANKED_SCORE"""
+    score = int(score)
+    if not 0 <= score <= MAX_RANKED_SCORE or not 0 <= member < (1 << MEMBER_BITS):
+        raise ValueError(f"Cannot rank score {score} of member {member}")
+    return (score << MEMBER_BITS) | ((1 << MEMBER_BITS) - 1 - member)
+
+
+def unpack_rank_key(key):
+    """(score, member) of a rank key"""
+    return key >> MEMBER_BITS, (1 << MEMBER_BITS) - 1 - (key & ((1 << MEMBER_BITS) - 1))
+
+
+def rank_nodes(key):
+    """(level, prefix) of every rank tree node holding key, leaf first"""
+    return [(level, key >> (RANK_RADIX_BITS * level)) for level in range(RANK_LEVELS)]
+
+
+SKIPLIST_LEVELS = 24  # enough for ~16M members per board
+
+
+class _SkipNode:
+    __slots__ = ('value', 'next', 'width')
+
+    def __init__(self, value, levels):
+        self.value = value
+        self.next = [None] * levels
+        self.width = [1] * levels  # positions skipped by each link
+
+
+class SkipList:
+    """
+    Indexable skip list of sortable values
+
+    insert, remove, rank and the start of a slice are O(log n): every link
+    also stores how many positions it skips, so positions are counted on
+    the way down instead of by walking the bottom level.
+    """
+
+    def __init__(self, seed=None):
+        self._head = _SkipNode(None, SKIPLIST_LEVELS)
+        self._size = 0
+        self._rng = random.Random(seed)
+
+    def __len__(self):
+        return self._size
+
+    def _levels(self):
+        # Each extra level with probability 1/2
+        bits = self._rng.getrandbits(SKIPLIST_LEVELS - 1)
+        levels = 1
+        while bits & 1:
+            levels += 1
+            bits >>= 1
+        return levels
+
+    def _find(self, value):
+        """Last node before value on every level, and its 0-based position + 1"""
+        chain = [None] * SKIPLIST_LEVELS
+        steps = [0] * SKIPLIST_LEVELS
+        node = self._head
+        position = 0
+        for level in reversed(range(SKIPLIST_LEVELS)):
+            while node.next[level] is not None and node.next[level].value < value:
+                position += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+            steps[level] = position
+        return chain, steps, position
+
+    def insert(self, value):
+        chain, steps, position = self._find(value)
+        node = _SkipNode(value, self._levels())
+        for level in range(len(node.next)):
+            previous = chain[level]
+            skipped = position - steps[level]
+            node.next[level] = previous.next[level]
+            previous.next[level] = node
+            node.width[level] = previous.width[level] - skipped
+            previous.width[level] = skipped + 1
+        for level in range(len(node.next), SKIPLIST_LEVELS):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, value):
+        chain, _, _ = self._find(value)
+        node = chain[0].next[0]
+        if node is None or node.value != value:
+            raise KeyError(value)
+        for level in range(len(node.next)):
+            previous = chain[level]
+            previous.width[level] += node.width[level] - 1
+            previous.next[level] = node.next[level]
+        for level in range(len(node.next), SKIPLIST_LEVELS):
+            chain[level].width[level] -= 1
+        self._size -= 1
+
+    def rank(self, value):
+        """0-based position of value, or None if it is not in the list"""
+        chain, _, position = self._find(value)
+        node = chain[0].next[0]
+        if node is None or node.value != value:
+            return None
+        return position
+
+    def slice(self, start, count):
+        """Up to count values from 0-based position start"""
+        target = start + 1
+        node = self._head
+        position = 0
+        for level in reversed(range(SKIPLIST_LEVELS)):
+            while node.next[level] is not None and position + node.width[level] <= target:
+                position += node.width[level]
+                node = node.next[level]
+        if position != target:
+            return []
+        values = []
+        while node is not None and len(values) < count:
+            values.append(node.value)
+            node = node.next[0]
+        return values
+
+
+class MemoryState:
+    """Game state held in this process"""
+
+    name = 'memory'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._decks = {}        # session_id -> [indices, position]
+        self._deadlines = []    # heap of (deadline, round_id)
+        self._deadline_of = {}  # round_id -> deadline (entries not in here are stale)
+        self._scores = {}       # board -> {member: score}
+        self._ranked = {}       # board -> SkipList of (-score, member)
+        self._counters = {}     # key -> [count, expires_at]
+
+    # ---- session decks ----
+
+    def deck_deal(self, session_id, indices, position=0, version=''):
+        with self._lock:
+            self._decks[session_id] = [array('I', indices), position, version]
+
+    def deck_pop(self, session_id, peek=0, version=''):
+        with self._lock:
+            deck = self._decks.get(session_id)
+            if deck is None or deck[1] >= len(deck[0]) or deck[2] != version:
+                return None, []
+            indices, position, _ = deck
+            deck[1] = position + 1
+            return indices[position], list(indices[position + 1:position + 1 + peek])
+
+    # ---- round deadlines ----
+
+    def deadline_add(self, round_id, deadline):
+        with self._lock:
+            self._deadline_of[round_id] = deadline
+            heapq.heappush(self._deadlines, (deadline, round_id))
+
+    def deadlines_pop_due(self, now, limit):
+        due = []
+        with self._lock:
+            while self._deadlines and self._deadlines[0][0] <= now and len(due) < limit:
+                deadline, round_id = heapq.heappop(self._deadlines)
+                if self._deadline_of.get(round_id) == deadline:
+                    del self._deadline_of[round_id]
+                    due.append((deadline, round_id))
+        return due
+
+    def deadline_next(self):
+        with self._lock:
+            # Drop stale heap entries (rescheduled or already claimed)
+            while self._deadlines and self._deadline_of.get(self._deadlines[0][1]) != self._deadlines[0][0]:
+                heapq.heappop(self._deadlines)
+            return self._deadlines[0][0] if self._deadlines else None
+
+    def deadline_count(self):
+        with self._lock:
+            return len(self._deadline_of)
+
+    # ---- leaderboards ----
+
+    def _score_incr(self, board, member, amount):
+        scores = self._scores.setdefault(board, {})
+        ranked = self._ranked.get(board)
+        if ranked is None:
+            ranked = self._ranked[board] = SkipList()
+        old = scores.get(member)
+        if old is not None:
+            ranked.remove((-old, member))
+        new = (old or 0) + amount
+        scores[member] = new
+        ranked.insert((-new, member))
+        return new
+
+    def score_incr(self, board, member, amount):
+        with self._lock:
+            return self._score_incr(board, member, amount)
+
+    def score_incr_many(self, increments):
+        with self._lock:
+            for board, member, amount in increments:
+                self._score_incr(board, member, amount)
+
+    def score_get(self, board, member):
+        with self._lock:
+            return self._scores.get(board, {}).get(member)
+
+    def rank(self, board, member):
+        with self._lock:
+            score = self._scores.get(board, {}).get(member)
+            if score is None:
+                return None
+            return self._ranked[board].rank((-score, member))
+
+    def top(self, board, start=0, count=10):
+        with self._lock:
+            ranked = self._ranked.get(board)
+            if ranked is None:
+                return []
+            return [(member, -neg) for neg, member in ranked.slice(start, count)]
+
+    def top_after(self, board, member, count=10):
+        with self._lock:
+            score = self._scores.get(board, {}).get(member)
+            if score is None:
+                return None
+            ranked = self._ranked[board]
+            return [(m, -neg) for neg, m in ranked.slice(ranked.rank((-score, member)) + 1, count)]
+
+    def around(self, board, member, radius):
+        with self._lock:
+            score = self._scores.get(board, {}).get(member)
+            if score is None:
+                return None, []
+            ranked = self._ranked[board]
+            rank = ranked.rank((-score, member))
+            start = max(0, rank - radius)
+            return rank, [(m, -neg) for neg, m in ranked.slice(start, rank - start + radius + 1)]
+
+    def board_size(self, board):
+        with self._lock:
+            return len(self._scores.get(board, {}))
+
+    def board_clear(self, board):
+        with self._lock:
+            self._scores.pop(board, None)
+            self._ranked.pop(board, None)
+
+    def boards_expire(self, prefix, before):
+        with self._lock:
+            for board in [b for b in self._scores if b.startswith(prefix) and b < prefix + before]:
+                del self._scores[board]
+                del self._ranked[board]
+
+    # ---- rate counters ----
+
+    def counter_incr(self, key, window, now=None):
+        now = now or time.time()
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None or counter[1] <= now:
+                counter = self._counters[key] = [0, now + window]
+                if len(self._counters) > 10000:
+                    self._counters = {k: c for k, c in self._counters.items() if c[1] > now}
+            counter[0] += 1
+            return counter[0]
+
+
+@functools.cache
+def _count_above_statement():
+    """Sum of the counts in each level's sibling range (built once; bound per key)"""
+    c = LeaderboardCount.__table__.c
+    counts = union_all(*(
+        select(c.count).where(c.board == bindparam('board'), c.level == level,
+                              c.prefix > bindparam(f'after_{level}'), c.prefix <= bindparam(f'last_{level}'))
+        for level in range(RANK_LEVELS)
+    )).subquery()
+    return select(func.coalesce(func.sum(counts.c.count), 0))
+
+
+@functools.cache
+def _children_statement():
+    """Non-empty nodes of one level in a prefix range, best first"""
+    c = LeaderboardCount.__table__.c
+    return (
+        select(c.prefix, c.count)
+        .where(c.board == bindparam('board'), c.level == bindparam('level'),
+               c.prefix >= bindparam('first'), c.prefix <= bindparam('last'), c.count > 0)
+        .order_by(c.prefix.desc())
+    )
+
+
+class SQLState:
+    """Game state in shared tables of the app database"""
+
+    name = 'sql'
+
+    def __init__(self):
+        self._increments = 0  # expired counters are purged every 1000 increments
+
+    @staticmethod
+    def _insert(model, **values):
+        """INSERT that supports ON CONFLICT DO UPDATE (SQLite and PostgreSQL)"""
+        dialect = db.session.get_bind().dialect.name
+        insert = UPSERT_DIALECTS.get(dialect)
+        if insert is None:
+            raise ValueError(f"The sql state backend needs one of {sorted(UPSERT_DIALECTS)}, not '{dialect}'")
+        statement = insert(model.__table__)
+        return statement.values(**values) if values else statement
+
+    # ---- session decks ----
+
+    def deck_deal(self, session_id, indices, position=0, version=''):
+        statement = self._insert(SessionDeck, session_id=session_id, word_indices=pack_indices(indices),
+                                 position=position, catalog_version=version)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=['session_id'],
+            set_={'word_indices': statement.excluded.word_indices, 'position': statement.excluded.position,
+                  'catalog_version': statement.excluded.catalog_version}
+        ))
+
+    def deck_pop(self, session_id, peek=0, version=''):
+        # Claim the next position and read the deck in one UPDATE ... RETURNING
+        table = SessionDeck.__table__
+        row = db.session.execute(
+            update(table)
+            .where(table.c.session_id == session_id, table.c.catalog_version == version,
+                   table.c.position * 4 < func.length(table.c.word_indices))
+            .values(position=table.c.position + 1)
+            .returning(table.c.position, table.c.word_indices)
+        ).first()
+        if row is None:
+            return None, []
+        indices = unpack_indices(row.word_indices)
+        return indices[row.position - 1], list(indices[row.position:row.position + peek])
+
+    # ---- round deadlines ----
+
+    def deadline_add(self, round_id, deadline):
+        statement = self._insert(RoundDeadline, round_id=round_id, deadline=deadline)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=['round_id'], set_={'deadline': statement.excluded.deadline}
+        ))
+
+    def deadlines_pop_due(self, now, limit):
+        # DELETE ... RETURNING claims each deadline for exactly one process
+        table = RoundDeadline.__table__
+        due = select(table.c.round_id).where(table.c.deadline <= now).order_by(table.c.deadline).limit(limit)
+        rows = db.session.execute(
+            delete(table).where(table.c.round_id.in_(due)).returning(table.c.deadline, table.c.round_id)
+        ).all()
+        return sorted((deadline, round_id) for deadline, round_id in rows)
+
+    def deadline_next(self):
+        return db.session.query(func.min(RoundDeadline.deadline)).scalar()
+
+    def deadline_count(self):
+        return db.session.query(func.count(RoundDeadline.round_id)).scalar()
+
+    # ---- leaderboards ----
+
+    def score_incr(self, board, member, amount):
+        return self._scores_incr([(board, member, amount)])[(board, member)]
+
+    def score_incr_many(self, increments):
+        self._scores_incr(increments)
+
+    def _scores_incr(self, increments):
+        """
+        Add to scores and move the entries in the rank tree; returns {(board, member): new score}
+
+        Existing rows are read with a no-op UPDATE, so they stay locked (and
+        on SQLite the write lock is held) until the caller commits. Missing
+        rows are inserted with ON CONFLICT DO NOTHING; a row another worker
+        inserted first is read again on the next pass.
+        """
+        totals = {}
+        for board, member, amount in increments:
+            if not float(amount).is_integer():
+                raise ValueError(f"Leaderboard scores must be whole points, got {amount}")
+            totals[(board, member)] = totals.get((board, member), 0) + int(amount)
+        if not totals:
+            return {}
+
+        table = LeaderboardScore.__table__
+        c = table.c
+        old, inserted = {}, set()
+        pending = list(totals)
+        while pending:
+            members_by_board = {}
+            for board, member in pending:
+                members_by_board.setdefault(board, []).append(member)
+            for board, members in members_by_board.items():
+                for i in range(0, len(members), MAX_KEYS_PER_QUERY):
+                    locked = update(table).where(
+                        c.board == board, c.member.in_(members[i:i + MAX_KEYS_PER_QUERY])
+                    ).values(score=c.score)
+                    for member, score in db.session.execute(locked.returning(c.member, c.score)):
+                        old[(board, member)] = score
+            missing = [key for key in pending if key not in old]
+            for i in range(0, len(missing), MAX_KEYS_PER_QUERY):
+                statement = self._insert(LeaderboardScore).values([
+                    {'board': board, 'member': member, 'score': totals[(board, member)]}
+                    for board, member in missing[i:i + MAX_KEYS_PER_QUERY]
+                ])
+                inserted.update(db.session.execute(
+                    statement.on_conflict_do_nothing().returning(c.board, c.member)
+                ).tuples())
+            pending = [key for key in missing if key not in inserted]
+
+        if old:
+            db.session.execute(
+                update(table).where(c.board == bindparam('b'), c.member == bindparam('m'))
+                .values(score=c.score + bindparam('amount')),
+                [{'b': board, 'm': member, 'amount': totals[(board, member)]} for board, member in old]
+            )
+
+        deltas = {}
+        for (board, member), score in old.items():
+            for node in rank_nodes(rank_key(score, member)):
+                deltas[(board,) + node] = deltas.get((board,) + node, 0) - 1
+        new_scores = {key: old.get(key, 0) + amount for key, amount in totals.items()}
+        for (board, member), score in new_scores.items():
+            for node in rank_nodes(rank_key(score, member)):
+                deltas[(board,) + node] = deltas.get((board,) + node, 0) + 1
+        self._counts_incr(deltas)
+        return new_scores
+
+    def _counts_incr(self, deltas):
+        # One executemany upsert; nodes an entry stays under cancel out
+        rows = [{'board': board, 'level': level, 'prefix': prefix, 'count': delta}
+                for (board, level, prefix), delta in deltas.items() if delta]
+        if not rows:
+            return
+        table = LeaderboardCount.__table__
+        statement = self._insert(LeaderboardCount)
+        db.session.execute(
+            statement.on_conflict_do_update(
+                index_elements=['board', 'level', 'prefix'], set_={'count': table.c.count + statement.excluded.count}
+            ),
+            rows
+        )
+
+    def score_get(self, board, member):
+        return db.session.query(LeaderboardScore.score).filter_by(board=board, member=member).scalar()
+
+    @staticmethod
+    def _ranges(board, score, member, ahead, inclusive=False):
+        """
+        The entries ranked above (ahead) or below a member, as two index ranges
+
+        Ties are ranked by member, so "above" is a higher score, or the same
+        score and a lower member. Kept as two conditions instead of an OR so
+        each one is a single range of ix_leaderboard_scores_rank.
+        """
+        c = LeaderboardScore.__table__.c
+        if ahead:
+            return (and_(c.board == board, c.score == score, c.member < member),
+                    and_(c.board == board, c.score > score))
+        tied = c.member >= member if inclusive else c.member > member
+        return (and_(c.board == board, c.score == score, tied),
+                and_(c.board == board, c.score < score))
+
+    @staticmethod
+    def _count_above(board, key):
+        """
+        Entries ranked above key: at each level, the siblings after the key's node
+
+        At most RANK_RADIX - 1 rows per level, so RANK_LEVELS short ranges of
+        the primary key whatever the board size.
+        """
+        params = {'board': board}
+        for level, prefix in rank_nodes(key):
+            params[f'after_{level}'] = prefix
+            params[f'last_{level}'] = prefix | (RANK_RADIX - 1)
+        return db.session.execute(_count_above_statement(), params).scalar()
+
+    @staticmethod
+    def _key_at(board, rank):
+        """Rank key of the entry at a 0-based rank, walking down the tree, or None"""
+        prefix = 0
+        for level in reversed(range(RANK_LEVELS)):
+            first = prefix << RANK_RADIX_BITS
+            children = db.session.execute(
+                _children_statement(), {'board': board, 'level': level, 'first': first, 'last': first + RANK_RADIX - 1}
+            ).all()
+            for child, count in children:
+                if rank < count:
+                    prefix = child
+                    break
+                rank -= count
+            else:
+                return None
+        return prefix
+
+    def rank(self, board, member):
+        score = self.score_get(board, member)
+        if score is None:
+            return None
+        return self._count_above(board, rank_key(score, member))
+
+    def top(self, board, start=0, count=10):
+        if start:
+            key = self._key_at(board, start)
+            if key is None:
+                return []
+            score, member = unpack_rank_key(key)
+            return self._page(board, score, member, count, inclusive=True)
+        rows = (
+            db.session.query(LeaderboardScore.member, LeaderboardScore.score)
+            .filter(LeaderboardScore.board == board)
+            .order_by(LeaderboardScore.score.desc(), LeaderboardScore.member)
+            .limit(count)
+            .all()
+        )
+        return [(member, score) for member, score in rows]
+
+    def top_after(self, board, member, count=10):
+        score = self.score_get(board, member)
+        if score is None:
+            return None
+        return self._page(board, score, member, count)
+
+    def _page(self, board, score, member, count, inclusive=False):
+        # Keyset page: the nearest entries of the two index ranges below the
+        # member, so deep pages cost the same as the first one
+        c = LeaderboardScore.__table__.c
+        tied_below, lower = self._ranges(board, score, member, ahead=False, inclusive=inclusive)
+        nearest = [
+            select(c.member, c.score).where(tied_below).order_by(c.member).limit(count),
+            select(c.member, c.score).where(lower).order_by(c.score.desc(), c.member).limit(count),
+        ]
+        rows = db.session.execute(union_all(*(select(q.subquery()) for q in nearest))).all()
+        return [(m, s) for m, s in sorted(rows, key=lambda row: (-row[1], row[0]))[:count]]
+
+    def around(self, board, member, radius):
+        # Neighbours are the nearest entries of the four index ranges next to
+        # the member, so no OFFSET has to skip the entries ranked above them
+        score = self.score_get(board, member)
+        if score is None:
+            return None, []
+        rank = self._count_above(board, rank_key(score, member))
+        if not radius:
+            return rank, [(member, score)]
+
+        c = LeaderboardScore.__table__.c
+        tied_above, higher = self._ranges(board, score, member, ahead=True)
+        tied_below, lower = self._ranges(board, score, member, ahead=False)
+        nearest = [
+            select(c.member, c.score).where(tied_above).order_by(c.member.desc()).limit(radius),
+            select(c.member, c.score).where(higher).order_by(c.score, c.member.desc()).limit(radius),
+            select(c.member, c.score).where(tied_below).order_by(c.member).limit(radius),
+            select(c.member, c.score).where(lower).order_by(c.score.desc(), c.member).limit(radius),
+        ]
+        rows = db.session.execute(union_all(*(select(q.subquery()) for q in nearest))).all()
+        ranked = sorted((-s, m) for m, s in rows)
+        above = [entry for entry in ranked if entry < (-score, member)][-radius:]
+        below = [entry for entry in ranked if entry > (-score, member)][:radius]
+        return rank, [(m, -neg) for neg, m in above] + [(member, score)] + [(m, -neg) for neg, m in below]
+
+    def board_size(self, board):
+        # The top level has a handful of nodes holding every entry between them
+        c = LeaderboardCount.__table__.c
+        return db.session.query(func.coalesce(func.sum(c.count), 0)).filter(
+            c.board == board, c.level == RANK_LEVELS - 1
+        ).scalar()
+
+    def board_clear(self, board):
+        for model in (LeaderboardScore, LeaderboardCount):
+            db.session.execute(delete(model.__table__).where(model.__table__.c.board == board))
+
+    def boards_expire(self, prefix, before):
+        for model in (LeaderboardScore, LeaderboardCount):
+            table = model.__table__
+            db.session.execute(delete(table).where(table.c.board >= prefix, table.c.board < prefix + before))
+
+    # ---- rate counters ----
+
+    def counter_incr(self, key, window, now=None):
+        now = now or time.time()
+        table = RateCounter.__table__
+        expired = table.c.expires_at <= now
+        # A key's first hit, or its first after the window ran out, starts at 1
+        statement = self._insert(RateCounter, key=key, count=1, expires_at=now + window).on_conflict_do_update(
+            index_elements=['key'],
+            set_={
+                'count': case((expired, 1), else_=table.c.count + 1),
+                'expires_at': case((expired, now + window), else_=table.c.expires_at),
+            }
+        )
+        count = db.session.execute(statement.returning(table.c.count)).scalar()
+
+        self._increments += 1
+        if self._increments % 1000 == 0:
+            db.session.execute(delete(table).where(expired))
+        return count
+
+
+_state = None
+
+
+def configure_state(backend=DEFAULT_BACKEND, dialect=None):
+    """
+    Choose the state backend (called once at app start-up)
+
+    Args:
+        backend (str): One of BACKENDS
+        dialect (str): Database backend name of the app database; the sql
+            backend refuses databases without ON CONFLICT and RETURNING
+    """
+    global _state
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown state backend '{backend}' (expected one of {list(BACKENDS)})")
+    if backend == 'sql' and dialect is not None and dialect not in UPSERT_DIALECTS:
+        raise ValueError(f"The sql state backend needs one of {sorted(UPSERT_DIALECTS)}, not '{dialect}' "
+                         "(set STATE_BACKEND=memory)")
+    _state = MemoryState() if backend == 'memory' else SQLState()
+    return _state
+
+
+def get_state():
+    """Get the configured state backend (shared SQL by default)"""
+    global _state
+    if _state is None:
+        _state = SQLState()
+    return _state
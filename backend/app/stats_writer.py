@@ -0,0 +1,375 @@
+import atexit
+import glob
+import hashlib
+import json
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta
+from app.models import db, UserStats, StatsFlush
+from app.rankings import record_scores
+from app.response_cache import invalidate
+
+# Write-behind UserStats aggregation.
+# Guess results are appended to a per-process log and folded into in-memory
+# per-user deltas; a background thread applies the deltas in one transaction
+# per batch, together with the batch's leaderboard points (app/rankings.py).
+# Each batch is recorded in stats_flushes in the same transaction, so after a
+# crash the log files can be replayed exactly once: a worker first claims a
+# dead process's log by renaming it, commits it under the batch id in its
+# name and only then deletes it. Logs live in a
+# subdirectory per database (see log_directory), so a log is only ever
+# replayed into the database it was written for, and replaying happens on
+# the first flush (or `flask --app run recover-stats`), not at start-up.
+
+# SQLite's default limit on bound parameters per statement
+MAX_IDS_PER_QUERY = 500
+
+
+class StatsDelta:
+    """Pending change to one user's stats"""
+
+    __slots__ = ('guesses', 'correct', 'points', 'streak_reset', 'streak_tail')
+
+    def __init__(self):
+        self.guesses = 0
+        self.correct = 0
+        self.points = 0
+        # A wrong guess resets the streak; streak_tail counts the correct
+        # guesses after the last reset (or all of them if there was none)
+        self.streak_reset = False
+        self.streak_tail = 0
+
+    def add(self, is_correct, points):
+        self.guesses += 1
+        self.points += points
+        if is_correct:
+            self.correct += 1
+            self.streak_tail += 1
+        else:
+            self.streak_reset = True
+            self.streak_tail = 0
+
+    def merge(self, later):
+        """Fold a later delta into this one"""
+        self.guesses += later.guesses
+        self.correct += later.correct
+        self.points += later.points
+        if later.streak_reset:
+            self.streak_reset = True
+            self.streak_tail = later.streak_tail
+        else:
+            self.streak_tail += later.streak_tail
+
+    def apply(self, stats):
+        """Apply to a UserStats row (or any object with the same fields)"""
+        stats.total_guesses = (stats.total_guesses or 0) + self.guesses
+        stats.total_correct_guesses = (stats.total_correct_guesses or 0) + self.correct
+        stats.total_points = (stats.total_points or 0) + self.points
+        stats.accuracy_percentage = (stats.total_correct_guesses / stats.total_guesses * 100) if stats.total_guesses > 0 else 0
+        if self.streak_reset:
+            stats.current_streak = self.streak_tail
+        else:
+            stats.current_streak = (stats.current_streak or 0) + self.streak_tail
+
+
+def merge_deltas(*delta_maps):
+    """Merge {user_id: StatsDelta} maps, earliest first"""
+    merged = {}
+    for deltas in delta_maps:
+        for user_id, delta in deltas.items():
+            if user_id not in merged:
+                merged[user_id] = StatsDelta()
+            merged[user_id].merge(delta)
+    return merged
+
+
+def log_directory(base, database_url):
+    """Subdirectory of base holding the logs written for one database"""
+    return os.path.join(base, hashlib.sha256(database_url.encode('utf-8')).hexdigest()[:16])
+
+
+def _pid_alive(pid):
+    if pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class StatsAggregator:
+    """Buffers stats deltas and flushes them in batched transactions"""
+
+    def __init__(self, app, directory, interval=1.0, max_pending=500, fsync=False):
+        self.app = app
+        with app.app_context():
+            self.directory = log_directory(directory, db.engine.url.render_as_string(hide_password=True))
+        self.interval = interval
+        self.max_pending = max_pending
+        self.fsync = fsync
+
+        self._pending = {}
+        self._pending_records = 0
+        self._in_flight = []  # [(batch_id, path, deltas, record_count)] not yet committed
+        self._lock = threading.Lock()
+        # Held while a batch commits, and by readers merging pending deltas,
+        # so a reader never sees a batch both in the table and in memory
+        self._commit_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._recovered = False
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._log_path = os.path.join(self.directory, f'{os.getpid()}.log')
+        if os.path.exists(self._log_path):
+            # Left by a dead process that had our pid; recover() replays it
+            os.replace(self._log_path, os.path.join(self.directory, f'{os.getpid()}-{uuid.uuid4().hex}.log'))
+        self._log = open(self._log_path, 'a', encoding='utf-8')
+
+        self._thread = threading.Thread(target=self._run, name='stats-writer', daemon=True)
+        self._thread.start()
+
+    # ---------- writes ----------
+
+    def record(self, user_id, is_correct, points):
+        """
+        Record one guess result
+
+        Args:
+            user_id (int): Player
+            is_correct (bool): Whether the guess was correct
+            points (int): Points earned
+        """
+        line = json.dumps({'u': user_id, 'c': 1 if is_correct else 0, 'p': points})
+        with self._lock:
+            self._log.write(line + '\n')
+            self._log.flush()
+            if self.fsync:
+                os.fsync(self._log.fileno())
+
+            delta = self._pending.get(user_id)
+            if delta is None:
+                delta = self._pending[user_id] = StatsDelta()
+            delta.add(is_correct, points)
+            self._pending_records += 1
+            full = self._pending_records >= self.max_pending
+
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        """Apply every pending delta; returns the number of records written"""
+        with self._flush_lock:
+            if not self._recovered:
+                self._recover()
+                self._recovered = True
+            return self._flush()
+
+    def _flush(self):
+        with self._lock:
+            if self._pending_records:
+                batch_id = uuid.uuid4().hex
+                path = os.path.join(self.directory, f'{os.getpid()}-{batch_id}.flushing')
+                # New records go to a fresh log while this one is applied
+                self._log.close()
+                os.replace(self._log_path, path)
+                self._log = open(self._log_path, 'a', encoding='utf-8')
+
+                self._in_flight.append((batch_id, path, self._pending, self._pending_records))
+                self._pending = {}
+                self._pending_records = 0
+            batches = list(self._in_flight)
+
+        written = 0
+        for batch_id, path, deltas, record_count in batches:
+            self._apply_batch(batch_id, deltas, record_count)
+            os.remove(path)
+            written += record_count
+        return written
+
+    def _apply_batch(self, batch_id, deltas, record_count):
+        with self.app.app_context():
+            try:
+                with self._commit_lock:
+                    user_ids = list(deltas)
+                    stats_by_user = {}
+                    for i in range(0, len(user_ids), MAX_IDS_PER_QUERY):
+                        chunk = user_ids[i:i + MAX_IDS_PER_QUERY]
+                        for stats in UserStats.query.filter(UserStats.user_id.in_(chunk)).all():
+                            stats_by_user[stats.user_id] = stats
+
+                    for user_id, delta in deltas.items():
+                        stats = stats_by_user.get(user_id)
+                        if stats is None:
+                            stats = UserStats(user_id=user_id)
+                            db.session.add(stats)
+                        delta.apply(stats)
+                    record_scores({user_id: delta.points for user_id, delta in deltas.items()})
+
+                    db.session.add(StatsFlush(batch_id=batch_id, record_count=record_count))
+                    StatsFlush.query.filter(
+                        StatsFlush.created_at < datetime.now() - timedelta(days=7)
+                    ).delete()
+                    db.session.commit()
+                    invalidate('stats')
+
+                    with self._lock:
+                        self._in_flight = [b for b in self._in_flight if b[0] != batch_id]
+            except Exception:
+                # The batch stays in flight and is retried on the next flush
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Stats flush error: {e}", flush=True)
+
+    def close(self):
+        """Stop the background thread and flush what is left"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+        with self._lock:
+            self._log.close()
+            if not self._pending_records and os.path.getsize(self._log_path) == 0:
+                os.remove(self._log_path)
+
+    # ---------- reads ----------
+
+    def pending_for(self, user_id):
+        """Unflushed delta for a user (in-flight batches included), or None"""
+        with self._lock:
+            maps = [b[2] for b in self._in_flight] + [self._pending]
+            relevant = [{user_id: m[user_id]} for m in maps if user_id in m]
+            if not relevant:
+                return None
+            return merge_deltas(*relevant)[user_id]
+
+    def read_stats(self, user_id, load):
+        """
+        Load a user's stored stats together with the matching pending delta
+
+        Args:
+            user_id (int): Player
+            load (callable): Reads the stored row (e.g. a UserStats query)
+
+        Returns:
+            tuple: (stored row or None, StatsDelta or None)
+        """
+        with self._commit_lock:
+            return load(), self.pending_for(user_id)
+
+    # ---------- recovery ----------
+
+    def recover(self):
+        """Replay log files left behind by crashed processes and flush them"""
+        with self._flush_lock:
+            count = self._recover()
+            self._recovered = True
+            return count
+
+    def _recover(self):
+        with self._lock:
+            own = {self._log_path} | {path for _, path, _, _ in self._in_flight}
+
+        claimed = []
+        for path in sorted(glob.glob(os.path.join(self.directory, '*.flushing'))):
+            name = os.path.basename(path)[:-len('.flushing')]
+            pid, batch_id = name.split('-', 1)
+            if path not in own and not _pid_alive(int(pid)):
+                # Keeps its batch id, so a batch committed before the crash is not applied twice
+                claimed.append(self._claim(path, batch_id))
+        for path in sorted(glob.glob(os.path.join(self.directory, '*.log'))):
+            pid = os.path.basename(path)[:-len('.log')]
+            if path not in own and not (pid.isdigit() and _pid_alive(int(pid))):
+                claimed.append(self._claim(path, uuid.uuid4().hex))
+
+        record_count = 0
+        for path, batch_id in filter(None, claimed):
+            with self.app.app_context():
+                try:
+                    committed = db.session.get(StatsFlush, batch_id) is not None
+                finally:
+                    db.session.remove()
+            if not committed:
+                replayed = {}
+                count = self._replay(path, replayed)
+                if count:
+                    self._apply_batch(batch_id, replayed, count)
+                record_count += count
+            # Only once the batch is in stats_flushes; a crash before this
+            # leaves the claimed file for the next recovery
+            os.remove(path)
+        return record_count
+
+    def _claim(self, path, batch_id):
+        """
+        Take a dead process's log by renaming it to one of ours
+
+        Returns (claimed path, batch id), or None if another worker claimed
+        it first. The rename is atomic, so each log is replayed by one worker.
+        """
+        claimed = os.path.join(self.directory, f'{os.getpid()}-{batch_id}.flushing')
+        try:
+            os.replace(path, claimed)
+        except FileNotFoundError:
+            return None
+        return claimed, batch_id
+
+    @staticmethod
+    def _replay(path, deltas):
+        count = 0
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn final line from the crash
+                    continue
+                delta = deltas.get(record['u'])
+                if delta is None:
+                    delta = deltas[record['u']] = StatsDelta()
+                delta.add(bool(record['c']), record['p'])
+                count += 1
+        return count
+
+
+_aggregator = None
+
+
+def configure_stats_writer(app, directory, interval=1.0, max_pending=500, fsync=False):
+    """Start the shared write-behind aggregator (called once at app start-up)"""
+    global _aggregator
+    if _aggregator is not None:
+        _aggregator.close()
+    _aggregator = StatsAggregator(app, directory, interval=interval, max_pending=max_pending, fsync=fsync)
+    atexit.register(_aggregator.close)
+    return _aggregator
+
+
+def disable_stats_writer():
+    """Flush and stop the shared aggregator; stats are then written synchronously"""
+    global _aggregator
+    if _aggregator is not None:
+        _aggregator.close()
+    _aggregator = None
+
+
+def get_stats_writer():
+    """Get the shared aggregator, or None when write-behind is disabled"""
+    return _aggregator
@@ -0,0 +1,111 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# Storage profiles.
+# SQLite's defaults (rollback journal, FULL sync, 2 MB cache) make every
+# write block all readers, which is what gunicorn workers sharing one file
+# run into as "database is locked". The 'wal' profile sets per-connection
+# pragmas so readers never wait for the writer and writers queue on
+# busy_timeout instead of failing. PostgreSQL URLs get pool settings instead.
+
+SQLITE_PROFILES = {
+    # SQLite defaults, as before profiles existed
+    'legacy': {},
+    'wal': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,         # ms
+        'cache_size': -65536,         # KiB when negative (64 MB)
+        'mmap_size': 268435456,       # 256 MB
+        'temp_store': 'MEMORY',
+    },
+}
+
+DEFAULT_PROFILE = 'wal'
+
+# Env var -> pragma overrides applied on top of the profile
+PRAGMA_OVERRIDES = {
+    'SQLITE_BUSY_TIMEOUT_MS': 'busy_timeout',
+    'SQLITE_CACHE_SIZE_KB': 'cache_size',
+    'SQLITE_MMAP_SIZE': 'mmap_size',
+    'SQLITE_SYNCHRONOUS': 'synchronous',
+}
+
+
+def is_sqlite(uri):
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+
+def sqlite_pragmas(profile=DEFAULT_PROFILE, environ=None):
+    """
+    Pragmas for a profile, with overrides from the environment
+
+    Args:
+        profile (str): Key of SQLITE_PROFILES
+        environ (dict): Overrides source (e.g. os.environ)
+
+    Returns:
+        dict: {pragma: value}
+    """
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown storage profile '{profile}' (expected one of {sorted(SQLITE_PROFILES)})")
+
+    pragmas = dict(SQLITE_PROFILES[profile])
+    for var, pragma in PRAGMA_OVERRIDES.items():
+        value = (environ or {}).get(var)
+        if value:
+            pragmas[pragma] = int(value) if value.lstrip('-').isdigit() else value
+
+    # SQLITE_CACHE_SIZE_KB is in KiB, which SQLite expects as a negative number
+    if isinstance(pragmas.get('cache_size'), int) and pragmas['cache_size'] > 0:
+        pragmas['cache_size'] = -pragmas['cache_size']
+    return pragmas
+
+
+def engine_options(uri, environ=None):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for a database URL
+
+    Args:
+        uri (str): Database URL
+        environ (dict): Source of DB_POOL_* settings (e.g. os.environ)
+
+    Returns:
+        dict: Engine keyword arguments
+    """
+    environ = environ or {}
+    if is_sqlite(uri):
+        # busy_timeout pragma does the waiting; pysqlite's own timeout is the same thing
+        return {}
+
+    return {
+        'pool_size': int(environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': float(environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': True,
+    }
+
+
+def install_sqlite_pragmas(engine, pragmas):
+    """Run the pragmas on every new connection of a SQLite engine"""
+    if not pragmas or engine.dialect.name != 'sqlite':
+        return
+
+    # journal_mode is stored in the file; an in-memory database cannot use WAL
+    in_memory = engine.url.database in (None, '', ':memory:')
+    statements = [
+        f'PRAGMA {name}={value}'
+        for name, value in pragmas.items()
+        if not (in_memory and name == 'journal_mode')
+    ]
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
@@ -0,0 +1,143 @@
+import base64
+import gzip
+import html
+import threading
+
+# Template-based SVG rendering.
+# The static parts of each SVG are compiled once per size (and error state
+# for placeholders) into byte fragments; a render only splices in the colors
+# or the word. Gradient images have no variable text, so all 8x7 color
+# combinations are cached as finished bytes, data URLs and svgz.
+
+GRADIENT_COLORS = ['#667eea', '#764ba2', '#f093fb', '#4facfe', '#00f2fe', '#43e97b', '#fa709a', '#fee140']
+
+GRADIENT_TEMPLATE = '''<svg width="{size}" height="{size}" xmlns="http://www.w3.org/2000/svg">
+      <defs>
+        <linearGradient id="grad1" x1="0%" y1="0%" x2="100%" y2="100%">
+          <stop offset="0%" style="stop-color:{color1};stop-opacity:1" />
+          <stop offset="100%" style="stop-color:{color2};stop-opacity:1" />
+        </linearGradient>
+      </defs>
+      <rect width="{size}" height="{size}" fill="url(#grad1)"/>
+      <circle cx="{half}" cy="{half}" r="{third}" fill="white" opacity="0.3"/>
+      <circle cx="{quarter}" cy="{quarter}" r="{sixth}" fill="white" opacity="0.2"/>
+      <circle cx="{three_quarters}" cy="{three_quarters}" r="{fifth}" fill="white" opacity="0.15"/>
+    </svg>'''
+
+PLACEHOLDER_TEMPLATE = '''<svg width="512" height="512" xmlns="http://www.w3.org/2000/svg">
+      <rect width="512" height="512" fill="{bg_color}"/>
+      <circle cx="256" cy="150" r="80" fill="{text_color}" opacity="0.6"/>
+      <rect x="150" y="250" width="212" height="120" fill="{text_color}" opacity="0.6" rx="10"/>
+      <text x="256" y="320" font-size="32" text-anchor="middle" fill="white" font-weight="bold">
+        {word}
+      </text>
+    </svg>'''
+
+DATA_URL_PREFIX = 'data:image/svg+xml;base64,'
+
+# Sentinels marking where variable parts are spliced into a template
+_SLOT_1 = '\x00'
+_SLOT_2 = '\x01'
+
+
+def svgz(svg_bytes):
+    """Gzip SVG bytes (svgz); mtime is fixed so output is reproducible"""
+    return gzip.compress(svg_bytes, compresslevel=9, mtime=0)
+
+
+class SvgRenderer:
+    """Renders gradient and placeholder SVGs from precompiled fragments"""
+
+    def __init__(self, colors=None):
+        self.colors = list(colors or GRADIENT_COLORS)
+        self._gradient_fragments = {}
+        self._gradients = {}
+        self._placeholder_fragments = {}
+        self._lock = threading.Lock()
+
+    def _compile_gradient(self, size):
+        svg = GRADIENT_TEMPLATE.format(
+            size=size, half=size // 2, third=size // 3, quarter=size // 4,
+            sixth=size // 6, three_quarters=3 * size // 4, fifth=size // 5,
+            color1=_SLOT_1, color2=_SLOT_2
+        )
+        head, rest = svg.split(_SLOT_1)
+        middle, tail = rest.split(_SLOT_2)
+        return head.encode('utf-8'), middle.encode('utf-8'), tail.encode('utf-8')
+
+    def _gradient_entry(self, size, color1, color2):
+        key = (size, color1, color2)
+        entry = self._gradients.get(key)
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            fragments = self._gradient_fragments.get(size)
+            if fragments is None:
+                fragments = self._compile_gradient(size)
+                self._gradient_fragments[size] = fragments
+            head, middle, tail = fragments
+            svg_bytes = b''.join([head, color1.encode('utf-8'), middle, color2.encode('utf-8'), tail])
+            # [svg, data URL, svgz]; the last two are filled on first use
+            entry = [svg_bytes, None, None]
+            self._gradients[key] = entry
+        return entry
+
+    def gradient(self, size, color1, color2):
+        """Gradient SVG bytes for a color pair"""
+        return self._gradient_entry(size, color1, color2)[0]
+
+    def gradient_data_url(self, size, color1, color2):
+        """Gradient SVG as a base64 data URL (cached per color pair)"""
+        entry = self._gradient_entry(size, color1, color2)
+        if entry[1] is None:
+            entry[1] = DATA_URL_PREFIX + base64.b64encode(entry[0]).decode('ascii')
+        return entry[1]
+
+    def gradient_svgz(self, size, color1, color2):
+        """Gzipped gradient SVG (cached per color pair)"""
+        entry = self._gradient_entry(size, color1, color2)
+        if entry[2] is None:
+            entry[2] = svgz(entry[0])
+        return entry[2]
+
+    def _placeholder_entry(self, error):
+        fragments = self._placeholder_fragments.get(error)
+        if fragments is not None:
+            return fragments
+
+        svg = PLACEHOLDER_TEMPLATE.format(
+            bg_color='#ffcccc' if error else '#e8f4ff',
+            text_color='#990000' if error else '#0066cc',
+            word=_SLOT_1
+        )
+        head, tail = svg.split(_SLOT_1)
+        head = head.encode('utf-8')
+        # Pad the whitespace before the word to a multiple of 3 bytes so the
+        # head's base64 can be reused verbatim in front of the variable part
+        head = head + b' ' * (-len(head) % 3)
+        fragments = (head, tail.encode('utf-8'), base64.b64encode(head).decode('ascii'))
+        self._placeholder_fragments[error] = fragments
+        return fragments
+
+    def placeholder(self, word, error=False):
+        """Placeholder SVG bytes showing the (escaped, truncated) word"""
+        head, tail, _ = self._placeholder_entry(error)
+        return head + html.escape(word[:20]).encode('utf-8') + tail
+
+    def placeholder_data_url(self, word, error=False):
+        """Placeholder SVG as a base64 data URL, encoding only the word and tail"""
+        head, tail, head_b64 = self._placeholder_entry(error)
+        body = html.escape(word[:20]).encode('utf-8') + tail
+        return DATA_URL_PREFIX + head_b64 + base64.b64encode(body).decode('ascii')
+
+
+_renderer = None
+
+
+def get_renderer():
+    """Get the shared SvgRenderer, creating it on first use"""
+    global _renderer
+    if _renderer is None:
+        _renderer = SvgRenderer()
+    return _renderer
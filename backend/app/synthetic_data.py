@@ -0,0 +1,235 @@
+import random
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from app.models import db, User, GameSession, Round, Word, Guess, UserStats, SessionSummary
+from app.rankings import rebuild_leaderboards
+
+# Synthetic load data.
+# Generates realistic players, finished games, rounds and guesses with one
+# seeded RNG, so the same arguments always produce the same rows. Rows are
+# built in memory with explicit ids and written with executemany Core
+# inserts, committing every commit_rows rows instead of per object.
+
+DEFAULT_ANCHOR = datetime(2025, 1, 1)
+AGE_GROUP_AGES = {'5-7': (5, 7), '8-12': (8, 12), 'adult': (13, 70)}
+DIFFICULTIES = ['easy', 'medium', 'hard']
+DIFFICULTY_SUCCESS = {'easy': 0.8, 'medium': 0.65, 'hard': 0.45}
+ROUND_SPACING_SECONDS = 75
+WRONG_GUESSES = ['cat', 'dog', 'house', 'tree', 'car', 'ball', 'sun', 'fish', 'book', 'idea']
+
+
+def _next_id(column):
+    return (db.session.query(func.max(column)).scalar() or 0) + 1
+
+
+# Column order of the row tuples generate_dataset builds
+COLUMNS = {
+    'users': ('id', 'username', 'age', 'preferred_language', 'created_at'),
+    'user_stats': ('user_id', 'total_games_played', 'total_guesses', 'total_correct_guesses',
+                   'total_points', 'accuracy_percentage', 'words_learned', 'average_time_per_guess',
+                   'current_streak', 'longest_streak', 'created_at'),
+    'game_sessions': ('id', 'user_id', 'age_group', 'difficulty', 'language', 'total_rounds',
+                      'started_at', 'ended_at'),
+    'rounds': ('id', 'session_id', 'word_id', 'round_number', 'started_at', 'guessed_at', 'ended_at',
+               'duration_seconds', 'is_guessed', 'guesses_count', 'points_earned'),
+    'guesses': ('id', 'round_id', 'user_guess', 'is_correct', 'match_type', 'time_taken', 'created_at'),
+    'session_summaries': ('session_id', 'user_id', 'correct', 'total', 'accuracy', 'started_at'),
+}
+
+
+class _BulkWriter:
+    """Collects row tuples per table and inserts them in large executemany batches"""
+
+    def __init__(self, tables, batch_rows, commit_rows):
+        # Tables in parent-before-child order so foreign keys always resolve
+        self.tables = tables
+        self.batch_rows = batch_rows
+        self.commit_rows = commit_rows
+        self.pending = {table: [] for table in tables}
+        self.uncommitted = 0
+        self.counts = {table.name: 0 for table in tables}
+
+        # On SQLite, rows go straight to the driver's executemany: SQLAlchemy's
+        # per-row parameter processing would otherwise take most of the time.
+        # Timestamps are then passed pre-formatted in SQLAlchemy's storage format.
+        self.raw = db.engine.dialect.name == 'sqlite'
+
+    def timestamp(self, value):
+        """Value for a DateTime column"""
+        if value is None or not self.raw:
+            return value
+        return value.isoformat(' ', 'microseconds')
+
+    def add(self, table, row):
+        rows = self.pending[table]
+        rows.append(row)
+        if len(rows) >= self.batch_rows:
+            self.write()
+
+    def write(self):
+        for table in self.tables:
+            rows = self.pending[table]
+            if not rows:
+                continue
+            columns = COLUMNS[table.name]
+            if self.raw:
+                statement = 'INSERT INTO {} ({}) VALUES ({})'.format(
+                    table.name, ', '.join(columns), ', '.join('?' * len(columns))
+                )
+                cursor = db.session.connection().connection.cursor()
+                cursor.executemany(statement, rows)
+                cursor.close()
+            else:
+                db.session.execute(table.insert(), [dict(zip(columns, row)) for row in rows])
+            self.counts[table.name] += len(rows)
+            self.uncommitted += len(rows)
+            self.pending[table] = []
+
+        if self.uncommitted >= self.commit_rows:
+            self.commit()
+
+    def commit(self):
+        db.session.commit()
+        self.uncommitted = 0
+
+
+def generate_dataset(users=1000, rounds=10000, guesses_per_round=5, rounds_per_session=10,
+                     seed=42, anchor=DEFAULT_ANCHOR, days=365, batch_rows=20000, commit_rows=500000):
+    """
+    Bulk-insert a synthetic dataset on top of what is already in the database
+
+    The ranked leaderboards are rebuilt afterwards.
+
+    Args:
+        users (int): Players to create
+        rounds (int): Rounds to create (sessions = rounds / rounds_per_session)
+        guesses_per_round (float): Average Guess rows per round (0 for none)
+        rounds_per_session (int): Rounds in each finished session
+        seed (int): RNG seed; same arguments give the same data
+        anchor (datetime): Most recent possible session start
+        days (int): Sessions are spread over this many days before anchor
+        batch_rows (int): Rows per executemany call
+        commit_rows (int): Rows per transaction
+
+    Returns:
+        dict: Rows inserted per table and elapsed seconds
+    """
+
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    writer = _BulkWriter([User.__table__, UserStats.__table__, GameSession.__table__,
+                          Round.__table__, Guess.__table__, SessionSummary.__table__],
+                         batch_rows, commit_rows)
+    ts = writer.timestamp
+
+    pools = {}
+    for word_id, age_group, difficulty in db.session.query(Word.id, Word.age_group, Word.difficulty):
+        pools.setdefault((age_group, difficulty), []).append(word_id)
+    if not pools:
+        raise ValueError('No words in the database; run the seed command first')
+    age_groups = sorted({age_group for age_group, _ in pools})
+    if rounds and not users:
+        raise ValueError('Rounds need at least one user')
+
+    user_id = _next_id(User.id)
+    session_id = _next_id(GameSession.id)
+    round_id = _next_id(Round.id)
+    guess_id = _next_id(Guess.id)
+
+    # Skewed activity: a few heavy players, a long tail of occasional ones
+    sessions_total = rounds // rounds_per_session
+    weights = [rng.paretovariate(1.5) for _ in range(users)]
+    scale = sessions_total / sum(weights) if users else 0
+    session_counts = [int(w * scale) for w in weights]
+    for _ in range(sessions_total - sum(session_counts)):
+        session_counts[rng.randrange(users)] += 1
+
+    users_table = User.__table__
+    stats_table = UserStats.__table__
+    sessions_table = GameSession.__table__
+    rounds_table = Round.__table__
+    guesses_table = Guess.__table__
+    summaries_table = SessionSummary.__table__
+    add = writer.add
+    spacing = timedelta(seconds=ROUND_SPACING_SECONDS)
+    round_length = timedelta(seconds=60)
+
+    for n in range(users):
+        age_group = rng.choice(age_groups)
+        age = rng.randint(*AGE_GROUP_AGES.get(age_group, (13, 70)))
+        created_at = ts(anchor - timedelta(days=days, minutes=rng.randint(0, 60 * 24 * 30)))
+        language = 'es' if rng.random() < 0.2 else 'en'
+        add(users_table, (user_id, f'load_user_{user_id}', age, language, created_at))
+
+        starts = sorted(anchor - timedelta(seconds=rng.randint(0, days * 86400))
+                        for _ in range(session_counts[n]))
+        games = guesses = correct_total = points_total = streak = longest = 0
+        time_total = 0.0
+
+        for session_start in starts:
+            difficulty = rng.choice(DIFFICULTIES)
+            pool = pools.get((age_group, difficulty)) or pools[rng.choice(list(pools))]
+            success = DIFFICULTY_SUCCESS[difficulty]
+            round_start = session_start
+            correct = 0
+
+            add(sessions_table, (session_id, user_id, age_group, difficulty, 'en', rounds_per_session,
+                                 ts(session_start), ts(session_start + spacing * rounds_per_session)))
+
+            for round_number in range(1, rounds_per_session + 1):
+                is_guessed = rng.random() < success
+                guess_count = max(1, round(rng.expovariate(1 / guesses_per_round))) if guesses_per_round else 1
+                time_taken = rng.uniform(3, 55) if is_guessed else 60.0
+                points = max(10, 100 - int(time_taken)) if is_guessed else 0
+
+                add(rounds_table, (round_id, session_id, rng.choice(pool), round_number, ts(round_start),
+                                   ts(round_start + timedelta(seconds=time_taken)) if is_guessed else None,
+                                   ts(round_start + round_length), 60, is_guessed, guess_count, points))
+
+                if guesses_per_round:
+                    step = time_taken / guess_count
+                    for i in range(1, guess_count + 1):
+                        hit = is_guessed and i == guess_count
+                        add(guesses_table, (guess_id, round_id,
+                                            'correct' if hit else rng.choice(WRONG_GUESSES),
+                                            hit, 'exact' if hit else 'none', round(step * i, 2),
+                                            ts(round_start + timedelta(seconds=step * i))))
+                        guess_id += 1
+
+                guesses += guess_count
+                time_total += time_taken
+                if is_guessed:
+                    correct += 1
+                    points_total += points
+                    streak += 1
+                    longest = max(longest, streak)
+                else:
+                    streak = 0
+
+                round_id += 1
+                round_start += spacing
+
+            correct_total += correct
+            add(summaries_table, (session_id, user_id, correct, rounds_per_session,
+                                  correct / rounds_per_session * 100, ts(session_start)))
+            games += 1
+            session_id += 1
+
+        rounds_played = games * rounds_per_session
+        add(stats_table, (user_id, games, guesses, correct_total, points_total,
+                          correct_total / guesses * 100 if guesses else 0.0, correct_total,
+                          time_total / rounds_played if rounds_played else 0.0,
+                          streak, longest, created_at))
+        user_id += 1
+
+    writer.write()
+    writer.commit()
+
+    # The ranked leaderboards are derived from the stats and rounds just written
+    rebuild_leaderboards()
+    db.session.commit()
+
+    result = dict(writer.counts)
+    result['seconds'] = round(time.perf_counter() - started, 2)
+    return result
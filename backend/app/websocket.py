@@ -0,0 +1,230 @@
+import asyncio
+import base64
+import hashlib
+import os
+import struct
+
+# Minimal RFC 6455 WebSockets over asyncio streams.
+# Enough of the protocol for JSON text messages: the opening handshake,
+# masked client frames, fragmented messages, ping/pong and close. Frames
+# are encoded once with encode_text() and the same bytes are written to
+# every socket of a broadcast.
+
+GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+MAX_MESSAGE_BYTES = 64 * 1024
+MAX_HEADER_BYTES = 8 * 1024
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+
+class HandshakeError(Exception):
+    """Request was not a valid WebSocket upgrade"""
+
+
+class ConnectionClosed(Exception):
+    """Peer closed the connection or broke the protocol"""
+
+
+def accept_key(key):
+    return base64.b64encode(hashlib.sha1((key + GUID).encode()).digest()).decode()
+
+
+def encode_frame(opcode, payload=b'', mask=False):
+    """One unfragmented frame (clients must mask, servers must not)"""
+    length = len(payload)
+    head = bytes([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    if length < 126:
+        head += bytes([mask_bit | length])
+    elif length < 65536:
+        head += bytes([mask_bit | 126]) + struct.pack('!H', length)
+    else:
+        head += bytes([mask_bit | 127]) + struct.pack('!Q', length)
+    if not mask:
+        return head + payload
+    key = os.urandom(4)
+    return head + key + _apply_mask(payload, key)
+
+
+def encode_text(text):
+    """Server text frame, ready to write to any number of sockets"""
+    return encode_frame(OP_TEXT, text.encode())
+
+
+def _apply_mask(payload, key):
+    if not payload:
+        return payload
+    # XOR with the repeated 4-byte key, done as one big integer
+    n = len(payload)
+    repeated = (key * (n // 4 + 1))[:n]
+    return (int.from_bytes(payload, 'big') ^ int.from_bytes(repeated, 'big')).to_bytes(n, 'big')
+
+
+def _parse_headers(raw):
+    lines = raw.decode('latin-1').split('\r\n')
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+    return lines[0], headers
+
+
+class WebSocket:
+    """One open connection (server or client side)"""
+
+    def __init__(self, reader, writer, path='/', is_client=False, max_message=MAX_MESSAGE_BYTES):
+        self.reader = reader
+        self.writer = writer
+        self.path = path
+        self.is_client = is_client
+        self.max_message = max_message
+        self.closed = False
+
+    @property
+    def buffered_bytes(self):
+        """Bytes written but not yet accepted by the kernel (slow reader detection)"""
+        transport = self.writer.transport
+        return transport.get_write_buffer_size() if transport else 0
+
+    def send_frame(self, frame):
+        """Write an already encoded frame without waiting for it to drain"""
+        if self.closed or self.writer.is_closing():
+            self.closed = True
+            return
+        self.writer.write(frame)
+
+    def send_text(self, text):
+        if self.is_client:
+            self.send_frame(encode_frame(OP_TEXT, text.encode(), mask=True))
+        else:
+            self.send_frame(encode_text(text))
+
+    async def drain(self):
+        await self.writer.drain()
+
+    async def _read_frame(self):
+        head = await self.reader.readexactly(2)
+        fin = head[0] & 0x80
+        opcode = head[0] & 0x0F
+        masked = head[1] & 0x80
+        length = head[1] & 0x7F
+        if length == 126:
+            length = struct.unpack('!H', await self.reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack('!Q', await self.reader.readexactly(8))[0]
+        if length > self.max_message:
+            raise ConnectionClosed('message too big')
+        if masked != (0 if self.is_client else 0x80):
+            raise ConnectionClosed('bad masking')
+        key = await self.reader.readexactly(4) if masked else None
+        payload = await self.reader.readexactly(length)
+        if key:
+            payload = _apply_mask(payload, key)
+        return fin, opcode, payload
+
+    async def recv(self):
+        """
+        Next text message
+
+        Returns:
+            str: Message, or None once the connection is closed
+        """
+        parts = []
+        size = 0
+        try:
+            while True:
+                fin, opcode, payload = await self._read_frame()
+                if opcode == OP_PING:
+                    self.send_frame(encode_frame(OP_PONG, payload, mask=self.is_client))
+                    continue
+                if opcode == OP_PONG:
+                    continue
+                if opcode == OP_CLOSE:
+                    await self.close()
+                    return None
+                if opcode not in (OP_TEXT, OP_BINARY, OP_CONTINUATION):
+                    raise ConnectionClosed('unknown opcode')
+                size += len(payload)
+                if size > self.max_message:
+                    raise ConnectionClosed('message too big')
+                parts.append(payload)
+                if fin:
+                    return b''.join(parts).decode('utf-8', 'replace')
+        except (asyncio.IncompleteReadError, ConnectionError, ConnectionClosed):
+            await self.close()
+            return None
+
+    async def close(self, code=1000):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.writer.write(encode_frame(OP_CLOSE, struct.pack('!H', code), mask=self.is_client))
+            self.writer.close()
+        except (ConnectionError, RuntimeError):
+            pass
+
+
+async def accept(reader, writer, max_message=MAX_MESSAGE_BYTES):
+    """
+    Complete the server side of the opening handshake
+
+    Args:
+        reader (asyncio.StreamReader): New connection
+        writer (asyncio.StreamWriter): New connection
+
+    Returns:
+        WebSocket: Open connection
+
+    Raises:
+        HandshakeError: The request was not a WebSocket upgrade (a 400 was sent)
+    """
+    try:
+        raw = await reader.readuntil(b'\r\n\r\n')
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+        raise HandshakeError('incomplete request') from e
+    if len(raw) > MAX_HEADER_BYTES:
+        raise HandshakeError('headers too large')
+
+    request_line, headers = _parse_headers(raw)
+    parts = request_line.split()
+    key = headers.get('sec-websocket-key')
+    if (len(parts) != 3 or parts[0] != 'GET' or not key
+            or headers.get('upgrade', '').lower() != 'websocket'):
+        writer.write(b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+        writer.close()
+        raise HandshakeError('not a websocket upgrade')
+
+    writer.write(
+        'HTTP/1.1 101 Switching Protocols\r\n'
+        'Upgrade: websocket\r\n'
+        'Connection: Upgrade\r\n'
+        f'Sec-WebSocket-Accept: {accept_key(key)}\r\n\r\n'.encode()
+    )
+    return WebSocket(reader, writer, path=parts[1], max_message=max_message)
+
+
+async def connect(host, port, path='/'):
+    """Client side of the handshake (used by the load generator)"""
+    reader, writer = await asyncio.open_connection(host, port)
+    key = base64.b64encode(os.urandom(16)).decode()
+    writer.write(
+        f'GET {path} HTTP/1.1\r\n'
+        f'Host: {host}:{port}\r\n'
+        'Upgrade: websocket\r\n'
+        'Connection: Upgrade\r\n'
+        f'Sec-WebSocket-Key: {key}\r\n'
+        'Sec-WebSocket-Version: 13\r\n\r\n'.encode()
+    )
+    raw = await reader.readuntil(b'\r\n\r\n')
+    status, headers = _parse_headers(raw)
+    if ' 101 ' not in status or headers.get('sec-websocket-accept') != accept_key(key):
+        writer.close()
+        raise HandshakeError(status)
+    return WebSocket(reader, writer, path=path, is_client=True)
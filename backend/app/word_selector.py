@@ -1,3 +1,4 @@
+import hashlib
 import random
 from datetime import datetime
 
@@ -96,6 +97,169 @@ WORD_DATABASE = {
     }
 }
 
+class WordCatalog:
+    """
+    Word pool indexed by (age_group, difficulty) and lowercase name
+    
+    Built once; every word gets an integer index so a session can track the
+    words it has used as a set of indices or an int bitset (bit i = word i).
+    """
+    
+    # Random picks tried before falling back to scanning the pool
+    MAX_REJECTIONS = 8
+    
+    def __init__(self, max_word_length=20):
+        self.max_word_length = max_word_length
+        self.words = []
+        self.pool_keys = []
+        self._pools = {}
+        self._eligible_pools = {}
+        self._by_name = {}
+        self._version = None
+    
+    @classmethod
+    def from_word_database(cls, word_database, **kwargs):
+        """Build a catalog from a WORD_DATABASE-shaped nested dict"""
+        catalog = cls(**kwargs)
+        for age_group in word_database:
+            for difficulty in word_database[age_group]:
+                for word_data in word_database[age_group][difficulty]:
+                    catalog.add(age_group, difficulty, word_data)
+        return catalog
+    
+    def add(self, age_group, difficulty, word_data):
+        """
+        Add one word to the catalog
+        
+        Args:
+            age_group (str): '5-7', '8-12', or 'adult'
+            difficulty (str): 'easy', 'medium', or 'hard'
+            word_data (dict): {'word', 'definition', 'translation', 'category'}
+        
+        Returns:
+            int: Index of the new word
+        """
+        index = len(self.words)
+        key = (age_group, difficulty)
+        self.words.append(word_data)
+        self.pool_keys.append(key)
+        
+        self._pools.setdefault(key, []).append(index)
+        if len(word_data['word']) <= self.max_word_length:
+            self._eligible_pools.setdefault(key, []).append(index)
+        # First definition of a name wins, as with the old nested scan
+        self._by_name.setdefault(word_data['word'].lower(), index)
+        self._version = None
+        return index
+    
+    def __len__(self):
+        return len(self.words)
+    
+    @property
+    def version(self):
+        """Digest of the (pool, word) at every index; changes whenever an index would mean another word"""
+        if self._version is None:
+            digest = hashlib.blake2b(digest_size=16)
+            for key, word_data in zip(self.pool_keys, self.words):
+                digest.update(repr((key, word_data['word'])).encode())
+            self._version = digest.hexdigest()
+        return self._version
+    
+    def has_pool(self, age_group, difficulty=None):
+        """True if there are words for the age group (and difficulty)"""
+        if difficulty is None:
+            return any(key[0] == age_group for key in self._pools)
+        return (age_group, difficulty) in self._pools
+    
+    def index_of(self, word_name):
+        """Index of a word by case-insensitive name, or None"""
+        return self._by_name.get(word_name.lower())
+    
+    def get(self, word_name):
+        """Word data by case-insensitive name, or None"""
+        index = self._by_name.get(word_name.lower())
+        return self.words[index] if index is not None else None
+    
+    def word_details(self, index, age_group=None, difficulty=None):
+        """
+        Word data as returned by select_word
+        
+        Args:
+            index (int): Word index
+            age_group (str): Reported age group (defaults to the word's pool)
+            difficulty (str): Reported difficulty (defaults to the word's pool)
+        """
+        word_data = self.words[index]
+        pool_age_group, pool_difficulty = self.pool_keys[index]
+        return {
+            'word': word_data['word'],
+            'definition': word_data['definition'],
+            'translation': word_data['translation'],
+            'category': word_data['category'],
+            'age_group': age_group or pool_age_group,
+            'difficulty': difficulty or pool_difficulty
+        }
+    
+    def pool(self, age_group, difficulty):
+        """Indices of every word in an (age_group, difficulty) pool"""
+        return self._pools.get((age_group, difficulty), [])
+    
+    def sample(self, age_group, difficulty, k, rng=random):
+        """Sample k distinct word indices from a pool (no replacement)"""
+        pool = self._eligible_pools.get((age_group, difficulty)) or self.pool(age_group, difficulty)
+        return rng.sample(pool, min(k, len(pool)))
+    
+    def choose(self, age_group, difficulty, exclude=None, rng=random):
+        """
+        Pick a random word index from a pool, skipping excluded words
+        
+        Args:
+            age_group (str): Age group of the pool
+            difficulty (str): Difficulty of the pool
+            exclude: Set of word indices or int bitset of used words
+            rng: Random source
+        
+        Returns:
+            int: Word index, or None if the pool is empty
+        """
+        pool = self._eligible_pools.get((age_group, difficulty))
+        if not pool:
+            pool = self.pool(age_group, difficulty)
+            if not pool:
+                return None
+        
+        if not exclude:
+            return rng.choice(pool)
+        
+        if isinstance(exclude, int):
+            is_excluded = lambda i: (exclude >> i) & 1
+        else:
+            is_excluded = exclude.__contains__
+        
+        # While most of the pool is unused a few random picks are enough
+        for _ in range(self.MAX_REJECTIONS):
+            index = rng.choice(pool)
+            if not is_excluded(index):
+                return index
+        
+        available = [i for i in pool if not is_excluded(i)]
+        if not available:
+            # If all words used, refresh the pool
+            available = pool
+        return rng.choice(available)
+
+
+_catalog = None
+
+
+def get_catalog():
+    """Get the shared WordCatalog, building it on first use"""
+    global _catalog
+    if _catalog is None:
+        _catalog = WordCatalog.from_word_database(WORD_DATABASE)
+    return _catalog
+
+
 def select_word(age_group='adult', difficulty='medium', language='en', used_words=None):
     """
     Select a word based on age group and difficulty level
@@ -114,52 +278,46 @@ def select_word(age_group='adult', difficulty='medium', language='en', used_word
         age_group (str): '5-7', '8-12', or 'adult'
         difficulty (str): 'easy', 'medium', or 'hard'
         language (str): Language code (en, es, etc.)
-        used_words (list): Words already used in session
+        used_words (iterable): Words already used in session (names), or an
+            int bitset of WordCatalog indices
     
     Returns:
         dict: Word data with definition, translation, category
     """
     
-    if used_words is None:
-        used_words = []
+    catalog = get_catalog()
+    age_group, difficulty = resolve_pool(age_group, difficulty)
     
-    # Get appropriate word pool
-    if age_group not in WORD_DATABASE:
-        age_group = 'adult'
+    exclude = used_words
+    if used_words and not isinstance(used_words, int):
+        exclude = {catalog.index_of(name) for name in used_words} - {None}
     
-    if difficulty not in WORD_DATABASE[age_group]:
-        difficulty = 'medium'
+    index = catalog.choose(age_group, difficulty, exclude=exclude)
+    if index is None:
+        return None
     
-    word_pool = WORD_DATABASE[age_group][difficulty]
+    return catalog.word_details(index, age_group, difficulty)
+
+
+def resolve_pool(age_group, difficulty):
+    """
+    Map a requested age group/difficulty onto an existing word pool
     
-    # Filter out used words and verify word length (max 20 chars)
-    available_words = [
-        w for w in word_pool 
-        if w['word'] not in used_words and len(w['word']) <= 20
-    ]
+    Returns:
+        tuple: (age_group, difficulty), falling back to 'adult' / 'medium'
+    """
+    catalog = get_catalog()
     
-    if not available_words:
-        # If all words used, refresh the pool
-        available_words = word_pool
+    # Get appropriate word pool
+    if not catalog.has_pool(age_group):
+        age_group = 'adult'
     
-    # Select random word
-    selected_word = random.choice(available_words)
+    if not catalog.has_pool(age_group, difficulty):
+        difficulty = 'medium'
     
-    return {
-        'word': selected_word['word'],
-        'definition': selected_word['definition'],
-        'translation': selected_word['translation'],
-        'category': selected_word['category'],
-        'age_group': age_group,
-        'difficulty': difficulty
-    }
+    return age_group, difficulty
 
 
 def get_word_by_name(word_name):
     """Get word details by name"""
-    for age_group in WORD_DATABASE:
-        for difficulty in WORD_DATABASE[age_group]:
-            for word_data in WORD_DATABASE[age_group][difficulty]:
-                if word_data['word'].lower() == word_name.lower():
-                    return word_data
-    return None
+    return get_catalog().get(word_name)
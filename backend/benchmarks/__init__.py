@@ -0,0 +1,4 @@
+# Benchmarks for the Bictionary backend.
+#
+# Run from the backend directory, e.g.:
+#     python -m benchmarks.bench_leaderboard --users 10000
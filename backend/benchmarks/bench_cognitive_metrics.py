@@ -0,0 +1,95 @@
+"""
+Cognitive metrics benchmark
+
+Grows one user's history and checks that
+/api/psychology/cognitive-metrics/<user_id> runs the same, fixed number of
+SQL statements at every size. Exits non-zero if the count grows.
+
+    python -m benchmarks.bench_cognitive_metrics --sessions 10 100 1000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+from benchmarks.common import create_bench_app, count_queries, measure
+
+MAX_QUERIES = 8
+
+
+def add_history(db, user_id, sessions, rounds_per_session=10, seed=3):
+    """Bulk-insert finished sessions with rounds for one user"""
+    from app.models import GameSession, Round, Word
+
+    rng = random.Random(seed)
+    word_ids = [w for (w,) in db.session.query(Word.id).all()]
+    first_session = (db.session.query(db.func.max(GameSession.id)).scalar() or 0) + 1
+    start = datetime.now() - timedelta(days=sessions)
+
+    session_rows = []
+    round_rows = []
+    for n in range(sessions):
+        session_id = first_session + n
+        started = start + timedelta(days=n)
+        session_rows.append({
+            'id': session_id, 'user_id': user_id, 'age_group': 'adult',
+            'difficulty': rng.choice(['easy', 'medium', 'hard']), 'language': 'en',
+            'total_rounds': rounds_per_session, 'started_at': started,
+            'ended_at': started + timedelta(minutes=15)
+        })
+        for i in range(rounds_per_session):
+            guessed = rng.random() > 0.3
+            round_started = started + timedelta(minutes=i * 1.5)
+            round_rows.append({
+                'session_id': session_id, 'word_id': rng.choice(word_ids), 'round_number': i + 1,
+                'started_at': round_started,
+                'guessed_at': round_started + timedelta(seconds=rng.uniform(5, 55)) if guessed else None,
+                'duration_seconds': 60, 'is_guessed': guessed,
+                'guesses_count': rng.randint(1, 3), 'points_earned': 100 if guessed else 0
+            })
+
+    db.session.execute(GameSession.__table__.insert(), session_rows)
+    db.session.execute(Round.__table__.insert(), round_rows)
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sessions', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    app, db_path = create_bench_app()
+    from app.models import db
+
+    client = app.test_client()
+    url = '/api/psychology/cognitive-metrics/1'
+    results = []
+    added = 0
+    try:
+        with app.app_context():
+            for sessions in sorted(args.sessions):
+                add_history(db, 1, sessions - added)
+                added = sessions
+                db.session.remove()
+
+                with count_queries(db.engine) as counter:
+                    response = client.get(url)
+                assert response.status_code == 200, response.get_json()
+                results.append(dict(measure(lambda: client.get(url), args.repeat),
+                                    sessions=sessions, queries=counter.count))
+    finally:
+        os.remove(db_path)
+
+    print(json.dumps(results, indent=2))
+
+    counts = {r['queries'] for r in results}
+    if len(counts) != 1 or max(counts) > MAX_QUERIES:
+        print(f'FAIL: query count varies with history or exceeds {MAX_QUERIES}: {sorted(counts)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
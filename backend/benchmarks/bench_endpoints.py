@@ -0,0 +1,230 @@
+"""
+Endpoint benchmark suite
+
+Seeds a synthetic dataset, then drives every route in run.py through the
+Flask test client. Each route gets p50/p95/p99 latency, SQL statements per
+request and peak allocations per request (tracemalloc, in a separate pass
+so tracing does not skew the timings).
+
+With --baseline the results are compared to a saved run. The command exits
+non-zero if a watched route (/api/guess, /api/next-round and /api/dashboard
+by default) issues more statements than before, or if its p95 grows past
+--latency-tolerance. --write-baseline saves the current run.
+
+    python -m benchmarks.bench_endpoints --users 1000 --rounds 10000 --write-baseline benchmarks/baseline_endpoints.json
+    python -m benchmarks.bench_endpoints --baseline benchmarks/baseline_endpoints.json
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.common import QueryCounter, create_bench_app, summarize
+
+WATCHED = ['POST /api/guess', 'POST /api/next-round', 'GET /api/dashboard']
+
+
+def build_scenarios(client, db, repeat):
+    """
+    One request factory per route: {'METHOD rule': fn(i) -> (method, url, json)}
+    (plus labelled variants for routes with more than one code path)
+
+    Stateful routes get their own fixtures (a live round for guesses, a long
+    session for next-round) so every call does the same work.
+    """
+    from app.models import GameSession, Round, UserStats
+
+    user_id = db.session.query(UserStats.user_id).order_by(UserStats.total_games_played.desc()).limit(1).scalar()
+    finished = db.session.query(GameSession.id).filter(
+        GameSession.user_id == user_id, GameSession.ended_at.isnot(None)
+    ).limit(1).scalar()
+
+    live = client.post('/api/start-game', json={'user_id': user_id, 'rounds': 1}).get_json()
+    round_id = live['round']['round_id']
+    # Keep the guessed round open for the whole run (the server closes it after 60 s)
+    Round.query.filter_by(id=round_id).update({'duration_seconds': 86400})
+    db.session.commit()
+    image_url = live['round']['image_url']
+    word_id = db.session.get(Round, round_id).word_id
+    long_game = client.post('/api/start-game', json={'user_id': user_id, 'rounds': repeat * 4 + 10}).get_json()
+    session_id = long_game['session_id']
+    tag = f'{os.getpid()}_{int(time.time())}'
+
+    return {
+        'GET /api/health': lambda i: ('GET', '/api/health', None),
+        'POST /api/start-game': lambda i: ('POST', '/api/start-game', {'user_id': user_id, 'rounds': 5}),
+        'POST /api/guess': lambda i: ('POST', '/api/guess', {
+            'round_id': round_id, 'guess': f'guess{i % 7}', 'user_id': user_id, 'time_taken': 5
+        }),
+        'POST /api/guess/batch': lambda i: ('POST', '/api/guess/batch', {
+            'round_id': round_id, 'guesses': [f'guess{j}' for j in range(10)]
+        }),
+        'POST /api/next-round': lambda i: ('POST', '/api/next-round', {'session_id': session_id}),
+        'GET /api/game-summary/<int:session_id>': lambda i: ('GET', f'/api/game-summary/{finished}', None),
+        'POST /api/user/create': lambda i: ('POST', '/api/user/create', {'username': f'bench_{tag}_{i}', 'age': 20}),
+        'GET /api/user/<int:user_id>/stats': lambda i: ('GET', f'/api/user/{user_id}/stats', None),
+        'GET /api/psychology/learning-curve/<int:user_id>':
+            lambda i: ('GET', f'/api/psychology/learning-curve/{user_id}', None),
+        'GET /api/psychology/cognitive-metrics/<int:user_id>':
+            lambda i: ('GET', f'/api/psychology/cognitive-metrics/{user_id}', None),
+        'GET /api/psychology/comparative-analysis': lambda i: ('GET', '/api/psychology/comparative-analysis', None),
+        'GET /api/dashboard': lambda i: ('GET', '/api/dashboard', None),
+        'GET /api/leaderboard': lambda i: ('GET', '/api/leaderboard?board=weekly&limit=10', None),
+        'GET /api/leaderboard/user/<int:user_id>':
+            lambda i: ('GET', f'/api/leaderboard/user/{user_id}?board=all&around=5', None),
+        'GET /api/users': lambda i: ('GET', '/api/users?page=2&per_page=50', None),
+        'GET /api/words': lambda i: ('GET', '/api/words', None),
+        'GET /api/image/<key>': lambda i: ('GET', image_url, None),
+        # Word ids take the other branch of the same route (one lookup, short cache lifetime)
+        'GET /api/image/<key> (word id)': lambda i: ('GET', f'/api/image/{word_id}', None),
+        'GET /api/metrics': lambda i: ('GET', '/api/metrics', None),
+    }
+
+
+def app_routes(app):
+    """'METHOD rule' for every route the app serves"""
+    routes = set()
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint == 'static':
+            continue
+        for method in rule.methods - {'HEAD', 'OPTIONS'}:
+            routes.add(f'{method} {rule.rule}')
+    return routes
+
+
+def run_scenario(client, engine, make_request, repeat, warmup, offset):
+    def call(i):
+        method, url, body = make_request(i)
+        response = client.open(url, method=method, json=body)
+        if response.status_code >= 400:
+            raise RuntimeError(f'{method} {url} -> {response.status_code}: {response.get_data(as_text=True)[:200]}')
+
+    for i in range(warmup):
+        call(offset + i)
+    offset += warmup
+
+    latencies = []
+    queries = []
+    for i in range(repeat):
+        with QueryCounter(engine) as counter:
+            start = time.perf_counter()
+            call(offset + i)
+            latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(counter.count)
+    offset += repeat
+
+    allocations = []
+    tracemalloc.start()
+    try:
+        for i in range(max(3, repeat // 5)):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            call(offset + i)
+            allocations.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+
+    return dict(
+        summarize(latencies),
+        queries=max(queries),
+        alloc_peak_kb=round(statistics.median(allocations) / 1024, 1)
+    )
+
+
+def compare(results, baseline, watched, tolerance, min_delta_ms=1.0):
+    """Regressions of the current run against a baseline, as messages"""
+    regressions = []
+    for route in watched:
+        now = results.get(route)
+        before = baseline.get('routes', {}).get(route)
+        if not now or not before:
+            continue
+        if now['queries'] > before['queries']:
+            regressions.append(f"{route}: {now['queries']} SQL statements (baseline {before['queries']})")
+        limit = max(before['p95_ms'] * tolerance, before['p95_ms'] + min_delta_ms)
+        if tolerance and now['p95_ms'] > limit:
+            regressions.append(f"{route}: p95 {now['p95_ms']} ms (baseline {before['p95_ms']} ms)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--rounds', type=int, default=10000)
+    parser.add_argument('--guesses-per-round', type=float, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--routes', nargs='*', help='Only these routes (e.g. "GET /api/dashboard")')
+    parser.add_argument('--baseline', help='Baseline JSON to compare against')
+    parser.add_argument('--write-baseline', help='Save this run as a baseline JSON')
+    parser.add_argument('--watch', nargs='*', default=WATCHED, help='Routes whose regressions fail the run')
+    parser.add_argument('--latency-tolerance', type=float, default=1.5,
+                        help='Allowed p95 growth factor (0 compares statement counts only)')
+    args = parser.parse_args()
+
+    log_dir = tempfile.mkdtemp(prefix='bictionary-bench-stats-')
+    app, db_path = create_bench_app(config={'STATS_LOG_DIR': log_dir})
+    from app.guess_recorder import disable_guess_recorder
+    from app.models import db
+    from app.stats_writer import disable_stats_writer
+    from app.synthetic_data import generate_dataset
+
+    try:
+        with app.app_context():
+            dataset = generate_dataset(users=args.users, rounds=args.rounds,
+                                       guesses_per_round=args.guesses_per_round, seed=args.seed)
+            db.session.remove()
+
+            client = app.test_client()
+            scenarios = build_scenarios(client, db, args.repeat + args.warmup)
+            missing = app_routes(app) - set(scenarios)
+            if missing:
+                raise SystemExit(f'No benchmark scenario for: {", ".join(sorted(missing))}')
+
+            results = {}
+            for n, route in enumerate(sorted(scenarios)):
+                if args.routes and route not in args.routes:
+                    continue
+                results[route] = run_scenario(client, db.engine, scenarios[route],
+                                              args.repeat, args.warmup, offset=n * 10000)
+                print(f"{route:55} p50 {results[route]['p50_ms']:8.2f} ms  p99 {results[route]['p99_ms']:8.2f} ms  "
+                      f"{results[route]['queries']:3d} SQL  {results[route]['alloc_peak_kb']:8.1f} KiB",
+                      file=sys.stderr)
+    finally:
+        disable_guess_recorder()
+        disable_stats_writer()
+        os.remove(db_path)
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+    report = {
+        'dataset': {k: v for k, v in dataset.items() if k != 'seconds'},
+        'repeat': args.repeat,
+        'routes': results,
+    }
+    print(json.dumps(report, indent=2, sort_keys=True))
+
+    if args.write_baseline:
+        with open(args.write_baseline, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('dataset') != report['dataset']:
+            print('WARNING: baseline was recorded on a different dataset', file=sys.stderr)
+        regressions = compare(results, baseline, args.watch, args.latency_tolerance)
+        if regressions:
+            for regression in regressions:
+                print(f'REGRESSION: {regression}', file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
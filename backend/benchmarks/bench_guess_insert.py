@@ -0,0 +1,63 @@
+"""
+Guess persistence benchmark
+
+Measures Guess rows/sec written through GuessRecorder (executemany, one
+transaction per batch) against one ORM add + commit per guess. The target
+is at least 1k guesses/sec on SQLite.
+
+    python -m benchmarks.bench_guess_insert --guesses 20000
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+from benchmarks.common import create_bench_app
+from app.guess_recorder import GuessRecorder, disable_guess_recorder
+
+TARGET_PER_SEC = 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--guesses', type=int, default=20000)
+    parser.add_argument('--batch', type=int, default=200)
+    args = parser.parse_args()
+
+    app, db_path = create_bench_app()
+    from app.models import db, Guess, Round
+
+    disable_guess_recorder()
+    results = {}
+    try:
+        with app.app_context():
+            round_id = db.session.query(db.func.min(Round.id)).scalar()
+
+            # Reference: one transaction per guess
+            count = min(args.guesses, 1000)
+            start = time.perf_counter()
+            for i in range(count):
+                db.session.add(Guess(round_id=round_id, user_guess=f'g{i}', is_correct=False,
+                                     match_type='none', time_taken=1.0, created_at=datetime.now()))
+                db.session.commit()
+            results['per_guess_commit_per_sec'] = round(count / (time.perf_counter() - start))
+
+        recorder = GuessRecorder(app, interval=3600, max_pending=args.batch)
+        start = time.perf_counter()
+        for i in range(args.guesses):
+            recorder.record(round_id, f'g{i}', i % 3 == 0, 'exact' if i % 3 == 0 else 'none', 1.0)
+            if recorder.pending_count() >= args.batch:
+                recorder.flush()
+        recorder.close()
+        per_sec = args.guesses / (time.perf_counter() - start)
+        results['buffered_per_sec'] = round(per_sec)
+        results['meets_target'] = per_sec >= TARGET_PER_SEC
+    finally:
+        os.remove(db_path)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
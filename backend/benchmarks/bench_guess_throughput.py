@@ -0,0 +1,56 @@
+"""
+/api/guess throughput benchmark
+
+Posts guesses through the Flask test client with UserStats written
+synchronously and with the write-behind aggregator.
+
+    python -m benchmarks.bench_guess_throughput --guesses 2000
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.common import create_bench_app
+from app.stats_writer import configure_stats_writer, disable_stats_writer
+
+
+def post_guesses(client, round_id, count):
+    start = time.perf_counter()
+    for i in range(count):
+        client.post('/api/guess', json={'round_id': round_id, 'guess': f'guess{i % 7}', 'time_taken': 5})
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--guesses', type=int, default=2000)
+    args = parser.parse_args()
+
+    app, db_path = create_bench_app()
+    log_dir = tempfile.mkdtemp(prefix='bictionary-stats-log-')
+    client = app.test_client()
+    results = {}
+
+    try:
+        game = client.post('/api/start-game', json={'user_id': 1, 'rounds': 1}).get_json()
+        round_id = game['round']['round_id']
+
+        disable_stats_writer()
+        results['synchronous_guesses_per_sec'] = round(post_guesses(client, round_id, args.guesses))
+
+        writer = configure_stats_writer(app, log_dir, interval=0.5, max_pending=500)
+        results['write_behind_guesses_per_sec'] = round(post_guesses(client, round_id, args.guesses))
+        writer.flush()
+        disable_stats_writer()
+    finally:
+        os.remove(db_path)
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Image prefetch benchmark
+
+Plays games against an artificially slow image renderer and reports
+/api/next-round latency with and without background prefetching.
+
+    python -m benchmarks.bench_image_prefetch --delay 0.2 --think 0.3
+"""
+import argparse
+import json
+import os
+import time
+
+from benchmarks.common import create_bench_app
+from app.image_generator import generate_image_key
+from app.image_prefetch import configure_prefetcher
+
+
+class DelayedRenderer:
+    """Stand-in for a slow image model"""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def __call__(self, word, style='sketch'):
+        time.sleep(self.delay)
+        return generate_image_key(word, style=style)
+
+
+def play(client, rounds, think):
+    session = client.post('/api/start-game', json={
+        'user_id': 1, 'age_group': 'adult', 'difficulty': 'medium', 'rounds': rounds
+    }).get_json()
+
+    latencies = []
+    while True:
+        time.sleep(think)
+        start = time.perf_counter()
+        data = client.post('/api/next-round', json={'session_id': session['session_id']}).get_json()
+        latencies.append((time.perf_counter() - start) * 1000)
+        if data.get('game_over'):
+            # The game-over call renders nothing
+            return latencies[:-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--delay', type=float, default=0.2, help='seconds per image render')
+    parser.add_argument('--think', type=float, default=0.3, help='seconds between rounds')
+    parser.add_argument('--rounds', type=int, default=6)
+    args = parser.parse_args()
+
+    app, db_path = create_bench_app()
+    client = app.test_client()
+    render = DelayedRenderer(args.delay)
+    results = {}
+
+    try:
+        for name, workers in [('inline', 0), ('prefetch', 2)]:
+            configure_prefetcher(render=render, max_workers=workers)
+            latencies = sorted(play(client, args.rounds, args.think))
+            results[name] = {
+                'p50_ms': round(latencies[len(latencies) // 2], 1),
+                'max_ms': round(latencies[-1], 1)
+            }
+    finally:
+        os.remove(db_path)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Leaderboard / dashboard benchmark
+
+Seeds N users and compares the SQL-aggregated endpoints and the ranked
+leaderboards (top-K, rank and players around a user) against the old
+per-user UserStats lookup, reporting query count and latency.
+
+    python -m benchmarks.bench_leaderboard --users 10000 100000
+"""
+import argparse
+import json
+import os
+
+from benchmarks.common import create_bench_app, count_queries, measure, seed_users
+
+
+def naive_dashboard(db):
+    """Reference: the previous one-query-per-user dashboard"""
+    from app.models import User, GameSession, Round, Word, UserStats
+
+    leaderboard = []
+    for user in User.query.all():
+        stats = UserStats.query.filter_by(user_id=user.id).first()
+        if stats:
+            leaderboard.append({'user_id': user.id, 'points': stats.total_points})
+    leaderboard = sorted(leaderboard, key=lambda x: x['points'], reverse=True)
+    GameSession.query.count()
+    Round.query.count()
+    category_dist = {}
+    for word in Word.query.all():
+        category_dist[word.category] = category_dist.get(word.category, 0) + 1
+    return leaderboard[:10]
+
+
+def run_benchmark(sizes, repeat):
+    app, db_path = create_bench_app()
+    from app.models import db, User
+    from app.rankings import rebuild_leaderboards
+
+    client = app.test_client()
+    results = []
+
+    try:
+        with app.app_context():
+            for size in sizes:
+                existing = User.query.count()
+                if size > existing:
+                    seed_users(db, size - existing)
+                    rebuild_leaderboards()
+                    db.session.commit()
+                # A player from the middle of the board
+                middle = existing + (size - existing) // 2
+
+                row = {'users': size}
+                for name, url in [
+                    ('dashboard', '/api/dashboard'),
+                    ('users_page', '/api/users?page=2&per_page=50'),
+                    ('comparative', '/api/psychology/comparative-analysis'),
+                    ('ranked_top', '/api/leaderboard?limit=10'),
+                    ('ranked_around', f'/api/leaderboard/user/{middle}?around=5'),
+                ]:
+                    with count_queries(db.engine) as counter:
+                        response = client.get(url)
+                    assert response.status_code == 200, response.get_json()
+                    row[name] = dict(measure(lambda: client.get(url), repeat), queries=counter.count)
+
+                with count_queries(db.engine) as counter:
+                    naive_dashboard(db)
+                row['naive_dashboard'] = dict(
+                    measure(lambda: naive_dashboard(db), max(1, repeat // 10)),
+                    queries=counter.count
+                )
+                db.session.remove()
+                results.append(row)
+    finally:
+        os.remove(db_path)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(sorted(args.users), args.repeat), indent=2))
+
+
+if __name__ == '__main__':
+    main()
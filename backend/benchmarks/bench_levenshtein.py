@@ -0,0 +1,98 @@
+"""
+Levenshtein micro-benchmark
+
+Compares the full-table levenshtein_distance against the fuzzy match that
+process_guess runs (AnswerMatcher.fuzzy_match: bit-parallel Myers distance
+that stops at the threshold) on adversarial guesses. The 100-character
+guesses against the short answer are rejected on length difference alone;
+the long_equal_* pairs compare equal-length strings, so the bit-parallel
+scan runs over the whole guess before it can decide.
+
+    python -m benchmarks.bench_levenshtein --iterations 2000
+"""
+import argparse
+import json
+import random
+import string
+import time
+
+from app.guess_processor import AnswerMatcher, levenshtein_distance, max_edits_for_similarity
+
+
+def full_table_match(guess, correct_word, threshold=0.75):
+    """Reference: the previous unbounded fuzzy match"""
+    max_length = max(len(guess), len(correct_word))
+    distance = levenshtein_distance(guess, correct_word)
+    return 1 - (distance / max_length) >= threshold
+
+
+def substitute(word, count, letter='#'):
+    """word with count characters replaced, spread evenly over its length"""
+    chars = list(word)
+    for i in range(count):
+        chars[i * len(word) // count] = letter
+    return ''.join(chars)
+
+
+def make_cases(word, long_length=100, seed=7):
+    """
+    Adversarial (answer, guess) pairs
+
+    Args:
+        word (str): Answer of the short-word cases
+        long_length (int): Length of both strings in the long_equal_* cases
+        seed (int): Random seed
+
+    Returns:
+        dict: {case name: (answer, guess)}
+    """
+    rng = random.Random(seed)
+    letters = string.ascii_lowercase
+    long_word = ''.join(rng.choice(letters) for _ in range(long_length))
+    budget = max_edits_for_similarity(long_length, 0.75)
+    return {
+        'long_random_100': (word, ''.join(rng.choice(letters) for _ in range(100))),
+        'long_repeat_100': (word, (word * 10)[:100]),
+        'same_length_random': (word, ''.join(rng.choice(letters) for _ in range(len(word)))),
+        'same_length_shuffled': (word, ''.join(rng.sample(word, len(word)))),
+        'one_typo': (word, word[:3] + 'x' + word[4:]),
+        'exact': (word, word),
+        'long_equal_random': (long_word, ''.join(rng.choice(letters) for _ in range(long_length))),
+        'long_equal_shuffled': (long_word, ''.join(rng.sample(long_word, long_length))),
+        'long_equal_at_budget': (long_word, substitute(long_word, budget)),
+        'long_equal_over_budget': (long_word, substitute(long_word, budget + 1)),
+        'long_equal_rotated': (long_word, long_word[1:] + long_word[0]),
+    }
+
+
+def time_calls(fn, guess, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(guess)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--word', default='photosynthesis')
+    parser.add_argument('--long-length', type=int, default=100)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    results = {}
+    for name, (answer, guess) in make_cases(args.word, args.long_length).items():
+        matcher = AnswerMatcher(answer)
+        assert full_table_match(guess, answer) == matcher.fuzzy_match(guess)['is_match']
+        full_us = time_calls(lambda g: full_table_match(g, answer), guess, args.iterations)
+        bounded_us = time_calls(matcher.fuzzy_match, guess, args.iterations)
+        results[name] = {
+            'full_table_us': round(full_us, 2),
+            'bounded_us': round(bounded_us, 2),
+            'speedup': round(full_us / bounded_us, 1) if bounded_us else None
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
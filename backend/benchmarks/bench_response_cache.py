@@ -0,0 +1,89 @@
+"""
+Response cache benchmark
+
+Polls the cached analytics endpoints the way the dashboard does, with the
+cache off and on, while a writer creates a user every --write-every polls.
+Reports latency, SQL statements per poll, the hit ratio and how many
+conditional requests were answered with 304.
+
+    python -m benchmarks.bench_response_cache --users 10000 --polls 200 --write-every 20
+"""
+import argparse
+import json
+import os
+import time
+
+from benchmarks.common import count_queries, create_bench_app, seed_users, summarize
+
+ENDPOINTS = [
+    '/api/dashboard',
+    '/api/words',
+    '/api/users?page=1&per_page=50',
+    '/api/psychology/comparative-analysis',
+]
+
+
+def poll(client, engine, polls, write_every, tag):
+    """Poll every endpoint, revalidating with the last ETag like a browser"""
+    etags = {}
+    samples = []
+    statements = 0
+    not_modified = 0
+    for i in range(polls):
+        if write_every and i and i % write_every == 0:
+            client.post('/api/user/create', json={'username': f'cache_{tag}_{i}', 'age': 30})
+        for url in ENDPOINTS:
+            headers = {'If-None-Match': etags[url]} if url in etags else {}
+            began = time.perf_counter()
+            with count_queries(engine) as counter:
+                response = client.get(url, headers=headers)
+            samples.append((time.perf_counter() - began) * 1000)
+            statements += counter.count
+            assert response.status_code in (200, 304), response.status_code
+            not_modified += response.status_code == 304
+            if response.headers.get('ETag'):
+                etags[url] = response.headers['ETag']
+    return dict(summarize(samples), queries_per_request=round(statements / len(samples), 2),
+                not_modified=not_modified, requests=len(samples))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--polls', type=int, default=200)
+    parser.add_argument('--write-every', type=int, default=20, help='Polls between writes (0 = no writes)')
+    parser.add_argument('--ttl', type=float, default=10.0)
+    args = parser.parse_args()
+
+    app, db_path = create_bench_app()
+    from app.models import db
+    from app.response_cache import configure_response_cache, disable_response_cache, get_response_cache
+
+    try:
+        with app.app_context():
+            seed_users(db, args.users)
+            db.session.remove()
+        client = app.test_client()
+
+        results = {}
+        for name in ('uncached', 'cached'):
+            if name == 'cached':
+                configure_response_cache(ttl=args.ttl)
+            else:
+                disable_response_cache()
+            with app.app_context():
+                results[name] = poll(client, db.engine, args.polls, args.write_every, name)
+        info = get_response_cache().info()
+        results['cached']['hit_ratio'] = round(info['hit_ratio'], 3)
+        results['cached']['invalidations'] = info['invalidations']
+        disable_response_cache()
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+    print(json.dumps(dict(results, users=args.users, polls=args.polls, write_every=args.write_every), indent=2))
+
+
+if __name__ == '__main__':
+    main()
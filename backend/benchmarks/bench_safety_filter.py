@@ -0,0 +1,72 @@
+"""
+Safety filter benchmark
+
+Checks words against N random blocklist terms with the Aho-Corasick
+automaton and with the previous one-substring-search-per-term loop.
+
+    python -m benchmarks.bench_safety_filter --patterns 10000
+"""
+import argparse
+import json
+import random
+import string
+import time
+
+from app.safety_filter import PatternAutomaton
+
+
+def make_patterns(count, seed=5):
+    rng = random.Random(seed)
+    letters = string.ascii_lowercase + 'áéíóúñü'
+    patterns = set()
+    while len(patterns) < count:
+        patterns.add(''.join(rng.choice(letters) for _ in range(rng.randint(4, 10))))
+    return [(p, 'nsfw') for p in sorted(patterns)]
+
+
+def naive_is_blocked(patterns, word):
+    """Reference: the previous per-pattern substring loop"""
+    word_lower = word.lower()
+    for pattern in patterns:
+        if pattern in word_lower:
+            return True
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--patterns', type=int, default=10000)
+    parser.add_argument('--words', type=int, default=2000)
+    args = parser.parse_args()
+
+    patterns = make_patterns(args.patterns)
+    terms = [p for p, _ in patterns]
+    rng = random.Random(9)
+    words = [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 20)))
+             for _ in range(args.words)]
+
+    start = time.perf_counter()
+    automaton = PatternAutomaton(patterns)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    automaton_hits = [automaton.matches(w) for w in words]
+    automaton_us = (time.perf_counter() - start) / len(words) * 1e6
+
+    start = time.perf_counter()
+    naive_hits = [naive_is_blocked(terms, w) for w in words]
+    naive_us = (time.perf_counter() - start) / len(words) * 1e6
+
+    assert automaton_hits == naive_hits
+
+    print(json.dumps({
+        'patterns': args.patterns,
+        'build_ms': round(build_ms, 1),
+        'automaton_us_per_word': round(automaton_us, 2),
+        'substring_loop_us_per_word': round(naive_us, 2),
+        'blocked_words': sum(automaton_hits)
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Startup benchmark
+
+Measures, in fresh interpreters, how long `import run` takes
+(`python -X importtime`) and how long create_app() takes, and checks that
+neither touches the database. Exits non-zero if the import exceeds the
+budget or any SQL statement runs during start-up.
+
+    python -m benchmarks.bench_startup --budget-ms 1500 --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CREATE_APP_SCRIPT = '''
+import json, time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+statements = []
+event.listen(Engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+start = time.perf_counter()
+import run
+imported = time.perf_counter()
+run.create_app()
+created = time.perf_counter()
+
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'statements': statements,
+}))
+'''
+
+
+def startup_env(tmp):
+    env = dict(os.environ)
+    env.update({
+        'DATABASE_URL': f'sqlite:///{os.path.join(tmp, "startup.db")}',
+        'STATS_LOG_DIR': os.path.join(tmp, 'stats-log'),
+        'IMAGE_CACHE_DIR': os.path.join(tmp, 'images'),
+        'PYTHONPATH': BACKEND_DIR,
+    })
+    return env
+
+
+def importtime_ms(env):
+    """Cumulative `import run` time reported by -X importtime"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import run'],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    for line in reversed(result.stderr.splitlines()):
+        if line.startswith('import time:') and line.rstrip().endswith('| run'):
+            return int(line.split('|')[1]) / 1000
+    raise RuntimeError('run missing from -X importtime output')
+
+
+def create_app_timing(env):
+    result = subprocess.run(
+        [sys.executable, '-c', CREATE_APP_SCRIPT],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--budget-ms', type=float, default=1500)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='bictionary-startup-') as tmp:
+        env = startup_env(tmp)
+        imports = [importtime_ms(env) for _ in range(args.runs)]
+        timings = [create_app_timing(env) for _ in range(args.runs)]
+        db_created = os.path.exists(os.path.join(tmp, 'startup.db'))
+
+    statements = sorted({s for t in timings for s in t['statements']})
+    result = {
+        'import_run_ms_p50': round(statistics.median(imports), 1),
+        'import_run_ms_max': round(max(imports), 1),
+        'create_app_ms_p50': round(statistics.median(t['create_app_ms'] for t in timings), 1),
+        'sql_statements': len(statements),
+        'database_file_created': db_created,
+        'budget_ms': args.budget_ms,
+    }
+    print(json.dumps(result, indent=2))
+
+    failures = []
+    if result['import_run_ms_p50'] > args.budget_ms:
+        failures.append(f"import run took {result['import_run_ms_p50']} ms (budget {args.budget_ms} ms)")
+    if statements:
+        failures.append('SQL during start-up: ' + '; '.join(statements))
+    if failures:
+        for failure in failures:
+            print(f'FAIL: {failure}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+SVG renderer benchmark
+
+Renders/sec of the template-based SvgRenderer versus the previous
+f-string + base64 functions.
+
+    python -m benchmarks.bench_svg_renderer --iterations 20000
+"""
+import argparse
+import base64
+import json
+import random
+import time
+
+from app.image_generator import generate_svg_image, get_placeholder_image
+from app.svg_renderer import GRADIENT_COLORS, get_renderer
+
+
+def fstring_svg_image(word, style='sketch', size=512):
+    """Reference: the previous generate_svg_image"""
+    color1 = random.choice(GRADIENT_COLORS)
+    color2 = random.choice([c for c in GRADIENT_COLORS if c != color1])
+    svg = f'''<svg width="{size}" height="{size}" xmlns="http://www.w3.org/2000/svg">
+      <defs>
+        <linearGradient id="grad1" x1="0%" y1="0%" x2="100%" y2="100%">
+          <stop offset="0%" style="stop-color:{color1};stop-opacity:1" />
+          <stop offset="100%" style="stop-color:{color2};stop-opacity:1" />
+        </linearGradient>
+      </defs>
+      <rect width="{size}" height="{size}" fill="url(#grad1)"/>
+      <circle cx="{size//2}" cy="{size//2}" r="{size//3}" fill="white" opacity="0.3"/>
+      <circle cx="{size//4}" cy="{size//4}" r="{size//6}" fill="white" opacity="0.2"/>
+      <circle cx="{3*size//4}" cy="{3*size//4}" r="{size//5}" fill="white" opacity="0.15"/>
+    </svg>'''
+    return f'data:image/svg+xml;base64,{base64.b64encode(svg.encode("utf-8")).decode("utf-8")}'
+
+
+def fstring_placeholder_image(word, error=False):
+    """Reference: the previous get_placeholder_image"""
+    bg_color = '#ffcccc' if error else '#e8f4ff'
+    text_color = '#990000' if error else '#0066cc'
+    svg = f'''<svg width="512" height="512" xmlns="http://www.w3.org/2000/svg">
+      <rect width="512" height="512" fill="{bg_color}"/>
+      <circle cx="256" cy="150" r="80" fill="{text_color}" opacity="0.6"/>
+      <rect x="150" y="250" width="212" height="120" fill="{text_color}" opacity="0.6" rx="10"/>
+      <text x="256" y="320" font-size="32" text-anchor="middle" fill="white" font-weight="bold">
+        {word[:20]}
+      </text>
+    </svg>'''
+    return f'data:image/svg+xml;base64,{base64.b64encode(svg.encode("utf-8")).decode("utf-8")}'
+
+
+def renders_per_sec(fn, iterations, *args):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(*args)
+    return iterations / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+
+    renderer = get_renderer()
+    n = args.iterations
+    results = {
+        'gradient_data_url': {
+            'fstring': round(renders_per_sec(fstring_svg_image, n, 'Elephant')),
+            'template': round(renders_per_sec(generate_svg_image, n, 'Elephant')),
+        },
+        'gradient_svgz': {
+            'template': round(renders_per_sec(
+                lambda: renderer.gradient_svgz(512, *random.sample(GRADIENT_COLORS, 2)), n)),
+        },
+        'placeholder_data_url': {
+            'fstring': round(renders_per_sec(fstring_placeholder_image, n, 'Photosynthesis')),
+            'template': round(renders_per_sec(get_placeholder_image, n, 'Photosynthesis')),
+        },
+    }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
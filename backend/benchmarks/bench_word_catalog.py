@@ -0,0 +1,72 @@
+"""
+Word selection benchmark
+
+Times WordCatalog.choose with a growing exclusion set against the old
+list-comprehension selection on catalogs of increasing size.
+
+    python -m benchmarks.bench_word_catalog --sizes 1000 50000
+"""
+import argparse
+import json
+import random
+import time
+
+from app.word_selector import WordCatalog
+
+
+def build_catalog(size, seed=11):
+    rng = random.Random(seed)
+    catalog = WordCatalog()
+    for i in range(size):
+        catalog.add(rng.choice(['5-7', '8-12', 'adult']), rng.choice(['easy', 'medium', 'hard']), {
+            'word': f'word{i}',
+            'definition': '',
+            'translation': '',
+            'category': rng.choice(['animals', 'nature', 'objects'])
+        })
+    return catalog
+
+
+def old_select(word_pool, used_words):
+    """Reference: the previous per-call filtering"""
+    available_words = [w for w in word_pool if w['word'] not in used_words and len(w['word']) <= 20]
+    return random.choice(available_words or word_pool)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--sessions', type=int, default=50)
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        catalog = build_catalog(size)
+        word_pool = [catalog.words[i] for i in catalog.pool('adult', 'medium')]
+
+        start = time.perf_counter()
+        for _ in range(args.sessions):
+            used = 0
+            for _ in range(args.rounds):
+                used |= 1 << catalog.choose('adult', 'medium', exclude=used)
+        catalog_us = (time.perf_counter() - start) / (args.sessions * args.rounds) * 1e6
+
+        start = time.perf_counter()
+        for _ in range(args.sessions):
+            used_words = []
+            for _ in range(args.rounds):
+                used_words.append(old_select(word_pool, used_words)['word'])
+        old_us = (time.perf_counter() - start) / (args.sessions * args.rounds) * 1e6
+
+        results.append({
+            'catalog_size': size,
+            'catalog_choose_us': round(catalog_us, 2),
+            'list_filter_us': round(old_us, 2)
+        })
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
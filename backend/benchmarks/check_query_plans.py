@@ -0,0 +1,138 @@
+"""
+Query plan regression check
+
+Runs the hot read paths (per-session rounds, per-user sessions, stats and
+learning curve lookups, word lookups, leaderboard) against a seeded SQLite
+database, runs EXPLAIN QUERY PLAN on every SELECT they issue and exits
+non-zero if any of them scans a whole table instead of using an index.
+
+    python -m benchmarks.check_query_plans --users 2000
+"""
+import argparse
+import os
+import re
+import sys
+
+from sqlalchemy import event
+
+from benchmarks.common import create_bench_app, seed_users
+from benchmarks.bench_cognitive_metrics import add_history
+
+# 'SCAN rounds' is a full table scan; 'SCAN rounds USING INDEX ...' walks an
+# index in order (used for ORDER BY ... LIMIT) and is allowed
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+
+
+class StatementRecorder:
+    """Collect SELECT statements (with parameters) executed on an engine"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('SELECT', 'WITH')) and not executemany:
+            self.statements.append((statement, parameters))
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+        return False
+
+
+def full_scans(engine, statement, parameters, tables):
+    """Tables the statement's plan scans without an index"""
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters)
+        details = [row[-1] for row in cursor.fetchall()]
+    finally:
+        raw.close()
+
+    scanned = []
+    for detail in details:
+        match = FULL_SCAN.match(detail)
+        if match and match.group(1) in tables:
+            scanned.append(match.group(1))
+    return scanned, details
+
+
+def hot_paths(client, user_id, session_id, round_id):
+    """(name, callable) for every read path that must stay indexed"""
+    from app.learning_curve import get_learning_curve
+    from app.leaderboard import get_leaderboard
+    from app.models import GameSession, Round, UserStats, Word
+
+    return [
+        ('rounds of a session', lambda: Round.query.filter_by(session_id=session_id).all()),
+        ('round count of a session', lambda: Round.query.filter_by(session_id=session_id).count()),
+        ('sessions of a user by date', lambda: GameSession.query.filter_by(user_id=user_id)
+            .order_by(GameSession.started_at.desc()).limit(20).all()),
+        ('stats of a user', lambda: UserStats.query.filter_by(user_id=user_id).first()),
+        ('word by name', lambda: Word.query.filter_by(word='cat').first()),
+        ('leaderboard', lambda: get_leaderboard(limit=10)),
+        ('ranked board page', lambda: client.get(f'/api/leaderboard?after={user_id}')),
+        ('rank on a board', lambda: client.get(f'/api/leaderboard/user/{user_id}')),
+        ('learning curve', lambda: get_learning_curve(user_id)),
+        ('session summary', lambda: client.get(f'/api/game-summary/{session_id}')),
+        ('user stats endpoint', lambda: client.get(f'/api/user/{user_id}/stats')),
+        ('cognitive metrics', lambda: client.get(f'/api/psychology/cognitive-metrics/{user_id}')),
+        ('guess', lambda: client.post('/api/guess', json={
+            'round_id': round_id, 'guess': 'zzz', 'user_id': user_id, 'time_taken': 3
+        })),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--sessions', type=int, default=200)
+    args = parser.parse_args()
+
+    app, db_path = create_bench_app()
+    from app.guess_recorder import disable_guess_recorder
+    from app.models import db, GameSession, Round
+    from app.stats_writer import disable_stats_writer
+
+    failures = []
+    try:
+        with app.app_context():
+            seed_users(db, args.users)
+            add_history(db, 1, args.sessions)
+            db.session.execute(db.text('ANALYZE'))
+            db.session.commit()
+
+            session_id = db.session.query(db.func.max(GameSession.id)).filter_by(user_id=1).scalar()
+            round_id = db.session.query(db.func.max(Round.id)).filter_by(session_id=session_id).scalar()
+            tables = set(db.metadata.tables)
+            client = app.test_client()
+
+            for name, fn in hot_paths(client, 1, session_id, round_id):
+                with StatementRecorder(db.engine) as recorder:
+                    fn()
+                db.session.remove()
+
+                for statement, parameters in recorder.statements:
+                    scanned, details = full_scans(db.engine, statement, parameters, tables)
+                    status = 'FAIL' if scanned else 'ok'
+                    print(f'[{status}] {name}: {"; ".join(details)}')
+                    if scanned:
+                        failures.append((name, scanned, statement))
+    finally:
+        disable_guess_recorder()
+        disable_stats_writer()
+        os.remove(db_path)
+
+    if failures:
+        print()
+        for name, scanned, statement in failures:
+            print(f'FAIL: {name} scans {", ".join(scanned)}:\n  {" ".join(statement.split())}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
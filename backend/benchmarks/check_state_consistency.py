@@ -0,0 +1,198 @@
+"""
+Multi-process state consistency check
+
+Starts several worker processes (like gunicorn workers) on one SQLite file
+and has them race on every shared structure of the state backend
+(app/state.py) at the same time:
+
+  decks      - every card of a deck is popped exactly once
+  deadlines  - every round deadline is claimed by exactly one worker
+  scores     - concurrent leaderboard increments add up
+  ranks      - ranks agree with the concurrently written scores
+  counters   - a rate counter hands out each value exactly once
+  games      - workers call /api/next-round on the same sessions; no
+               session repeats a word before its deck runs out
+
+Exits non-zero if any check fails. The 'memory' backend keeps state per
+process, so it fails here by design; it is only for single-worker runs.
+
+    python -m benchmarks.check_state_consistency --workers 4 --backend sql
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+from collections import Counter
+
+from benchmarks.common import create_bench_app
+
+DECK_SIZE = 2000
+DEADLINES = 2000
+INCREMENTS = 300
+GAMES = 8
+GAME_ROUNDS = 8
+
+
+def worker(db_path, backend, log_dir, index, workers, deck_session, game_sessions, barrier, results):
+    os.environ.update({
+        'DATABASE_URL': f'sqlite:///{db_path}',
+        'STATE_BACKEND': backend,
+        'ROUND_TIMER': '0',
+        'STATS_WRITE_BEHIND': '0',
+        'GUESS_BUFFERING': '0',
+        'STATS_LOG_DIR': log_dir,
+        'IMAGE_PREFETCH_WORKERS': '0',
+    })
+    from run import create_app
+    from app.models import db
+    from app.state import get_state
+
+    app = create_app()
+    client = app.test_client()
+    state = get_state()
+    outcome = {'popped': [], 'claimed': [], 'counts': [], 'errors': 0}
+
+    def attempt(fn):
+        """Run one state operation in its own transaction"""
+        try:
+            value = fn()
+            db.session.commit()
+            return value
+        except Exception as e:
+            db.session.rollback()
+            outcome['errors'] += 1
+            print(f"Worker {index}: {e}", file=sys.stderr, flush=True)
+            return None
+
+    with app.app_context():
+        for round_id in range(index, DEADLINES, workers):
+            attempt(lambda: state.deadline_add(round_id, float(round_id)))
+
+        barrier.wait()
+        while True:
+            index_popped, _ = attempt(lambda: state.deck_pop(deck_session)) or (None, [])
+            if index_popped is None:
+                break
+            outcome['popped'].append(index_popped)
+
+        while True:
+            due = attempt(lambda: state.deadlines_pop_due(float('inf'), 7))
+            if not due:
+                break
+            outcome['claimed'].extend(round_id for _, round_id in due)
+
+        for n in range(INCREMENTS):
+            attempt(lambda: state.score_incr('consistency', n % 5, 2))
+            outcome['counts'].append(attempt(lambda: state.counter_incr('consistency', 3600)))
+
+    barrier.wait()
+    for _ in range(GAME_ROUNDS):
+        for session_id in game_sessions:
+            response = client.post('/api/next-round', json={'session_id': session_id})
+            if response.status_code >= 500:
+                outcome['errors'] += 1
+
+    results.put(outcome)
+
+
+def run_check(workers=4, backend='sql'):
+    """Race the workers on one database; returns the report (its 'checks' must all be true)"""
+    tmp = tempfile.mkdtemp(prefix='bictionary-state-')
+    log_dir = os.path.join(tmp, 'stats-log')
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            app, db_path = create_bench_app(
+                db_path=os.path.join(tmp, 'state.db'),
+                config={'STATE_BACKEND': 'sql', 'ROUND_TIMER': False, 'STATS_LOG_DIR': log_dir}
+            )
+            from app.guess_recorder import disable_guess_recorder
+            from app.models import db, Round
+            from app.state import get_state
+            from app.stats_writer import disable_stats_writer
+            disable_guess_recorder()
+            disable_stats_writer()
+
+            client = app.test_client()
+            sessions = [
+                client.post('/api/start-game', json={'user_id': 1, 'rounds': GAME_ROUNDS}).get_json()['session_id']
+                for _ in range(GAMES + 1)
+            ]
+            deck_session, game_sessions = sessions[0], sessions[1:]
+            with app.app_context():
+                get_state().deck_deal(deck_session, range(DECK_SIZE))
+                db.session.commit()
+                db.engine.dispose()
+
+        ctx = multiprocessing.get_context('spawn')
+        barrier = ctx.Barrier(workers)
+        results = ctx.Queue()
+        procs = [
+            ctx.Process(target=worker, args=(db_path, backend, log_dir, index, workers,
+                                             deck_session, game_sessions, barrier, results))
+            for index in range(workers)
+        ]
+        for p in procs:
+            p.start()
+        outcomes = [results.get() for _ in procs]
+        for p in procs:
+            p.join()
+
+        with app.app_context():
+            state = get_state()
+            scores = dict(state.top('consistency', 0, 10))
+            ranks = [state.rank('consistency', member) for member in scores]
+            words = {}
+            for session_id, word_id in (db.session.query(Round.session_id, Round.word_id)
+                                        .filter(Round.session_id.in_(game_sessions))
+                                        .order_by(Round.id)):
+                words.setdefault(session_id, []).append(word_id)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    popped = Counter(i for o in outcomes for i in o['popped'])
+    claimed = Counter(i for o in outcomes for i in o['claimed'])
+    counts = Counter(c for o in outcomes for c in o['counts'] if c is not None)
+    increments = workers * INCREMENTS
+    checks = {
+        'decks': sorted(popped) == list(range(DECK_SIZE)) and max(popped.values(), default=0) == 1,
+        'deadlines': sorted(claimed) == list(range(DEADLINES)) and max(claimed.values(), default=0) == 1,
+        'scores': sum(scores.values()) == increments * 2 and len(set(scores.values())) == 1,
+        'ranks': ranks == list(range(len(scores))),
+        'counters': sorted(counts) == list(range(1, increments + 1)),
+        # A deck holds GAME_ROUNDS words, so the first GAME_ROUNDS rounds never repeat
+        'games': all(len(set(ids[:GAME_ROUNDS])) == len(ids[:GAME_ROUNDS]) for ids in words.values()),
+        'errors': sum(o['errors'] for o in outcomes) == 0,
+    }
+
+    return {
+        'backend': backend,
+        'workers': workers,
+        'deck_pops': sum(popped.values()),
+        'deadlines_claimed': sum(claimed.values()),
+        'score_total': sum(scores.values()),
+        'counter_max': max(counts, default=0),
+        'game_rounds': sum(len(ids) for ids in words.values()),
+        'errors': sum(o['errors'] for o in outcomes),
+        'checks': checks,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--backend', default='sql', choices=['memory', 'sql'])
+    args = parser.parse_args()
+
+    report = run_check(workers=args.workers, backend=args.backend)
+    print(json.dumps(report, indent=2))
+    if not all(report['checks'].values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
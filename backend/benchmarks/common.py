@@ -0,0 +1,152 @@
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+
+def create_bench_app(db_path=None, config=None):
+    """
+    Create the Flask app against a throwaway, seeded SQLite database
+
+    The response cache is off unless config turns it on, so benchmarks
+    measure the endpoints rather than cache hits.
+
+    Args:
+        db_path (str): Database file path (a temp file if omitted)
+        config (dict): Extra app config
+
+    Returns:
+        tuple: (app, db_path)
+    """
+
+    if db_path is None:
+        fd, db_path = tempfile.mkstemp(prefix='bictionary-bench-', suffix='.db')
+        os.close(fd)
+        os.remove(db_path)
+
+    from run import create_app, seed_if_empty
+    config = dict({'RESPONSE_CACHE': False}, **(config or {}))
+    app = create_app(dict(config, SQLALCHEMY_DATABASE_URI=f'sqlite:///{db_path}'))
+    with app.app_context():
+        seed_if_empty()
+    return app, db_path
+
+
+class QueryCounter:
+    """Count SQL statements executed on an engine by the current thread"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+        # Background flush threads share the engine; their statements are not
+        # part of the request being measured
+        self._thread = None
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == self._thread:
+            self.count += 1
+
+    def __enter__(self):
+        self._thread = threading.get_ident()
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+        return False
+
+
+@contextmanager
+def count_queries(engine):
+    """Context manager yielding a QueryCounter for the block"""
+    with QueryCounter(engine) as counter:
+        yield counter
+
+
+def measure(fn, repeat=20):
+    """
+    Call fn repeatedly and summarize latency
+
+    Args:
+        fn (callable): Zero-argument callable to time
+        repeat (int): Number of calls
+
+    Returns:
+        dict: {'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'}
+    """
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    return summarize(samples)
+
+
+def summarize(samples):
+    """Latency percentiles (ms) of a list of samples"""
+    samples = sorted(samples)
+
+    def percentile(p):
+        return round(samples[min(len(samples) - 1, int(len(samples) * p))], 3)
+
+    return {
+        'p50_ms': round(statistics.median(samples), 3),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'max_ms': round(samples[-1], 3)
+    }
+
+
+def seed_users(db, count, seed=42):
+    """
+    Bulk-insert users with UserStats rows (Core inserts, one transaction)
+
+    Args:
+        db: Flask-SQLAlchemy instance
+        count (int): Number of users to add
+        seed (int): Random seed for deterministic data
+    """
+
+    from app.models import User, UserStats
+
+    rng = random.Random(seed)
+    now = datetime.now()
+    first_id = (db.session.query(db.func.max(User.id)).scalar() or 0) + 1
+
+    users = []
+    stats = []
+    for user_id in range(first_id, first_id + count):
+        guesses = rng.randint(1, 500)
+        correct = rng.randint(0, guesses)
+        users.append({
+            'id': user_id,
+            'username': f'bench_user_{user_id}',
+            'age': rng.randint(5, 70),
+            'preferred_language': rng.choice(['en', 'es']),
+            'created_at': now - timedelta(days=rng.randint(0, 365))
+        })
+        stats.append({
+            'user_id': user_id,
+            'total_games_played': guesses // 10,
+            'total_guesses': guesses,
+            'total_correct_guesses': correct,
+            'total_points': correct * 100,
+            'accuracy_percentage': correct / guesses * 100,
+            'words_learned': correct,
+            'average_time_per_guess': 0.0,
+            'current_streak': 0,
+            'longest_streak': 0,
+            'created_at': now
+        })
+
+    db.session.execute(User.__table__.insert(), users)
+    db.session.execute(UserStats.__table__.insert(), stats)
+    db.session.commit()
@@ -0,0 +1,227 @@
+"""
+Multiplayer room load generator
+
+Starts the room server (multiplayer.py) on a throwaway seeded database and
+connects --clients WebSocket players to it from several processes, in
+rooms of --room-size. The first player of each room starts a game. Every
+player then guesses while the round is live: it picks words from the
+dictionary that match the round's hint, so rounds end and new ones start
+as in a real game.
+
+Reports how many sockets were connected at once, guess round-trip latency
+(guess sent -> guess_result received) and timer tick lag (server
+timestamp -> client receive).
+
+    python -m benchmarks.load_test_rooms --clients 10000 --room-size 10 --processes 4 --duration 60
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import random
+import resource
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import create_bench_app
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(samples, q):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 2)
+
+
+def hint_matches(hint, word):
+    return len(hint) == len(word) and all(h == '_' or h == c for h, c in zip(hint, word))
+
+
+async def player(index, args, words, first_user, deadline, connect_slots, stats):
+    from app.websocket import connect
+
+    rng = random.Random(index)
+    room = f'load-{index // args.room_size}'
+    is_host = index % args.room_size == 0
+    pending = []
+    guess_task = None
+
+    async with connect_slots:
+        try:
+            ws = await asyncio.wait_for(connect(args.host, args.port), timeout=30)
+        except (OSError, asyncio.TimeoutError):
+            stats['connect_errors'] += 1
+            return
+
+    async def guess_loop(hint):
+        candidates = [w for w in words if hint_matches(hint, w)] or words
+        rng.shuffle(candidates)
+        for word in candidates:
+            await asyncio.sleep(rng.uniform(*args.guess_delay))
+            pending.append(time.perf_counter())
+            ws.send_text(json.dumps({'type': 'guess', 'guess': word}))
+
+    stats['connected'] += 1
+    stats['peak'] = max(stats['peak'], stats['connected'])
+    ws.send_text(json.dumps({'type': 'join', 'room': room, 'user_id': first_user + index}))
+    try:
+        while time.time() < deadline:
+            try:
+                text = await asyncio.wait_for(ws.recv(), timeout=max(0.1, deadline - time.time()))
+            except asyncio.TimeoutError:
+                break
+            if text is None:
+                stats['dropped'] += 1
+                break
+            stats['messages'] += 1
+            message = json.loads(text)
+            kind = message['type']
+
+            if kind == 'joined':
+                stats['joined'] += 1
+                if is_host:
+                    await asyncio.sleep(args.start_delay)
+                    ws.send_text(json.dumps({'type': 'start', 'rounds': 50}))
+            elif kind == 'tick':
+                stats['tick_lag_ms'].append((time.time() - message['ts']) * 1000)
+            elif kind == 'round':
+                stats['rounds'] += 1
+                pending.clear()
+                guess_task = asyncio.ensure_future(guess_loop(message['hint']))
+            elif kind == 'guess_result':
+                if pending:
+                    stats['guess_rtt_ms'].append((time.perf_counter() - pending.pop(0)) * 1000)
+                stats['guesses'] += 1
+                if message['is_correct'] and guess_task:
+                    guess_task.cancel()
+            elif kind == 'round_end' and guess_task:
+                guess_task.cancel()
+            elif kind == 'error':
+                stats['errors'] += 1
+    finally:
+        if guess_task:
+            guess_task.cancel()
+        stats['connected'] -= 1
+        await ws.close()
+
+
+def client_process(offset, count, args, words, first_user, deadline, results):
+    resource.setrlimit(resource.RLIMIT_NOFILE, (resource.getrlimit(resource.RLIMIT_NOFILE)[1],) * 2)
+    stats = {
+        'connected': 0, 'peak': 0, 'joined': 0, 'connect_errors': 0, 'dropped': 0, 'errors': 0,
+        'messages': 0, 'rounds': 0, 'guesses': 0, 'guess_rtt_ms': [], 'tick_lag_ms': [],
+    }
+
+    async def run():
+        slots = asyncio.Semaphore(args.connect_concurrency)
+        await asyncio.gather(*(
+            player(offset + i, args, words, first_user, deadline, slots, stats) for i in range(count)
+        ))
+
+    asyncio.run(run())
+    results.put(stats)
+
+
+def wait_for_port(host, port, timeout=30):
+    end = time.time() + timeout
+    while time.time() < end:
+        with contextlib.suppress(OSError), socket.create_connection((host, port), timeout=1):
+            return
+        time.sleep(0.2)
+    raise RuntimeError(f'Room server did not start on {host}:{port}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--room-size', type=int, default=10)
+    parser.add_argument('--processes', type=int, default=4, help='Client processes')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds after the first connection')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8799)
+    parser.add_argument('--connect-concurrency', type=int, default=200, help='Handshakes in flight per process')
+    parser.add_argument('--start-delay', type=float, default=2.0, help='Host waits this long before starting')
+    parser.add_argument('--guess-delay', type=float, nargs=2, default=(2.0, 6.0), help='Seconds between guesses')
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='bictionary-rooms-')
+    with contextlib.redirect_stdout(io.StringIO()):
+        app, db_path = create_bench_app(db_path=os.path.join(tmp, 'rooms.db'),
+                                        config={'STATS_LOG_DIR': os.path.join(tmp, 'stats-log')})
+        from app.guess_recorder import disable_guess_recorder
+        from app.models import db, User, Word
+        from app.stats_writer import disable_stats_writer
+        from app.synthetic_data import generate_dataset
+        with app.app_context():
+            first_user = (db.session.query(db.func.max(User.id)).scalar() or 0) + 1
+            generate_dataset(users=args.clients, rounds=0)
+            words = [w for (w,) in db.session.query(Word.word)]
+            disable_guess_recorder()
+            disable_stats_writer()
+            db.engine.dispose()
+
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{db_path}', STATS_LOG_DIR=os.path.join(tmp, 'stats-log'),
+               IMAGE_CACHE_DIR=os.path.join(tmp, 'images'))
+    server = subprocess.Popen(
+        [sys.executable, '-W', 'ignore', 'multiplayer.py', '--host', args.host, '--port', str(args.port),
+         '--stats-interval', '5'],
+        cwd=BACKEND_DIR, env=env
+    )
+    try:
+        wait_for_port(args.host, args.port)
+        deadline = time.time() + args.duration
+        ctx = multiprocessing.get_context('spawn')
+        results = ctx.Queue()
+        per_process = -(-args.clients // args.processes)
+        procs = []
+        for n in range(args.processes):
+            offset = n * per_process
+            count = min(per_process, args.clients - offset)
+            if count > 0:
+                procs.append(ctx.Process(target=client_process,
+                                         args=(offset, count, args, words, first_user, deadline, results)))
+        began = time.time()
+        for p in procs:
+            p.start()
+        outcomes = [results.get() for _ in procs]
+        elapsed = time.time() - began
+        for p in procs:
+            p.join()
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    guess_rtt = [s for o in outcomes for s in o['guess_rtt_ms']]
+    tick_lag = [s for o in outcomes for s in o['tick_lag_ms']]
+    messages = sum(o['messages'] for o in outcomes)
+    print(json.dumps({
+        'clients': args.clients,
+        'room_size': args.room_size,
+        'peak_connected': sum(o['peak'] for o in outcomes),
+        'joined': sum(o['joined'] for o in outcomes),
+        'connect_errors': sum(o['connect_errors'] for o in outcomes),
+        'dropped': sum(o['dropped'] for o in outcomes),
+        'errors': sum(o['errors'] for o in outcomes),
+        'rounds_seen': sum(o['rounds'] for o in outcomes),
+        'guesses': sum(o['guesses'] for o in outcomes),
+        'messages_per_sec': round(messages / elapsed),
+        'guess_rtt_p50_ms': round(statistics.median(guess_rtt), 2) if guess_rtt else None,
+        'guess_rtt_p99_ms': percentile(guess_rtt, 0.99),
+        'tick_lag_p50_ms': round(statistics.median(tick_lag), 2) if tick_lag else None,
+        'tick_lag_p99_ms': percentile(tick_lag, 0.99),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
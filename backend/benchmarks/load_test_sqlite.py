@@ -0,0 +1,153 @@
+"""
+Multi-process SQLite load test
+
+Starts several worker processes (like gunicorn workers) that share one
+SQLite file. Each one plays games through the Flask test client (start game,
+guesses, next round) with synchronous writes, once per storage profile.
+Reports throughput, latency and how many requests failed with
+"database is locked".
+
+    python -m benchmarks.load_test_sqlite --workers 8 --duration 10 --profiles legacy wal
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from benchmarks.common import create_bench_app
+
+
+def worker(db_path, profile, log_dir, duration, seed, ready, start, results):
+    os.environ.update({
+        'DATABASE_URL': f'sqlite:///{db_path}',
+        'DB_PROFILE': profile,
+        'STATS_WRITE_BEHIND': '0',
+        'GUESS_BUFFERING': '0',
+        'STATS_LOG_DIR': log_dir,
+        'IMAGE_PREFETCH_WORKERS': '0',
+    })
+    from run import create_app
+    client = create_app().test_client()
+    rng = random.Random(seed)
+
+    ready.release()
+    start.wait()
+
+    latencies = []
+    errors = 0
+    locked = 0
+
+    def call(method, url, body=None):
+        nonlocal errors, locked
+        began = time.perf_counter()
+        response = client.open(url, method=method, json=body)
+        latencies.append((time.perf_counter() - began) * 1000)
+        if response.status_code >= 500:
+            errors += 1
+            if 'locked' in (response.get_json() or {}).get('error', ''):
+                locked += 1
+            return None
+        return response.get_json()
+
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        game = call('POST', '/api/start-game', {'user_id': rng.randint(1, 4), 'rounds': 5})
+        if not game:
+            continue
+        session_id = game['session_id']
+        round_id = game['round']['round_id']
+        while round_id and time.monotonic() < deadline:
+            for _ in range(rng.randint(1, 3)):
+                call('POST', '/api/guess', {'round_id': round_id, 'guess': rng.choice(['cat', 'dog', 'xyz']),
+                                            'user_id': 1, 'time_taken': rng.randint(1, 30)})
+            call('GET', f'/api/user/{rng.randint(1, 4)}/stats')
+            data = call('POST', '/api/next-round', {'session_id': session_id})
+            round_id = data['round']['round_id'] if data and data.get('round') else None
+
+    results.put({'requests': len(latencies), 'errors': errors, 'locked': locked, 'latencies': latencies})
+
+
+def run_profile(template_path, profile, workers, duration):
+    tmp = tempfile.mkdtemp(prefix=f'bictionary-load-{profile}-')
+    db_path = os.path.join(tmp, 'load.db')
+    shutil.copy(template_path, db_path)
+    if profile == 'legacy':
+        conn = sqlite3.connect(db_path)
+        conn.execute('PRAGMA journal_mode=DELETE')
+        conn.close()
+
+    ctx = multiprocessing.get_context('spawn')
+    ready = ctx.Semaphore(0)
+    start = ctx.Event()
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(target=worker, args=(db_path, profile, os.path.join(tmp, 'stats-log'),
+                                         duration, seed, ready, start, results))
+        for seed in range(workers)
+    ]
+    try:
+        for p in procs:
+            p.start()
+        for _ in procs:
+            ready.acquire()
+        began = time.perf_counter()
+        start.set()
+        outcomes = [results.get() for _ in procs]
+        elapsed = time.perf_counter() - began
+        for p in procs:
+            p.join()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    latencies = sorted(l for o in outcomes for l in o['latencies'])
+    requests = len(latencies)
+    return {
+        'profile': profile,
+        'workers': workers,
+        'requests': requests,
+        'requests_per_sec': round(requests / elapsed),
+        'errors': sum(o['errors'] for o in outcomes),
+        'database_locked': sum(o['locked'] for o in outcomes),
+        'p50_ms': round(statistics.median(latencies), 2) if latencies else None,
+        'p99_ms': round(latencies[min(requests - 1, int(requests * 0.99))], 2) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--profiles', nargs='+', default=['legacy', 'wal'])
+    args = parser.parse_args()
+
+    # Build and seed the database once, then copy it for every profile
+    with contextlib.redirect_stdout(io.StringIO()):
+        app, template_path = create_bench_app()
+        from app.guess_recorder import disable_guess_recorder
+        from app.models import db
+        from app.stats_writer import disable_stats_writer
+        disable_guess_recorder()
+        disable_stats_writer()
+        with app.app_context():
+            db.engine.dispose()
+
+    try:
+        results = [run_profile(template_path, p, args.workers, args.duration) for p in args.profiles]
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(template_path + suffix):
+                os.remove(template_path + suffix)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
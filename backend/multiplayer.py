@@ -0,0 +1,164 @@
+"""
+Multiplayer room server
+
+An asyncio WebSocket server (separate from the Flask API) where every player
+in a room guesses the same round. Room state is held in memory (app/rooms.py);
+sessions, rounds, guesses and player stats are written to the same database
+as the HTTP API, on a background thread.
+
+    python multiplayer.py --port 8765
+
+Clients connect to ws://<host>:<port>/ and send JSON messages; see
+app/rooms.py for the protocol.
+"""
+import argparse
+import asyncio
+import os
+import resource
+import signal
+from datetime import datetime
+from app.models import db, GameSession, Round, RoundScore
+from app.rooms import RoomManager
+from app.websocket import HandshakeError, accept
+from app.learning_curve import record_session_summary
+from app.guess_recorder import record_guess
+from run import calculate_points, create_app, record_user_stats, start_round
+
+
+class GameStore:
+    """Room persistence on the existing GameSession/Round/Guess tables"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def create_session(self, host_id, age_group, difficulty, language, total_rounds):
+        with self.app.app_context():
+            session = GameSession(
+                user_id=host_id,
+                age_group=age_group,
+                difficulty=difficulty,
+                language=language,
+                total_rounds=total_rounds,
+                started_at=datetime.now()
+            )
+            db.session.add(session)
+            db.session.commit()
+            return session.id
+
+    def start_round(self, session_id):
+        """New Round row plus the answer, which only the server keeps"""
+        with self.app.app_context():
+            round_data = start_round(session_id)
+            if not round_data:
+                return None
+            round_obj = Round.query.get(round_data['round_id'])
+            return dict(round_data, word=round_obj.word.word, word_id=round_obj.word_id)
+
+    def record_guess(self, round_id, user_id, guess, is_correct, match_type, time_taken, points):
+        with self.app.app_context():
+            record_guess(round_id, guess, is_correct, match_type, time_taken)
+            record_user_stats(user_id, is_correct, points)
+            db.session.commit()
+
+    def finish_round(self, round_id, round_number, guesses_count, guessed_at, points, scores=None):
+        """Close the round; scores is {user_id: (points, scored_at)} of the players who scored"""
+        with self.app.app_context():
+            Round.query.filter_by(id=round_id).update({
+                'round_number': round_number,
+                'guesses_count': guesses_count,
+                'is_guessed': guessed_at is not None,
+                'guessed_at': guessed_at,
+                'ended_at': datetime.now(),
+                'points_earned': points,
+            })
+            db.session.add_all(
+                RoundScore(round_id=round_id, user_id=user_id, points=user_points, scored_at=scored_at)
+                for user_id, (user_points, scored_at) in (scores or {}).items()
+            )
+            db.session.commit()
+
+    def finish_game(self, session_id):
+        with self.app.app_context():
+            session = GameSession.query.get(session_id)
+            if session is None:
+                return
+            if not session.ended_at:
+                session.ended_at = datetime.now()
+            record_session_summary(session)
+            db.session.commit()
+
+    @staticmethod
+    def score(time_taken, match_type):
+        return calculate_points(time_taken, match_type)
+
+
+def raise_file_limit():
+    """Allow as many open sockets as the hard limit permits"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return hard
+
+
+async def serve(app, host='0.0.0.0', port=8765, tick_interval=1.0, round_break=3.0, stats_interval=10.0):
+    """
+    Run the room server until SIGINT/SIGTERM
+
+    Args:
+        app (Flask): App whose database and writers the rooms use
+        host (str): Interface to listen on
+        port (int): TCP port
+        tick_interval (float): Seconds between timer ticks
+        round_break (float): Pause between rounds
+        stats_interval (float): Seconds between connection count log lines (0 = off)
+    """
+    manager = RoomManager(GameStore(app), tick_interval=tick_interval, round_break=round_break)
+
+    async def on_connect(reader, writer):
+        try:
+            socket = await accept(reader, writer)
+        except HandshakeError:
+            return
+        await manager.handle(socket)
+
+    async def log_stats():
+        while True:
+            await asyncio.sleep(stats_interval)
+            print(f"Rooms: {manager.stats()}", flush=True)
+
+    loop = asyncio.get_running_loop()
+    stop = loop.create_future()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, lambda: stop.done() or stop.set_result(None))
+
+    server = await asyncio.start_server(on_connect, host, port, backlog=4096)
+    tasks = [loop.create_task(manager.run())]
+    if stats_interval:
+        tasks.append(loop.create_task(log_stats()))
+    print(f"🎮 Room server listening on ws://{host}:{port}/", flush=True)
+
+    try:
+        await stop
+    finally:
+        server.close()
+        for task in tasks:
+            task.cancel()
+        manager.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default=os.getenv('ROOMS_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('ROOMS_PORT', 8765)))
+    parser.add_argument('--tick-interval', type=float, default=float(os.getenv('ROOMS_TICK_INTERVAL', 1.0)))
+    parser.add_argument('--round-break', type=float, default=float(os.getenv('ROOMS_ROUND_BREAK', 3.0)))
+    parser.add_argument('--stats-interval', type=float, default=10.0)
+    args = parser.parse_args()
+
+    raise_file_limit()
+    app = create_app()
+    asyncio.run(serve(app, args.host, args.port, args.tick_interval, args.round_break, args.stats_interval))
+
+
+if __name__ == '__main__':
+    main()
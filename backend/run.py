@@ -1,57 +1,170 @@
-from flask import Flask, request, jsonify
+from flask import Blueprint, Flask, Response, current_app, jsonify, request
 from flask_cors import CORS
+import click
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.engine import make_url
 from dotenv import load_dotenv
 import os
 import json
 from datetime import datetime
-from app.models import db, User, GameSession, Round, Word, UserStats
-from app.word_selector import select_word
-from app.image_generator import generate_image
-from app.guess_processor import process_guess
-from app.database import init_db
+from app.models import db, User, GameSession, Round, RoundScore, Word, UserStats
+from app.session_deck import draw_deck_word
+from app.image_prefetch import configure_prefetcher, get_prefetcher
+from app.image_generator import generate_image_key
+from app.image_store import configure_image_store, get_image_store
+from app.guess_processor import ANSWER_MATCHERS, process_guess, process_guesses
+from app.database import init_schema, seed_database
+from app.migrations import run_migrations
+from app.storage import engine_options, install_sqlite_pragmas, is_sqlite, sqlite_pragmas
+from app.guess_recorder import configure_guess_recorder, record_guess
+from app.stats_writer import StatsDelta, configure_stats_writer, get_stats_writer
+from app.cognitive_metrics import get_cognitive_metrics
+from app.synthetic_data import generate_dataset
+from app.learning_curve import backfill_session_summaries, get_learning_curve, record_session_summary
+from app.profiling import METRICS, configure_profiling, phase, render_metrics
+from app.round_timer import configure_round_timer, disable_round_timer, elapsed_seconds, is_round_over, schedule_round
+from app.state import configure_state, get_state
+from app.response_cache import (
+    cached_response, configure_response_cache, disable_response_cache, invalidate, response_cache_info
+)
+from app.leaderboard import (
+    DEFAULT_PAGE_SIZE, get_comparative_analysis, get_dashboard_data, get_users_page
+)
+from app.rankings import get_board, get_user_rank, rebuild_leaderboards, record_scores
 
 load_dotenv()
 
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///bictionary.db')
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
+api = Blueprint('api', __name__, cli_group=None)
 
-db.init_app(app)
-CORS(app)
 
-# Initialize database
-print("🚀 Starting application...", flush=True)
-try:
-    with app.app_context():
-        print("📁 Initializing database...", flush=True)
-        db.create_all()
-        print("✅ Database tables created", flush=True)
-        
-        # Check if already seeded
-        from app.models import User
-        if User.query.first():
-            print("✅ Database already seeded with data", flush=True)
-        else:
-            print("🌱 Seeding database with test data...", flush=True)
-            from app.database import seed_database
-            seed_database()
-            print("✅ Database seeded successfully", flush=True)
-except Exception as e:
-    print(f"❌ Error: {e}", flush=True)
-    import traceback
-    traceback.print_exc()
+def create_app(config=None):
+    """
+    Create the Flask app
+    
+    Nothing here touches the database: the schema is created with
+    `flask --app run init-db` and test data with `flask --app run seed`
+    (`python run.py` does both before serving).
+    
+    Args:
+        config (dict): Overrides applied on top of the environment defaults
+    
+    Returns:
+        Flask: Configured application
+    """
+    
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///bictionary.db')
+    app.config['DB_PROFILE'] = os.getenv('DB_PROFILE', 'wal')
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
+    app.config['IMAGE_CACHE_DIR'] = os.getenv('IMAGE_CACHE_DIR', os.path.join(app.instance_path, 'images'))
+    app.config['IMAGE_PREFETCH_ROUNDS'] = int(os.getenv('IMAGE_PREFETCH_ROUNDS', 3))
+    app.config['IMAGE_PREFETCH_WORKERS'] = int(os.getenv('IMAGE_PREFETCH_WORKERS', 2))
+    app.config['STATS_WRITE_BEHIND'] = os.getenv('STATS_WRITE_BEHIND', '1') == '1'
+    app.config['STATS_LOG_DIR'] = os.getenv('STATS_LOG_DIR', os.path.join(app.instance_path, 'stats-log'))
+    app.config['STATS_FLUSH_INTERVAL'] = float(os.getenv('STATS_FLUSH_INTERVAL', 1.0))
+    app.config['STATS_FLUSH_MAX_PENDING'] = int(os.getenv('STATS_FLUSH_MAX_PENDING', 500))
+    app.config['STATS_LOG_FSYNC'] = os.getenv('STATS_LOG_FSYNC', '0') == '1'
+    app.config['GUESS_BUFFERING'] = os.getenv('GUESS_BUFFERING', '1') == '1'
+    app.config['GUESS_FLUSH_INTERVAL'] = float(os.getenv('GUESS_FLUSH_INTERVAL', 1.0))
+    app.config['GUESS_FLUSH_MAX_PENDING'] = int(os.getenv('GUESS_FLUSH_MAX_PENDING', 200))
+    app.config['STATE_BACKEND'] = os.getenv('STATE_BACKEND', 'sql')
+    app.config['GUESS_RATE_LIMIT'] = int(os.getenv('GUESS_RATE_LIMIT', 0))
+    app.config['ROUND_TIMER'] = os.getenv('ROUND_TIMER', '1') == '1'
+    app.config['ROUND_TIMER_INTERVAL'] = float(os.getenv('ROUND_TIMER_INTERVAL', 0.5))
+    app.config['RESPONSE_CACHE'] = os.getenv('RESPONSE_CACHE', '1') == '1'
+    app.config['RESPONSE_CACHE_TTL'] = float(os.getenv('RESPONSE_CACHE_TTL', 10.0))
+    app.config['PROFILING'] = os.getenv('PROFILING', '0') == '1'
+    app.config['PROFILE_SAMPLE_RATE'] = int(os.getenv('PROFILE_SAMPLE_RATE', 0))
+    app.config['PROFILE_DIR'] = os.getenv('PROFILE_DIR', os.path.join(app.instance_path, 'profiles'))
+    app.config.update(config or {})
+    app.config.setdefault(
+        'SQLALCHEMY_ENGINE_OPTIONS',
+        engine_options(app.config['SQLALCHEMY_DATABASE_URI'], os.environ)
+    )
+    
+    db.init_app(app)
+    CORS(app)
+    if is_sqlite(app.config['SQLALCHEMY_DATABASE_URI']):
+        with app.app_context():
+            install_sqlite_pragmas(db.engine, sqlite_pragmas(app.config['DB_PROFILE'], os.environ))
+    configure_image_store(app.config['IMAGE_CACHE_DIR'])
+    configure_prefetcher(max_workers=app.config['IMAGE_PREFETCH_WORKERS'])
+    configure_state(app.config['STATE_BACKEND'], make_url(app.config['SQLALCHEMY_DATABASE_URI']).get_backend_name())
+    app.register_blueprint(api)
+    
+    # Buffer UserStats updates and write them in batches (crash logs are replayed on the first flush)
+    if app.config['STATS_WRITE_BEHIND']:
+        configure_stats_writer(
+            app,
+            app.config['STATS_LOG_DIR'],
+            interval=app.config['STATS_FLUSH_INTERVAL'],
+            max_pending=app.config['STATS_FLUSH_MAX_PENDING'],
+            fsync=app.config['STATS_LOG_FSYNC']
+        )
+    
+    # Bulk-insert Guess rows instead of one INSERT per request
+    if app.config['GUESS_BUFFERING']:
+        configure_guess_recorder(
+            app,
+            interval=app.config['GUESS_FLUSH_INTERVAL'],
+            max_pending=app.config['GUESS_FLUSH_MAX_PENDING']
+        )
+    
+    # Close rounds at their deadline in batches, instead of waiting for /api/next-round
+    if app.config['ROUND_TIMER']:
+        configure_round_timer(app, min_interval=app.config['ROUND_TIMER_INTERVAL'])
+    else:
+        disable_round_timer()
+    
+    # Serve the polled analytics endpoints from memory until their data changes
+    if app.config['RESPONSE_CACHE']:
+        configure_response_cache(ttl=app.config['RESPONSE_CACHE_TTL'])
+    else:
+        disable_response_cache()
+    METRICS.register_collector('response_cache', response_cache_info, 'Analytics response cache')
+    
+    # Per-request phase timings for /api/metrics, plus sampled cProfile dumps
+    METRICS.register_collector('answer_matcher_cache', ANSWER_MATCHERS.info, 'Compiled answer matcher cache')
+    if app.config['PROFILING']:
+        with app.app_context():
+            configure_profiling(
+                app,
+                db.engine,
+                sample_rate=app.config['PROFILE_SAMPLE_RATE'],
+                profile_dir=app.config['PROFILE_DIR']
+            )
+    
+    return app
+
+
+def seed_if_empty():
+    """Create or migrate the schema and add test data to an empty database"""
+    applied = init_schema()
+    if applied:
+        print(f"✅ Applied schema migrations {applied}", flush=True)
+    
+    if User.query.first():
+        print("✅ Database already seeded with data", flush=True)
+        return False
+    
+    print("🌱 Seeding database with test data...", flush=True)
+    seed_database()
+    backfill_session_summaries()
+    rebuild_leaderboards()
+    db.session.commit()
+    print("✅ Database seeded successfully", flush=True)
+    return True
 
 # ==================== HEALTH CHECK ====================
 
-@app.route('/api/health', methods=['GET'])
+@api.route('/api/health', methods=['GET'])
 def health():
     """Health check endpoint"""
     return jsonify({'status': 'ok'}), 200
 
 # ==================== GAME ENDPOINTS ====================
 
-@app.route('/api/start-game', methods=['POST'])
+@api.route('/api/start-game', methods=['POST'])
 def start_game():
     """Start a new game session"""
     data = request.json
@@ -92,12 +205,9 @@ def start_round(session_id):
     if not session:
         return None
     
-    # Select word based on age group and difficulty
-    word_data = select_word(
-        age_group=session.age_group,
-        difficulty=session.difficulty,
-        language=session.language
-    )
+    # Draw the next word from the session's no-repeat deck, plus the ones after it
+    with phase('select_word'):
+        word_data, upcoming = draw_deck_word(session, peek=current_app.config['IMAGE_PREFETCH_ROUNDS'])
     
     if not word_data:
         return None
@@ -114,9 +224,15 @@ def start_round(session_id):
         )
         db.session.add(word_obj)
         db.session.commit()
+        invalidate('words')
     
-    # Generate AI image
-    image_url = generate_image(word_data['word'], style="sketch")
+    # Image was normally pre-rendered in the background; rounds keep the short URL
+    prefetcher = get_prefetcher()
+    with phase('generate_image'):
+        image_url = image_path(prefetcher.get_image_key(word_data['word'], style="sketch"))
+    
+    # Keep the next rounds' images rendering while the player guesses
+    prefetcher.prefetch(upcoming, style="sketch")
     
     # Create round record
     round_obj = Round(
@@ -127,7 +243,11 @@ def start_round(session_id):
         duration_seconds=60
     )
     db.session.add(round_obj)
+    db.session.flush()
+    # The deadline commits with the round, so no worker sees one without the other
+    schedule_round(round_obj)
     db.session.commit()
+    invalidate('games')
     
     return {
         'round_id': round_obj.id,
@@ -138,51 +258,67 @@ def start_round(session_id):
     }
 
 
-@app.route('/api/guess', methods=['POST'])
+@api.route('/api/guess', methods=['POST'])
 def handle_guess():
     """Process a player's guess"""
     data = request.json
     session_id = data.get('session_id')
     round_id = data.get('round_id')
     user_guess = data.get('guess', '').strip()
-    time_taken = data.get('time_taken', 0)
     
     try:
+        # Guesses per round per minute, counted across every worker
+        rate_limit = current_app.config['GUESS_RATE_LIMIT']
+        if rate_limit and get_state().counter_incr(f'guess:{round_id}', 60) > rate_limit:
+            db.session.commit()
+            return jsonify({'error': 'Too many guesses'}), 429
+        
         round_obj = Round.query.get(round_id)
         if not round_obj:
             return jsonify({'error': 'Round not found'}), 404
         
+        # The server's clock decides; a client-sent time_taken is ignored
+        now = datetime.now()
+        if is_round_over(round_obj, now):
+            return jsonify({'error': 'Round is over'}), 409
+        time_taken = elapsed_seconds(round_obj, now)
+        
         word = round_obj.word.word
         
         # Process the guess with fuzzy matching
-        result = process_guess(
-            user_guess=user_guess,
-            correct_word=word,
-            time_taken=time_taken,
-            max_time=60
-        )
-        
-        # Calculate points
+        with phase('process_guess'):
+            result = process_guess(
+                user_guess=user_guess,
+                correct_word=word,
+                time_taken=time_taken,
+                max_time=round_obj.duration_seconds,
+                word_id=round_obj.word_id
+            )
+        
+        # Calculate points (only the first correct guess of a round scores)
         points = 0
-        if result['is_correct']:
+        if result['is_correct'] and not round_obj.is_guessed:
             points = calculate_points(time_taken, result['match_type'])
         
         # Update round with result
         round_obj.guesses_count += 1
-        if result['is_correct']:
+        if result['is_correct'] and not round_obj.is_guessed:
             round_obj.is_guessed = True
-            round_obj.guessed_at = datetime.now()
+            round_obj.guessed_at = now
+            round_obj.points_earned = points
         
+        record_guess(round_obj.id, user_guess, result['is_correct'], result['match_type'], time_taken)
         db.session.commit()
         
         # Update user stats
-        update_user_stats(round_obj.session.user_id, result['is_correct'], points)
+        record_user_stats(round_obj.session.user_id, result['is_correct'], points)
         
         return jsonify({
             'success': True,
             'is_correct': result['is_correct'],
             'match_type': result['match_type'],
             'points': points,
+            'time_taken': time_taken,
             'correct_answer': word if result['is_correct'] else None,
             'message': result['message']
         }), 200
@@ -190,7 +326,139 @@ def handle_guess():
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/next-round', methods=['POST'])
+@api.route('/api/guess/batch', methods=['POST'])
+def handle_guess_batch():
+    """Process a burst of guesses for one round (classroom mode)"""
+    data = request.json
+    round_id = data.get('round_id')
+    entries = data.get('guesses', [])
+    
+    try:
+        round_obj = Round.query.get(round_id)
+        if not round_obj:
+            return jsonify({'error': 'Round not found'}), 404
+        
+        now = datetime.now()
+        if is_round_over(round_obj, now):
+            return jsonify({'error': 'Round is over'}), 409
+        
+        word = round_obj.word.word
+        try:
+            guesses, user_ids = parse_batch_entries(entries, round_obj.session.user_id)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # The whole burst is timed by the server when it arrives
+        times_taken = [elapsed_seconds(round_obj, now)] * len(guesses)
+        
+        with phase('process_guess'):
+            results = process_guesses(guesses, word, times_taken=times_taken, max_time=round_obj.duration_seconds,
+                                      word_id=round_obj.word_id)
+        
+        # As in a room, each student scores their own first correct guess and
+        # gets a round_scores row; the round's points are the class total
+        scores = {score.user_id: score for score in RoundScore.query.filter_by(round_id=round_obj.id)}
+        if round_obj.is_guessed and not scores:
+            # Solved by the session player through /api/guess before any batch
+            scores[round_obj.session.user_id] = RoundScore(
+                round_id=round_obj.id, user_id=round_obj.session.user_id,
+                points=round_obj.points_earned or 0, scored_at=round_obj.guessed_at
+            )
+            db.session.add(scores[round_obj.session.user_id])
+        
+        stats_updates = []
+        response_results = []
+        for guess, user_id, result in zip(guesses, user_ids, results):
+            if user_id in scores:
+                response_results.append({
+                    'is_correct': False,
+                    'match_type': None,
+                    'points': 0,
+                    'correct_answer': None,
+                    'message': 'Already guessed this round'
+                })
+                continue
+            record_guess(round_obj.id, guess, result['is_correct'], result['match_type'], result['time_taken'])
+            
+            points = 0
+            if result['is_correct']:
+                points = calculate_points(result['time_taken'], result['match_type'])
+                scores[user_id] = RoundScore(round_id=round_obj.id, user_id=user_id, points=points, scored_at=now)
+                db.session.add(scores[user_id])
+                round_obj.points_earned = (round_obj.points_earned or 0) + points
+                if not round_obj.is_guessed:
+                    round_obj.is_guessed = True
+                    round_obj.guessed_at = now
+            
+            round_obj.guesses_count += 1
+            stats_updates.append((user_id, result['is_correct'], points))
+            response_results.append({
+                'is_correct': result['is_correct'],
+                'match_type': result['match_type'],
+                'points': points,
+                'correct_answer': word if result['is_correct'] else None,
+                'message': result['message']
+            })
+        
+        # Update round and stats for the whole batch in one transaction
+        stats_writer = get_stats_writer()
+        if stats_writer is None:
+            update_user_stats_batch(stats_updates)
+        db.session.commit()
+        if stats_writer is None:
+            invalidate('stats')
+        else:
+            for user_id, is_correct, points in stats_updates:
+                stats_writer.record(user_id, is_correct, points)
+        
+        return jsonify({
+            'success': True,
+            'results': response_results,
+            'correct_count': sum(1 for r in response_results if r['is_correct'])
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+def parse_batch_entries(entries, default_user_id):
+    """
+    Check the entries of a /api/guess/batch request
+    
+    Entries may be plain strings or {'guess', 'user_id'} objects; entries
+    without a user_id are the session player's.
+    
+    Returns:
+        tuple: (guesses, user_ids), two lists in entry order
+    
+    Raises:
+        ValueError: If an entry is malformed or names a user that does not exist
+    """
+    if not isinstance(entries, list):
+        raise ValueError("'guesses' must be a list")
+    
+    guesses, user_ids = [], []
+    for i, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            entry = {'guess': entry}
+        guess = entry.get('guess')
+        if guess is None:
+            guess = ''
+        user_id = entry.get('user_id', default_user_id)
+        if not isinstance(guess, str):
+            raise ValueError(f"Guess {i}: 'guess' must be a string")
+        if not isinstance(user_id, int) or isinstance(user_id, bool):
+            raise ValueError(f"Guess {i}: 'user_id' must be an integer")
+        guesses.append(guess.strip())
+        user_ids.append(user_id)
+    
+    unknown = set(user_ids) - {user_id for user_id, in db.session.query(User.id).filter(User.id.in_(set(user_ids)))}
+    if unknown:
+        raise ValueError(f"Unknown user_id {sorted(unknown)}")
+    return guesses, user_ids
+
+
+@api.route('/api/next-round', methods=['POST'])
 def next_round():
     """Move to the next round"""
     data = request.json
@@ -205,7 +473,9 @@ def next_round():
         
         if current_round_count >= session.total_rounds:
             # Game is over
-            session.ended_at = datetime.now()
+            if not session.ended_at:
+                session.ended_at = datetime.now()
+            record_session_summary(session)
             db.session.commit()
             
             return jsonify({
@@ -228,7 +498,7 @@ def next_round():
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/game-summary/<int:session_id>', methods=['GET'])
+@api.route('/api/game-summary/<int:session_id>', methods=['GET'])
 def game_summary(session_id):
     """Get summary of completed game"""
     try:
@@ -263,7 +533,7 @@ def game_summary(session_id):
 
 # ==================== USER ENDPOINTS ====================
 
-@app.route('/api/user/create', methods=['POST'])
+@api.route('/api/user/create', methods=['POST'])
 def create_user():
     """Create a new user"""
     data = request.json
@@ -280,6 +550,7 @@ def create_user():
         )
         db.session.add(user)
         db.session.commit()
+        invalidate('users')
         
         return jsonify({
             'success': True,
@@ -290,7 +561,7 @@ def create_user():
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/user/<int:user_id>/stats', methods=['GET'])
+@api.route('/api/user/<int:user_id>/stats', methods=['GET'])
 def user_stats(user_id):
     """Get user statistics"""
     try:
@@ -298,7 +569,23 @@ def user_stats(user_id):
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        stats = UserStats.query.filter_by(user_id=user_id).first()
+        stats_writer = get_stats_writer()
+        load_stats = lambda: UserStats.query.filter_by(user_id=user_id).first()
+        if stats_writer is None:
+            stats, pending = load_stats(), None
+        else:
+            stats, pending = stats_writer.read_stats(user_id, load_stats)
+        
+        if pending is not None:
+            # Include guesses not yet flushed, without touching the session row
+            view = UserStats(user_id=user_id)
+            for column in UserStats.__table__.columns:
+                value = getattr(stats, column.key) if stats else None
+                if value is None and column.default is not None and not column.default.is_callable:
+                    value = column.default.arg
+                setattr(view, column.key, value)
+            pending.apply(view)
+            stats = view
         
         if not stats:
             return jsonify({
@@ -327,173 +614,114 @@ def user_stats(user_id):
 
 # ==================== PSYCHOLOGY ANALYTICS ENDPOINTS ====================
 
-@app.route('/api/psychology/learning-curve/<int:user_id>', methods=['GET'])
+@api.route('/api/psychology/learning-curve/<int:user_id>', methods=['GET'])
 def learning_curve(user_id):
-    """Get user's learning curve data"""
+    """Get user's learning curve data (optional ?since=<ISO date>&limit=<n>)"""
     try:
-        sessions = GameSession.query.filter_by(user_id=user_id).order_by(GameSession.started_at).all()
-        
-        learning_data = []
-        cumulative_correct = 0
-        
-        for session in sessions:
-            rounds = Round.query.filter_by(session_id=session.id).all()
-            correct_in_session = sum(1 for r in rounds if r.is_guessed)
-            cumulative_correct += correct_in_session
-            
-            learning_data.append({
-                'session_number': len(learning_data) + 1,
-                'correct_guesses': correct_in_session,
-                'cumulative_correct': cumulative_correct,
-                'total_in_session': len(rounds),
-                'accuracy': (correct_in_session / len(rounds) * 100) if rounds else 0,
-                'date': session.started_at.isoformat()
-            })
+        since = request.args.get('since')
+        if since:
+            try:
+                since = datetime.fromisoformat(since)
+            except ValueError:
+                return jsonify({'error': 'since must be an ISO date'}), 400
+        limit = request.args.get('limit', type=int)
         
         return jsonify({
             'user_id': user_id,
-            'learning_data': learning_data
+            'learning_data': get_learning_curve(user_id, since=since or None, limit=limit)
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/psychology/cognitive-metrics/<int:user_id>', methods=['GET'])
+@api.route('/api/psychology/cognitive-metrics/<int:user_id>', methods=['GET'])
 def cognitive_metrics(user_id):
     """Get cognitive performance metrics"""
     try:
-        sessions = GameSession.query.filter_by(user_id=user_id).all()
-        
-        metrics = {
-            'reaction_time': calculate_avg_reaction_time(user_id),
-            'memory_retention': calculate_retention_rate(user_id),
-            'difficulty_progression': calculate_difficulty_progression(user_id),
-            'category_performance': calculate_category_performance(user_id),
-            'visual_recognition': calculate_visual_recognition_score(user_id)
-        }
+        metrics = get_cognitive_metrics(user_id)
         
         return jsonify(metrics), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/psychology/comparative-analysis', methods=['GET'])
+@api.route('/api/psychology/comparative-analysis', methods=['GET'])
+@cached_response('users', 'stats')
 def comparative_analysis():
     """Compare performance across all users"""
     try:
-        all_users = User.query.all()
-        
-        analysis = {
-            'average_accuracy': 0,
-            'average_points': 0,
-            'most_popular_category': None,
-            'top_performers': []
-        }
-        
-        if all_users:
-            total_accuracy = 0
-            total_points = 0
-            category_counts = {}
-            
-            user_scores = []
-            for user in all_users:
-                stats = UserStats.query.filter_by(user_id=user.id).first()
-                if stats:
-                    total_accuracy += stats.accuracy_percentage
-                    total_points += stats.total_points
-                    user_scores.append({
-                        'username': user.username,
-                        'points': stats.total_points,
-                        'accuracy': stats.accuracy_percentage
-                    })
-            
-            analysis['average_accuracy'] = total_accuracy / len(all_users) if all_users else 0
-            analysis['average_points'] = total_points / len(all_users) if all_users else 0
-            analysis['top_performers'] = sorted(user_scores, key=lambda x: x['points'], reverse=True)[:10]
+        analysis = get_comparative_analysis(top_n=10)
         
         return jsonify(analysis), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/dashboard', methods=['GET'])
+@api.route('/api/dashboard', methods=['GET'])
+@cached_response('users', 'stats', 'games', 'words')
 def dashboard():
     """Get comprehensive dashboard data"""
     try:
-        # Get all users and their stats
-        all_users = User.query.all()
-        leaderboard = []
-        
-        for user in all_users:
-            stats = UserStats.query.filter_by(user_id=user.id).first()
-            if stats:
-                leaderboard.append({
-                    'user_id': user.id,
-                    'username': user.username,
-                    'points': stats.total_points,
-                    'accuracy': round(stats.accuracy_percentage, 2),
-                    'games_played': stats.total_games_played,
-                    'words_learned': stats.words_learned
-                })
-        
-        leaderboard = sorted(leaderboard, key=lambda x: x['points'], reverse=True)
-        
-        # Get statistics
-        total_games = GameSession.query.count()
-        total_guesses = Round.query.count()
-        avg_accuracy = sum(u['accuracy'] for u in leaderboard) / len(leaderboard) if leaderboard else 0
-        
-        # Get category distribution
-        all_words = Word.query.all()
-        category_dist = {}
-        for word in all_words:
-            cat = word.category or 'Unknown'
-            category_dist[cat] = category_dist.get(cat, 0) + 1
+        data = get_dashboard_data(leaderboard_size=10)
+        data['age_groups'] = ['5-7', '8-12', 'Adult']
+        data['timestamps'] = {
+            'last_updated': datetime.now().isoformat()
+        }
         
-        return jsonify({
-            'total_users': len(all_users),
-            'total_games': total_games,
-            'total_guesses': total_guesses,
-            'average_accuracy': round(avg_accuracy, 2),
-            'leaderboard': leaderboard[:10],
-            'category_distribution': category_dist,
-            'age_groups': ['5-7', '8-12', 'Adult'],
-            'timestamps': {
-                'last_updated': datetime.now().isoformat()
-            }
-        }), 200
+        return jsonify(data), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/users', methods=['GET'])
+@api.route('/api/leaderboard', methods=['GET'])
+def leaderboard():
+    """Top of a ranked leaderboard (all, daily, weekly or age)"""
+    try:
+        data = get_board(
+            kind=request.args.get('board', 'all'),
+            limit=request.args.get('limit', 10, type=int),
+            offset=request.args.get('offset', 0, type=int),
+            age_group=request.args.get('age_group'),
+            after=request.args.get('after', type=int)
+        )
+        return jsonify(data), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@api.route('/api/leaderboard/user/<int:user_id>', methods=['GET'])
+def leaderboard_rank(user_id):
+    """A player's rank on a leaderboard and the players around them"""
+    try:
+        data = get_user_rank(
+            user_id,
+            kind=request.args.get('board', 'all'),
+            around=request.args.get('around', 5, type=int)
+        )
+        return jsonify(data), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@api.route('/api/users', methods=['GET'])
+@cached_response('users', 'stats')
 def get_all_users():
-    """Get all users with their stats"""
+    """Get a page of users with their stats"""
     try:
-        users = User.query.all()
-        users_data = []
-        
-        for user in users:
-            stats = UserStats.query.filter_by(user_id=user.id).first()
-            users_data.append({
-                'user_id': user.id,
-                'username': user.username,
-                'age': user.age,
-                'language': user.preferred_language,
-                'stats': {
-                    'total_games': stats.total_games_played if stats else 0,
-                    'total_points': stats.total_points if stats else 0,
-                    'accuracy': round(stats.accuracy_percentage, 2) if stats else 0,
-                    'words_learned': stats.words_learned if stats else 0
-                }
-            })
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', DEFAULT_PAGE_SIZE, type=int)
         
-        return jsonify(users_data), 200
+        return jsonify(get_users_page(page=page, per_page=per_page)), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/words', methods=['GET'])
+@api.route('/api/words', methods=['GET'])
+@cached_response('words')
 def get_all_words():
     """Get all available words"""
     try:
@@ -517,8 +745,48 @@ def get_all_words():
         return jsonify({'error': str(e)}), 500
 
 
+@api.route('/api/image/<key>', methods=['GET'])
+def get_image(key):
+    """Serve a stored SVG by content key, or a word's image by word id"""
+    try:
+        max_age = 31536000  # content keys never change meaning
+        if key.isdigit():
+            word = Word.query.get(int(key))
+            if not word:
+                return jsonify({'error': 'Image not found'}), 404
+            key = generate_image_key(word.word, style="sketch")
+            max_age = 3600
+        
+        store = get_image_store()
+        gzipped = 'gzip' in request.headers.get('Accept-Encoding', '')
+        data = store.get_gzip(key) if gzipped else store.get(key)
+        if data is None:
+            return jsonify({'error': 'Image not found'}), 404
+        
+        response = Response(data, mimetype='image/svg+xml')
+        if gzipped:
+            response.headers['Content-Encoding'] = 'gzip'
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.set_etag(f'{key}-gz' if gzipped else key)
+        response.headers['Cache-Control'] = f'public, max-age={max_age}'
+        return response.make_conditional(request)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@api.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics (request timings only when PROFILING=1)"""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+
 # ==================== HELPER FUNCTIONS ====================
 
+def image_path(key):
+    """URL path of a stored image"""
+    return f'/api/image/{key}'
+
+
 def generate_hint(word, reveal_percent=0.3):
     """Generate a hint for a word"""
     reveal_count = max(1, int(len(word) * reveal_percent))
@@ -536,7 +804,7 @@ def calculate_points(time_taken, match_type):
     
     if match_type == 'exact':
         time_bonus = max(0, 100 - (time_taken // 6))  # -1 point per 6 seconds
-        return base_points + time_bonus
+        return int(base_points + time_bonus)  # time_taken may be a float
     elif match_type == 'fuzzy':
         return int(base_points * 0.75)
     elif match_type == 'synonym':
@@ -545,6 +813,15 @@ def calculate_points(time_taken, match_type):
     return 0
 
 
+def record_user_stats(user_id, is_correct, points):
+    """Record a guess in the user's stats (write-behind when enabled)"""
+    stats_writer = get_stats_writer()
+    if stats_writer is not None:
+        stats_writer.record(user_id, is_correct, points)
+    else:
+        update_user_stats(user_id, is_correct, points)
+
+
 def update_user_stats(user_id, is_correct, points):
     """Update user statistics"""
     stats = UserStats.query.filter_by(user_id=user_id).first()
@@ -552,17 +829,50 @@ def update_user_stats(user_id, is_correct, points):
         stats = UserStats(user_id=user_id)
         db.session.add(stats)
     
-    stats.total_correct_guesses += 1 if is_correct else 0
-    stats.total_points += points
-    stats.total_guesses += 1
+    apply_guess_to_stats(stats, is_correct, points)
+    record_scores({user_id: points})
+    
+    db.session.commit()
+    invalidate('stats')
+
+
+def update_user_stats_batch(updates):
+    """
+    Apply many (user_id, is_correct, points) updates without committing
+    (the caller commits, then invalidates cached 'stats' responses)
+    
+    Loads every affected UserStats row in one query; updates are applied in
+    order so streaks come out the same as with update_user_stats.
+    """
+    user_ids = {user_id for user_id, _, _ in updates}
+    stats_by_user = {
+        stats.user_id: stats
+        for stats in UserStats.query.filter(UserStats.user_id.in_(user_ids)).all()
+    }
+    
+    points_by_user = {}
+    for user_id, is_correct, points in updates:
+        stats = stats_by_user.get(user_id)
+        if not stats:
+            stats = UserStats(user_id=user_id)
+            db.session.add(stats)
+            stats_by_user[user_id] = stats
+        apply_guess_to_stats(stats, is_correct, points)
+        points_by_user[user_id] = points_by_user.get(user_id, 0) + points
+    record_scores(points_by_user)
+
+
+def apply_guess_to_stats(stats, is_correct, points):
+    """Add one guess to a UserStats row"""
+    stats.total_correct_guesses = (stats.total_correct_guesses or 0) + (1 if is_correct else 0)
+    stats.total_points = (stats.total_points or 0) + points
+    stats.total_guesses = (stats.total_guesses or 0) + 1
     stats.accuracy_percentage = (stats.total_correct_guesses / stats.total_guesses * 100) if stats.total_guesses > 0 else 0
     
     if is_correct:
-        stats.current_streak += 1
+        stats.current_streak = (stats.current_streak or 0) + 1
     else:
         stats.current_streak = 0
-    
-    db.session.commit()
 
 
 def calculate_session_score(session_id):
@@ -571,43 +881,70 @@ def calculate_session_score(session_id):
     return sum(r.points_earned for r in rounds if r.points_earned)
 
 
-def calculate_avg_reaction_time(user_id):
-    """Calculate average reaction time for guesses"""
-    sessions = GameSession.query.filter_by(user_id=user_id).all()
-    total_time = 0
-    total_guesses = 0
-    
-    for session in sessions:
-        rounds = Round.query.filter_by(session_id=session.id).all()
-        for round_obj in rounds:
-            if round_obj.guessed_at:
-                time_diff = (round_obj.guessed_at - round_obj.started_at).total_seconds()
-                total_time += time_diff
-                total_guesses += 1
-    
-    return total_time / total_guesses if total_guesses > 0 else 0
+# ==================== CLI COMMANDS ====================
 
+@api.cli.command('init-db')
+def init_db_command():
+    """Create missing tables and apply pending schema migrations"""
+    applied = init_schema()
+    print(f"✅ Applied migrations {applied}" if applied else "✅ Schema is up to date", flush=True)
 
-def calculate_retention_rate(user_id):
-    """Calculate how well user retains learned words"""
-    # This would track if users get the same word right multiple times
-    return 0.0
 
+@api.cli.command('migrate')
+def migrate_command():
+    """Apply pending schema migrations"""
+    applied = run_migrations()
+    print(f"✅ Applied migrations {applied}" if applied else "✅ Schema is up to date", flush=True)
 
-def calculate_difficulty_progression(user_id):
-    """Track if user is progressing through difficulty levels"""
-    return {}
 
+@api.cli.command('seed')
+def seed_command():
+    """Add test users, words and games to an empty database"""
+    seed_if_empty()
 
-def calculate_category_performance(user_id):
-    """Performance breakdown by category"""
-    return {}
 
+@api.cli.command('generate-data')
+@click.option('--users', default=1000, show_default=True, help='Players to create')
+@click.option('--rounds', default=10000, show_default=True, help='Rounds to create (10 per game)')
+@click.option('--guesses-per-round', default=5.0, show_default=True, help='Average guesses per round (0 for none)')
+@click.option('--seed', default=42, show_default=True, help='RNG seed; same options give the same data')
+def generate_data_command(users, rounds, guesses_per_round, seed):
+    """Bulk-insert a synthetic dataset for load testing"""
+    init_schema()
+    if not Word.query.first():
+        seed_if_empty()
+    result = generate_dataset(users=users, rounds=rounds, guesses_per_round=guesses_per_round, seed=seed)
+    print(f"✅ Generated {json.dumps(result)}", flush=True)
 
-def calculate_visual_recognition_score(user_id):
-    """Score based on visual recognition performance"""
-    return 0.0
+
+@api.cli.command('rebuild-leaderboards')
+def rebuild_leaderboards_command():
+    """Recompute the ranked leaderboards from stored stats and rounds"""
+    written = rebuild_leaderboards()
+    db.session.commit()
+    print(f"✅ Rebuilt leaderboards {json.dumps(written)}", flush=True)
+
+
+@api.cli.command('recover-stats')
+def recover_stats_command():
+    """Apply write-behind stats logs left behind by crashed processes"""
+    stats_writer = get_stats_writer()
+    if stats_writer is None:
+        print("Stats write-behind is disabled (STATS_WRITE_BEHIND=0)", flush=True)
+        return
+    replayed = stats_writer.recover()
+    print(f"✅ Replayed {replayed} logged guesses", flush=True)
+
+
+@api.cli.command('backfill-learning-curve')
+def backfill_learning_curve_command():
+    """Rebuild session summaries for the learning curve from existing games"""
+    written = backfill_session_summaries()
+    print(f"✅ Wrote {written} session summaries", flush=True)
 
 
 if __name__ == '__main__':
+    app = create_app()
+    with app.app_context():
+        seed_if_empty()
     app.run(debug=True, port=5001)
@@ -0,0 +1,34 @@
+import pytest
+
+from benchmarks.common import create_bench_app
+
+
+@pytest.fixture
+def app_config(tmp_path):
+    """App config with every background thread off and files under tmp_path"""
+    return {
+        'STATE_BACKEND': 'sql',
+        'STATS_WRITE_BEHIND': False,
+        'GUESS_BUFFERING': False,
+        'ROUND_TIMER': False,
+        'RESPONSE_CACHE': False,
+        'IMAGE_PREFETCH_WORKERS': 0,
+        'IMAGE_CACHE_DIR': str(tmp_path / 'images'),
+        'STATS_LOG_DIR': str(tmp_path / 'stats-log'),
+    }
+
+
+@pytest.fixture
+def app(tmp_path, app_config):
+    """App on a freshly seeded SQLite file"""
+    app, _ = create_bench_app(db_path=str(tmp_path / 'bictionary.db'), config=app_config)
+    with app.app_context():
+        yield app
+        from app.models import db
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
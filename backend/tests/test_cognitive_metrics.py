@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+from app.cognitive_metrics import get_cognitive_metrics
+from app.models import db, GameSession, Round, User, Word
+from benchmarks.bench_cognitive_metrics import MAX_QUERIES, add_history
+from benchmarks.common import count_queries
+
+
+def metrics_query_count(client, user_id):
+    db.session.remove()
+    with count_queries(db.engine) as counter:
+        response = client.get(f'/api/psychology/cognitive-metrics/{user_id}')
+    assert response.status_code == 200
+    return counter.count
+
+
+def test_query_count_does_not_grow_with_history(app, client):
+    user = User(username='metrics_player', age=30)
+    db.session.add(user)
+    db.session.commit()
+
+    add_history(db, user.id, 5)
+    short_history = metrics_query_count(client, user.id)
+    add_history(db, user.id, 300)
+    long_history = metrics_query_count(client, user.id)
+
+    assert short_history == long_history <= MAX_QUERIES
+
+
+def test_metrics_from_rounds(app):
+    user = User(username='retention_player', age=30)
+    cat, dog = Word.query.filter(Word.word.in_(['Cat', 'Dog'])).order_by(Word.word).all()
+    db.session.add(user)
+    db.session.flush()
+    session = GameSession(user_id=user.id, difficulty='easy', started_at=datetime(2024, 5, 1))
+    db.session.add(session)
+    db.session.flush()
+
+    start = datetime(2024, 5, 1, 12)
+    # (word, guessed, guesses): cat is retained, dog is forgotten
+    played = [(cat, True, 1), (dog, True, 2), (cat, True, 1), (dog, False, 3)]
+    for n, (word, guessed, guesses) in enumerate(played):
+        started = start + timedelta(minutes=n)
+        db.session.add(Round(
+            session_id=session.id, word_id=word.id, round_number=n + 1, started_at=started,
+            guessed_at=started + timedelta(seconds=10) if guessed else None,
+            is_guessed=guessed, guesses_count=guesses
+        ))
+    db.session.commit()
+
+    metrics = get_cognitive_metrics(user.id)
+
+    assert metrics['memory_retention'] == 50.0
+    assert metrics['visual_recognition'] == 50.0
+    assert round(metrics['reaction_time'], 3) == 10.0
+    assert metrics['difficulty_progression']['easy']['rounds'] == 4
+    assert metrics['difficulty_progression']['easy']['accuracy'] == 75.0
+    assert sum(c['rounds'] for c in metrics['category_performance'].values()) == 4
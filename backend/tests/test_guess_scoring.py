@@ -0,0 +1,159 @@
+import time
+from datetime import datetime, timedelta
+from app import round_timer
+from app.models import db, GameSession, Round, RoundScore, UserStats, User
+from app.rankings import get_board, get_user_rank, rebuild_leaderboards
+from app.round_timer import RoundTimer
+from benchmarks.common import create_bench_app
+
+
+def new_round(client, user_id):
+    response = client.post('/api/start-game', json={'user_id': user_id, 'rounds': 5})
+    round_id = response.get_json()['round']['round_id']
+    return Round.query.get(round_id)
+
+
+def stats_points(user_id):
+    db.session.expire_all()
+    stats = UserStats.query.filter_by(user_id=user_id).first()
+    return stats.total_points if stats else 0
+
+
+def new_player(name):
+    user = User(username=name, age=30)
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+def test_batch_scores_like_single_guesses(app, client):
+    single_player, batch_player = new_player('single_player'), new_player('batch_player')
+    single_round, batch_round = new_round(client, single_player), new_round(client, batch_player)
+    word = single_round.word.word
+    batch_round.word_id = single_round.word_id
+    db.session.commit()
+    guesses = ['zzzz', word, word.lower(), word]
+
+    single = [client.post('/api/guess', json={'round_id': single_round.id, 'guess': g}).get_json()
+              for g in guesses]
+    batch = client.post('/api/guess/batch', json={'round_id': batch_round.id, 'guesses': guesses}).get_json()
+
+    single_points = [r['points'] for r in single]
+    batch_points = [r['points'] for r in batch['results']]
+    assert [p > 0 for p in single_points] == [False, True, False, False]
+    assert [p > 0 for p in batch_points] == [False, True, False, False]
+    assert all(isinstance(p, int) for p in single_points + batch_points)
+
+    db.session.expire_all()
+    for user_id, round_obj, points in ((single_player, single_round, single_points),
+                                       (batch_player, batch_round, batch_points)):
+        round_obj = Round.query.get(round_obj.id)
+        assert round_obj.is_guessed and round_obj.guessed_at is not None
+        assert round_obj.points_earned == sum(points)
+        assert stats_points(user_id) == sum(points)
+
+
+def test_rebuilt_daily_board_matches_all_time_points(app, client):
+    user_id = new_player('board_player')
+    for _ in range(3):
+        round_obj = new_round(client, user_id)
+        word = round_obj.word.word
+        client.post('/api/guess/batch', json={'round_id': round_obj.id, 'guesses': [word, word]})
+
+    rebuild_leaderboards()
+    db.session.commit()
+
+    all_time = get_user_rank(user_id, 'all')['points']
+    assert all_time == stats_points(user_id) > 0
+    assert get_user_rank(user_id, 'daily')['points'] == all_time
+    session_points = sum(r.points_earned for s in GameSession.query.filter_by(user_id=user_id)
+                         for r in s.rounds)
+    assert session_points == all_time
+    assert any(e['user_id'] == user_id for e in get_board('daily', limit=100)['entries'])
+
+
+def test_round_timer_sleeps_until_next_deadline(app, monkeypatch):
+    sweeps = []
+    original_sweep = RoundTimer.sweep
+    monkeypatch.setattr(RoundTimer, 'sweep', lambda self: sweeps.append(time.time()) or original_sweep(self))
+    timer = RoundTimer(app, min_interval=0.05)
+    try:
+        timer.schedule(12345, datetime.now() + timedelta(seconds=60))
+        db.session.commit()
+        time.sleep(0.5)
+        assert len(sweeps) == 1  # nothing due: one sweep, then asleep
+
+        timer.schedule(12346, datetime.now() + timedelta(seconds=0.3))
+        db.session.commit()
+        time.sleep(0.6)
+        # Woken by schedule, then once more at the new deadline
+        assert 2 <= len(sweeps) <= 4
+        assert timer.pending_count() == 1
+    finally:
+        timer.close()
+
+
+def test_app_without_round_timer_stops_the_previous_one(tmp_path, app_config):
+    create_bench_app(db_path=str(tmp_path / 'timed.db'), config=dict(app_config, ROUND_TIMER=True))
+    timer = round_timer._timer
+    assert timer is not None
+
+    create_bench_app(db_path=str(tmp_path / 'untimed.db'), config=app_config)
+    assert round_timer._timer is None
+    assert not timer._thread.is_alive()
+
+
+def test_batch_rejects_bad_entries(app, client):
+    user_id = new_player('strict_player')
+    round_obj = new_round(client, user_id)
+    bad_bodies = [
+        {'round_id': round_obj.id, 'guesses': 'cat'},
+        {'round_id': round_obj.id, 'guesses': [42]},
+        {'round_id': round_obj.id, 'guesses': [{'guess': ['cat']}]},
+        {'round_id': round_obj.id, 'guesses': [{'guess': 'cat', 'user_id': '1'}]},
+        {'round_id': round_obj.id, 'guesses': [{'guess': 'cat', 'user_id': 987654}]},
+    ]
+    for body in bad_bodies:
+        assert client.post('/api/guess/batch', json=body).status_code == 400
+
+    db.session.expire_all()
+    assert UserStats.query.filter_by(user_id=987654).first() is None
+    assert Round.query.get(round_obj.id).guesses_count == 0
+
+
+def test_batch_scores_each_students_first_correct_guess(app, client):
+    teacher, alice, bob = new_player('teacher'), new_player('alice'), new_player('bob')
+    round_obj = new_round(client, teacher)
+    word = round_obj.word.word
+    entries = [
+        {'guess': word, 'user_id': alice},
+        {'guess': 'zzzz', 'user_id': bob},
+        {'guess': word, 'user_id': alice},
+        {'guess': word, 'user_id': bob},
+    ]
+    first = client.post('/api/guess/batch', json={'round_id': round_obj.id, 'guesses': entries}).get_json()
+    again = client.post('/api/guess/batch', json={'round_id': round_obj.id, 'guesses': [
+        {'guess': word, 'user_id': bob}, word
+    ]}).get_json()
+
+    points = [r['points'] for r in first['results']]
+    assert points[0] > 0 and points[3] > 0 and points[1] == points[2] == 0
+    assert [r['is_correct'] for r in first['results']] == [True, False, False, True]
+    assert first['correct_count'] == 2
+    assert [r['is_correct'] for r in again['results']] == [False, True]
+    assert again['results'][1]['points'] > 0
+
+    db.session.expire_all()
+    round_obj = Round.query.get(round_obj.id)
+    scores = {s.user_id: s.points for s in RoundScore.query.filter_by(round_id=round_obj.id)}
+    assert scores == {alice: points[0], bob: points[3], teacher: again['results'][1]['points']}
+    assert round_obj.points_earned == sum(scores.values())
+    assert round_obj.guesses_count == 4  # repeats from students who solved are not counted
+    alice_stats = UserStats.query.filter_by(user_id=alice).first()
+    assert (alice_stats.total_guesses, alice_stats.total_correct_guesses) == (1, 1)
+    assert stats_points(bob) == points[3]
+
+    rebuild_leaderboards()
+    db.session.commit()
+    for user_id, user_points in scores.items():
+        assert get_user_rank(user_id, 'daily')['points'] == user_points
@@ -0,0 +1,26 @@
+from app.image_generator import DUMMY_IMAGES, generate_image_key
+from app.models import Word
+
+
+def test_same_word_renders_same_key(app):
+    assert generate_image_key('lighthouse') == generate_image_key('lighthouse')
+    assert generate_image_key('lighthouse') != generate_image_key('submarine')
+
+
+def test_word_image_is_stable_across_requests(app, client, tmp_path):
+    # A word without a predefined image, so its gradient is rendered
+    word = next(w for w in Word.query.order_by(Word.id) if w.word.lower() not in DUMMY_IMAGES)
+
+    etags = {client.get(f'/api/image/{word.id}').headers['ETag'] for _ in range(20)}
+
+    assert len(etags) == 1
+    assert len(list((tmp_path / 'images').glob('*.svg'))) == 1
+
+
+def test_word_image_answers_conditional_requests(app, client):
+    word = Word.query.first()
+    etag = client.get(f'/api/image/{word.id}').headers['ETag']
+
+    response = client.get(f'/api/image/{word.id}', headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
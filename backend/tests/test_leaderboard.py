@@ -0,0 +1,90 @@
+import random
+import pytest
+from app.migrations import add_leaderboard_counts
+from app.models import db, LeaderboardCount
+from app.rankings import get_board
+from app.state import MemoryState, SQLState
+
+# Scores with many ties, so ordering by member within a score matters
+SCORES = {member: random.Random(member).choice([0, 5, 10, 10, 20, 35]) for member in range(1, 61)}
+EXPECTED = sorted(SCORES.items(), key=lambda item: (-item[1], item[0]))
+
+
+@pytest.fixture(params=['memory', 'sql'])
+def state(request, app):
+    state = MemoryState() if request.param == 'memory' else SQLState()
+    state.score_incr_many([('test', member, score) for member, score in SCORES.items()])
+    db.session.commit()
+    return state
+
+
+def test_rank_orders_ties_by_member(state):
+    for rank, (member, _) in enumerate(EXPECTED):
+        assert state.rank('test', member) == rank
+    assert state.rank('test', 999) is None
+
+
+def test_around_returns_neighbours(state):
+    for rank, (member, _) in enumerate(EXPECTED):
+        found, neighbours = state.around('test', member, 3)
+        assert found == rank
+        assert neighbours == EXPECTED[max(0, rank - 3):rank + 4]
+
+
+def test_keyset_pages_match_offset_pages(state):
+    assert state.top('test', 0, 7) == EXPECTED[:7]
+    pages = [state.top('test', 0, 7)]
+    while len(pages[-1]) == 7:
+        pages.append(state.top_after('test', pages[-1][-1][0], 7))
+    assert [entry for page in pages for entry in page] == EXPECTED
+    for start in range(0, len(EXPECTED), 7):
+        assert state.top('test', start, 7) == EXPECTED[start:start + 7]
+    assert state.top_after('test', 999, 7) is None
+
+
+def test_board_cursor_through_api(app, client):
+    SQLState().score_incr_many([('all', member, score) for member, score in SCORES.items()])
+    db.session.commit()
+
+    seen = []
+    response = client.get('/api/leaderboard?limit=9').get_json()
+    while True:
+        seen.extend((e['rank'], e['user_id']) for e in response['entries'])
+        if response['next'] is None:
+            break
+        response = client.get(f"/api/leaderboard?limit=9&after={response['next']}").get_json()
+
+    all_time = get_board('all', limit=100)['entries']
+    assert seen == [(e['rank'], e['user_id']) for e in all_time]
+    assert client.get('/api/leaderboard?after=999').status_code == 400
+
+
+def test_rank_tree_follows_score_changes(state):
+    scores = dict(SCORES)
+    changes = [(member, random.Random(-member).choice([0, 5, 15, 40])) for member in range(1, 90, 3)]
+    state.score_incr_many([('test', member, amount) for member, amount in changes])
+    for member, amount in changes:
+        scores[member] = scores.get(member, 0) + amount
+    assert state.score_incr('test', 2, 7) == scores[2] + 7
+    scores[2] += 7
+    db.session.commit()
+
+    expected = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    assert state.board_size('test') == len(expected)
+    assert [state.rank('test', member) for member, _ in expected] == list(range(len(expected)))
+    assert state.top('test', 40, 10) == expected[40:50]
+
+
+def test_migration_recounts_the_rank_tree(app):
+    SQLState().score_incr_many([('test', member, score) for member, score in SCORES.items()])
+    db.session.commit()
+    incremental = {(r.board, r.level, r.prefix): r.count for r in LeaderboardCount.query if r.count}
+    with db.engine.begin() as conn:
+        add_leaderboard_counts(conn)
+    db.session.expire_all()
+    assert {(r.board, r.level, r.prefix): r.count for r in LeaderboardCount.query} == incremental
+
+
+def test_sql_scores_must_be_whole_points(app):
+    with pytest.raises(ValueError):
+        SQLState().score_incr('test', 1, 1.5)
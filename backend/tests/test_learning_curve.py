@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import inspect, text
+
+from app.learning_curve import backfill_session_summaries, get_learning_curve, record_session_summary
+from app.migrations import drop_summary_running_totals
+from app.models import db, GameSession, Round, User, Word
+
+
+def play_session(user_id, word_id, started_at, guessed):
+    session = GameSession(user_id=user_id, difficulty='easy', started_at=started_at)
+    db.session.add(session)
+    db.session.flush()
+    for n, is_guessed in enumerate(guessed, 1):
+        db.session.add(Round(session_id=session.id, word_id=word_id, round_number=n,
+                             started_at=started_at, is_guessed=is_guessed))
+    db.session.flush()
+    return session
+
+
+def finish(session):
+    session.ended_at = datetime.now()
+    record_session_summary(session)
+    db.session.commit()
+
+
+def test_sessions_are_numbered_by_start_whatever_order_they_end(app):
+    user = User(username='curve_player', age=9)
+    db.session.add(user)
+    db.session.flush()
+    word_id = Word.query.first().id
+    start = datetime(2024, 5, 1, 9)
+
+    first = play_session(user.id, word_id, start, [True, False])
+    second = play_session(user.id, word_id, start + timedelta(hours=1), [True, True, True])
+    abandoned = play_session(user.id, word_id, start + timedelta(hours=2), [True, False, False])
+    db.session.commit()
+    finish(second)
+    finish(first)
+
+    expected = [
+        (1, 1, 1, 2, start),
+        (2, 3, 4, 3, start + timedelta(hours=1)),
+        (3, 1, 5, 3, start + timedelta(hours=2)),
+    ]
+    curve = get_learning_curve(user.id)
+    assert [(p['session_number'], p['correct_guesses'], p['cumulative_correct'], p['total_in_session'], p['date'])
+            for p in curve] == [(n, c, cum, t, d.isoformat()) for n, c, cum, t, d in expected]
+
+    later = get_learning_curve(user.id, since=start + timedelta(minutes=30), limit=1)
+    assert [(p['session_number'], p['cumulative_correct']) for p in later] == [(2, 4)]
+
+    backfill_session_summaries()
+    assert get_learning_curve(user.id) == curve
+    assert abandoned.ended_at is None
+
+
+def test_migration_drops_the_stored_running_totals(app):
+    with db.engine.begin() as conn:
+        conn.execute(text('ALTER TABLE session_summaries ADD COLUMN session_number INTEGER NOT NULL DEFAULT 0'))
+        conn.execute(text('ALTER TABLE session_summaries ADD COLUMN cumulative_correct INTEGER DEFAULT 0'))
+        drop_summary_running_totals(conn)
+        drop_summary_running_totals(conn)
+        columns = {c['name'] for c in inspect(conn).get_columns('session_summaries')}
+    assert not columns & {'session_number', 'cumulative_correct'}
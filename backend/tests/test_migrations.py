@@ -0,0 +1,88 @@
+import sqlite3
+
+from sqlalchemy import inspect
+
+from app.models import db
+from run import create_app
+
+# Schema of the original release (instance/bictionary.db): no indexes beyond
+# keys and uniques, and none of the tables added since
+BASELINE_SCHEMA = """
+CREATE TABLE users (
+    id INTEGER NOT NULL, username VARCHAR(120) NOT NULL, age INTEGER,
+    preferred_language VARCHAR(10), created_at DATETIME,
+    PRIMARY KEY (id), UNIQUE (username)
+);
+CREATE TABLE words (
+    id INTEGER NOT NULL, word VARCHAR(100) NOT NULL, definition TEXT, translation VARCHAR(100),
+    difficulty VARCHAR(20), category VARCHAR(50), age_group VARCHAR(20), is_appropriate BOOLEAN,
+    created_at DATETIME,
+    PRIMARY KEY (id), UNIQUE (word)
+);
+CREATE TABLE game_sessions (
+    id INTEGER NOT NULL, user_id INTEGER NOT NULL, age_group VARCHAR(20), difficulty VARCHAR(20),
+    language VARCHAR(10), total_rounds INTEGER, started_at DATETIME, ended_at DATETIME,
+    PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE TABLE user_stats (
+    id INTEGER NOT NULL, user_id INTEGER NOT NULL, total_games_played INTEGER, total_guesses INTEGER,
+    total_correct_guesses INTEGER, total_points INTEGER, accuracy_percentage FLOAT,
+    words_learned INTEGER, average_time_per_guess FLOAT, current_streak INTEGER,
+    longest_streak INTEGER, created_at DATETIME,
+    PRIMARY KEY (id), UNIQUE (user_id), FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE TABLE rounds (
+    id INTEGER NOT NULL, session_id INTEGER NOT NULL, word_id INTEGER NOT NULL,
+    round_number INTEGER, image_url VARCHAR(500), started_at DATETIME, guessed_at DATETIME,
+    duration_seconds INTEGER, is_guessed BOOLEAN, guesses_count INTEGER, points_earned INTEGER,
+    PRIMARY KEY (id), FOREIGN KEY(session_id) REFERENCES game_sessions (id),
+    FOREIGN KEY(word_id) REFERENCES words (id)
+);
+CREATE TABLE guesses (
+    id INTEGER NOT NULL, round_id INTEGER NOT NULL, user_guess VARCHAR(100), is_correct BOOLEAN,
+    match_type VARCHAR(20), time_taken FLOAT, created_at DATETIME,
+    PRIMARY KEY (id), FOREIGN KEY(round_id) REFERENCES rounds (id)
+);
+INSERT INTO users (id, username, age, preferred_language) VALUES (1, 'early_adopter', 9, 'en');
+INSERT INTO words (id, word, difficulty, category, age_group, is_appropriate)
+    VALUES (1, 'Cat', 'easy', 'animals', '5-7', 1);
+"""
+
+
+def baseline_app(tmp_path, app_config):
+    path = tmp_path / 'baseline.db'
+    with sqlite3.connect(path) as conn:
+        conn.executescript(BASELINE_SCHEMA)
+    return create_app(dict(app_config, SQLALCHEMY_DATABASE_URI=f'sqlite:///{path}'))
+
+
+def test_migrate_upgrades_baseline_schema(tmp_path, app_config):
+    app = baseline_app(tmp_path, app_config)
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(args=['migrate'])
+    assert result.exit_code == 0, result.output
+    assert 'Applied migrations [1, 2, 3, 4, 5, 6, 7, 8, 9]' in result.output
+    assert 'up to date' in runner.invoke(args=['migrate']).output
+
+    with app.app_context():
+        inspector = inspect(db.engine)
+        for table in db.metadata.sorted_tables:
+            assert inspector.has_table(table.name), table.name
+            columns = {c['name'] for c in inspector.get_columns(table.name)}
+            assert {c.name for c in table.columns} <= columns, table.name
+            indexes = {i['name'] for i in inspector.get_indexes(table.name)}
+            assert {i.name for i in table.indexes} <= indexes, table.name
+        db.engine.dispose()
+
+
+def test_migrated_database_serves_games(tmp_path, app_config):
+    app = baseline_app(tmp_path, app_config)
+    app.test_cli_runner().invoke(args=['migrate'])
+
+    response = app.test_client().post('/api/start-game', json={'user_id': 1, 'rounds': 1})
+
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()['round']['round_id']
+    with app.app_context():
+        db.engine.dispose()
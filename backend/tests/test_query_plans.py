@@ -0,0 +1,29 @@
+from app.models import db, GameSession, Round
+from benchmarks.bench_cognitive_metrics import add_history
+from benchmarks.check_query_plans import StatementRecorder, full_scans, hot_paths
+from benchmarks.common import seed_users
+
+
+def test_hot_queries_use_indexes(app, client):
+    seed_users(db, 500)
+    add_history(db, 1, 50)
+    db.session.execute(db.text('ANALYZE'))
+    db.session.commit()
+
+    session_id = db.session.query(db.func.max(GameSession.id)).filter_by(user_id=1).scalar()
+    round_id = db.session.query(db.func.max(Round.id)).filter_by(session_id=session_id).scalar()
+    tables = set(db.metadata.tables)
+
+    failures = []
+    for name, fn in hot_paths(client, 1, session_id, round_id):
+        with StatementRecorder(db.engine) as recorder:
+            fn()
+        db.session.remove()
+        assert recorder.statements, name
+
+        for statement, parameters in recorder.statements:
+            scanned, details = full_scans(db.engine, statement, parameters, tables)
+            if scanned:
+                failures.append((name, scanned, details))
+
+    assert failures == []
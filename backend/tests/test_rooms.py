@@ -0,0 +1,120 @@
+import asyncio
+import json
+from datetime import datetime
+
+from app.models import db, GameSession, Round, User, Word
+from app.rankings import board_name, get_board, rebuild_leaderboards
+from app.rooms import Room, RoomManager
+
+
+class FakeSocket:
+    """Server side of a connection: replays queued messages, keeps sent ones"""
+
+    def __init__(self, messages=()):
+        self.incoming = [json.dumps(m) if isinstance(m, dict) else m for m in messages]
+        self.sent = []
+        self.closed = False
+        self.buffered_bytes = 0
+
+    async def recv(self):
+        await asyncio.sleep(0)
+        return self.incoming.pop(0) if self.incoming else None
+
+    def send_frame(self, frame):
+        length = frame[1] & 0x7f
+        offset = 2 if length < 126 else 4 if length == 126 else 10
+        self.sent.append(json.loads(frame[offset:]))
+
+    def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeStore:
+    def __init__(self):
+        self.sessions = []
+
+    def create_session(self, host_id, age_group, difficulty, language, total_rounds):
+        self.sessions.append(total_rounds)
+        return len(self.sessions)
+
+    def start_round(self, session_id):
+        return None
+
+    def finish_game(self, session_id):
+        pass
+
+
+def errors(socket):
+    return [m['error'] for m in socket.sent if m['type'] == 'error']
+
+
+def test_bad_start_options_leave_the_room_startable():
+    store = FakeStore()
+    socket = FakeSocket([
+        {'type': 'join', 'room': 'r1', 'user_id': 1},
+        {'type': 'start', 'rounds': 'x'},
+        {'type': 'start', 'rounds': None},
+        {'type': 'start', 'rounds': 3, 'difficulty': ['hard']},
+        {'type': 'start', 'rounds': 3},
+    ])
+
+    async def play():
+        manager = RoomManager(store)
+        await manager.handle(socket)
+        await asyncio.gather(*manager._tasks)
+        manager.close()
+
+    asyncio.run(play())
+
+    assert errors(socket) == ['rounds must be a whole number', 'rounds must be a whole number',
+                              'difficulty must be a string']
+    assert store.sessions == [3]
+
+
+def test_message_error_does_not_drop_the_connection(monkeypatch):
+    def broken_start(self, player, options):
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(Room, 'start', broken_start)
+    socket = FakeSocket([
+        {'type': 'join', 'room': 'r1', 'user_id': 1},
+        {'type': 'start'},
+        {'type': 'guess', 'guess': 'cat'},
+    ])
+
+    async def play():
+        manager = RoomManager(FakeStore())
+        await manager.handle(socket)
+        manager.close()
+
+    asyncio.run(play())
+
+    # The guess after the failure was still handled on the same connection
+    assert errors(socket) == ['Could not handle the message', 'No round in progress']
+
+
+def test_room_points_are_credited_to_each_player(app):
+    from multiplayer import GameStore
+
+    host, guest = User(username='room_host', age=30), User(username='room_guest', age=30)
+    db.session.add_all([host, guest])
+    db.session.flush()
+    session = GameSession(user_id=host.id, started_at=datetime.now())
+    db.session.add(session)
+    db.session.flush()
+    round_obj = Round(session_id=session.id, word_id=Word.query.first().id, started_at=datetime.now())
+    db.session.add(round_obj)
+    db.session.commit()
+
+    now = datetime.now()
+    GameStore(app).finish_round(round_obj.id, 1, 2, now, 300, {host.id: (100, now), guest.id: (200, now)})
+    rebuild_leaderboards()
+    db.session.commit()
+
+    daily = {e['user_id']: e['points'] for e in get_board('daily', limit=100)['entries']}
+    assert daily[host.id] == 100
+    assert daily[guest.id] == 200
+    assert board_name('daily') == get_board('daily')['board']
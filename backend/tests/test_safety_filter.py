@@ -0,0 +1,20 @@
+from app.guess_processor import process_guess
+from app.safety_filter import PatternAutomaton, contains_blocked_term
+
+
+def test_whole_words_skip_terms_inside_longer_words():
+    automaton = PatternAutomaton([('hate', 'nsfw'), ('gore', 'nsfw'), ('he', 'other')])
+    assert automaton.matches('whatever', ['nsfw'])
+    assert not automaton.matches('whatever', ['nsfw'], whole_words=True)
+    assert not automaton.matches('gorey hater', ['nsfw'], whole_words=True)
+    for text in ('hate', 'i hate it', 'so-hate!', 'gore'):
+        assert automaton.matches(text, ['nsfw'], whole_words=True)
+    assert automaton.find_categories('he hates', whole_words=True) == {'other'}
+
+
+def test_near_misses_and_ordinary_words_are_not_blocked():
+    near_miss = process_guess('phatesythesis', 'Photosynthesis')
+    assert near_miss['match_type'] == 'fuzzy' and near_miss['is_correct']
+    assert process_guess('whatever', 'Cat')['message'] != process_guess('hate', 'Cat')['message']
+    assert not contains_blocked_term('whatever', ['nsfw'], whole_words=True)
+    assert contains_blocked_term('whatever', ['nsfw'])  # image words still match substrings
@@ -0,0 +1,50 @@
+import random
+import pytest
+from app import word_selector
+from app.models import db, GameSession, User
+from app.session_deck import draw_deck_word
+from app.state import configure_state, get_state
+from app.word_selector import WORD_DATABASE, WordCatalog
+
+
+@pytest.fixture(params=['memory', 'sql'])
+def session(request, app):
+    configure_state(request.param)
+    user = User(username='deck_tester')
+    db.session.add(user)
+    db.session.flush()
+    session = GameSession(user_id=user.id, age_group='adult', difficulty='medium', total_rounds=5)
+    db.session.add(session)
+    db.session.commit()
+    yield session
+    configure_state('sql')
+
+
+def reordered_catalog():
+    """The same words with every pool reversed, so each index names another word"""
+    return WordCatalog.from_word_database({
+        age_group: {difficulty: words[::-1] for difficulty, words in pools.items()}
+        for age_group, pools in WORD_DATABASE.items()
+    })
+
+
+def test_catalog_version_follows_word_order():
+    assert WordCatalog.from_word_database(WORD_DATABASE).version == word_selector.get_catalog().version
+    assert reordered_catalog().version != word_selector.get_catalog().version
+
+
+def test_deck_from_another_catalog_version_is_dealt_again(session, monkeypatch):
+    old_version = word_selector.get_catalog().version
+    draw_deck_word(session, rng=random.Random(1))
+    db.session.commit()
+
+    catalog = reordered_catalog()
+    monkeypatch.setattr(word_selector, '_catalog', catalog)
+    word, upcoming = draw_deck_word(session, peek=2, rng=random.Random(2))
+    db.session.commit()
+
+    dealt = catalog.sample('adult', 'medium', 5, rng=random.Random(2))
+    assert word['word'] == catalog.words[dealt[0]]['word']
+    assert upcoming == [catalog.words[i]['word'] for i in dealt[1:3]]
+    assert get_state().deck_pop(session.id, version=old_version) == (None, [])
+    assert get_state().deck_pop(session.id, peek=3, version=catalog.version) == (dealt[1], list(dealt[2:5]))
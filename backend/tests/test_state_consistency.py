@@ -0,0 +1,23 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.models import db
+from app.state import SQLState, configure_state
+from benchmarks.check_state_consistency import run_check
+
+
+def test_two_sql_workers_share_state_consistently():
+    report = run_check(workers=2, backend='sql')
+    assert report['checks'] == dict.fromkeys(report['checks'], True)
+    assert report['errors'] == 0
+
+
+def test_sql_backend_refuses_databases_without_upserts(app, monkeypatch):
+    with pytest.raises(ValueError, match='mysql'):
+        configure_state('sql', 'mysql')
+    configure_state('sql', 'sqlite')
+
+    monkeypatch.setattr(db.session, 'get_bind', lambda: SimpleNamespace(dialect=SimpleNamespace(name='mssql')))
+    with pytest.raises(ValueError, match='mssql'):
+        SQLState().deck_deal(1, [1, 2, 3])
@@ -0,0 +1,98 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app.models import db, UserStats
+from app.stats_writer import StatsAggregator, log_directory
+
+
+def write_dead_log(directory, records):
+    """A log left by a crashed process (no pid goes this high)"""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, '999999999.log'), 'w', encoding='utf-8') as f:
+        for user_id, is_correct, points in records:
+            f.write(json.dumps({'u': user_id, 'c': int(is_correct), 'p': points}) + '\n')
+
+
+def total_points(user_id):
+    stats = UserStats.query.filter_by(user_id=user_id).first()
+    return stats.total_points if stats else 0
+
+
+def test_crash_log_is_replayed_on_first_flush(app, tmp_path):
+    base = str(tmp_path / 'logs')
+    url = db.engine.url.render_as_string(hide_password=True)
+    write_dead_log(log_directory(base, url), [(1, True, 150), (1, True, 50)])
+    before = total_points(1)
+
+    writer = StatsAggregator(app, base, interval=3600)
+    try:
+        assert total_points(1) == before  # nothing replayed at construction
+        writer.flush()
+    finally:
+        writer.close()
+
+    assert total_points(1) == before + 200
+
+
+def test_other_databases_logs_are_left_alone(app, tmp_path):
+    base = str(tmp_path / 'logs')
+    other = log_directory(base, 'sqlite:////somewhere/else.db')
+    write_dead_log(other, [(1, True, 150)])
+    before = total_points(1)
+
+    writer = StatsAggregator(app, base, interval=3600)
+    try:
+        assert writer.recover() == 0
+    finally:
+        writer.close()
+
+    assert total_points(1) == before
+    assert os.listdir(other) == ['999999999.log']
+
+
+CRASHING_RECOVERY = '''
+import os, sys
+from benchmarks.common import create_bench_app
+from app.stats_writer import StatsAggregator
+
+app, _ = create_bench_app(db_path=sys.argv[1], config={
+    'STATS_WRITE_BEHIND': False, 'GUESS_BUFFERING': False, 'ROUND_TIMER': False,
+    'IMAGE_PREFETCH_WORKERS': 0, 'IMAGE_CACHE_DIR': sys.argv[2] + '-images'})
+writer = StatsAggregator(app, sys.argv[2], interval=3600)
+apply_batch = writer._apply_batch
+if sys.argv[3] == 'before-commit':
+    writer._apply_batch = lambda *args: os._exit(3)
+else:
+    writer._apply_batch = lambda *args: (apply_batch(*args), os._exit(3))
+writer.recover()
+'''
+
+
+@pytest.mark.parametrize('crash', ['before-commit', 'after-commit'])
+def test_recovery_survives_a_crash(app, tmp_path, crash):
+    base = str(tmp_path / 'logs')
+    url = db.engine.url.render_as_string(hide_password=True)
+    directory = log_directory(base, url)
+    write_dead_log(directory, [(1, True, 150), (1, True, 50)])
+    before = total_points(1)
+
+    db_path = app.config['SQLALCHEMY_DATABASE_URI'][len('sqlite:///'):]
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    killed = subprocess.run([sys.executable, '-c', CRASHING_RECOVERY, db_path, base, crash], cwd=backend)
+    assert killed.returncode == 3
+    assert len([name for name in os.listdir(directory) if name.endswith('.flushing')]) == 1  # claimed, not deleted
+
+    db.session.expire_all()
+    writer = StatsAggregator(app, base, interval=3600)
+    try:
+        writer.recover()
+    finally:
+        writer.close()
+
+    db.session.expire_all()
+    assert total_points(1) == before + 200
+    assert os.listdir(directory) == []